@@ -2,11 +2,13 @@ from __future__ import annotations
 
 from flask import Flask, redirect
 from flask_caching import Cache
+from flask_compress import Compress
 from flask_cors import CORS
 
 from .config import Config
 
 cache = Cache()
+compress = Compress()
 
 
 def create_app(config_class: type[Config] = Config) -> Flask:
@@ -15,6 +17,14 @@ def create_app(config_class: type[Config] = Config) -> Flask:
 
     CORS(app, resources={r"*": {"origins": app.config["CORS_ALLOWED_ORIGINS"]}})
     cache.init_app(app)
+    # layer endpoints serve pre-compressed bodies; this covers everything else
+    compress.init_app(app)
+
+    # keep startup independent of how much update history has piled up
+    if app.config["UPDATES_COMPACT_MIN_BYTES"]:
+        from .services.updates import compact_all
+
+        compact_all(app.config["UPDATES_DIR"], app.config["UPDATES_COMPACT_MIN_BYTES"])
 
     # Blueprints
     from .routes.borders import bp as borders_bp
@@ -23,6 +33,13 @@ def create_app(config_class: type[Config] = Config) -> Flask:
     from .routes.health import bp as health_bp
     from .routes.healthcheck import bp as healthcheck_bp
     from .routes.admin_updates import bp as admin_updates_bp
+    from .routes.tiles import bp as tiles_bp
+    from .routes.clusters import bp as clusters_bp
+    from .routes.search import bp as search_bp
+    from .routes.nearest import bp as nearest_bp
+    from .routes.routing import bp as routing_bp
+    from .routes.changes import bp as changes_bp
+    from .routes.stream import bp as stream_bp
 
     app.register_blueprint(health_bp, url_prefix="/api/v1/health_centers")
     app.register_blueprint(checkpoints_bp, url_prefix="/api/v1")
@@ -30,6 +47,13 @@ def create_app(config_class: type[Config] = Config) -> Flask:
     app.register_blueprint(healthcheck_bp)
     app.register_blueprint(datasets_bp, url_prefix="/api/v1/datasets")
     app.register_blueprint(admin_updates_bp, url_prefix="/api/v1/admin")
+    app.register_blueprint(tiles_bp, url_prefix="/api/v1/tiles")
+    app.register_blueprint(clusters_bp, url_prefix="/api/v1/clusters")
+    app.register_blueprint(search_bp, url_prefix="/api/v1")
+    app.register_blueprint(nearest_bp, url_prefix="/api/v1")
+    app.register_blueprint(routing_bp, url_prefix="/api/v1")
+    app.register_blueprint(changes_bp, url_prefix="/api/v1")
+    app.register_blueprint(stream_bp, url_prefix="/api/v1")
 
     @app.get("/data/health_centers")
     def legacy_health_centers():
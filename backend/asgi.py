@@ -0,0 +1,113 @@
+"""
+Optional ASGI entry point: ``uvicorn backend.asgi:app``.
+
+/api/v1/stream is served directly on the event loop, so an idle subscriber
+costs one suspended coroutine rather than a worker thread; every other path
+goes to the Flask app through asgiref's WSGI adapter. Requires the "async"
+extra (asgiref, uvicorn).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+from urllib.parse import parse_qsl
+
+from asgiref.wsgi import WsgiToAsgi
+
+from . import create_app
+from .services.broadcast import (
+    KEEPALIVE_FRAME,
+    RETRY_FRAME,
+    broadcaster,
+    parse_stream_args,
+    reset_frame,
+)
+
+flask_app = create_app()
+_wsgi = WsgiToAsgi(flask_app)
+
+STREAM_PATH = "/api/v1/stream"
+SSE_HEADERS = [
+    (b"content-type", b"text/event-stream; charset=utf-8"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+]
+
+
+async def _stream(scope: dict[str, Any], receive: Any, send: Any) -> None:
+    args = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+    try:
+        categories, bbox = parse_stream_args(args)
+    except ValueError as e:
+        body = json.dumps({"error": str(e)}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+        return
+
+    headers = dict(scope.get("headers") or [])
+    last_id = (headers.get(b"last-event-id") or b"").decode("latin-1") or args.get("last_event_id")
+    loop = asyncio.get_running_loop()
+    ready = asyncio.Event()
+    b = broadcaster(flask_app)
+
+    def wake() -> None:
+        loop.call_soon_threadsafe(ready.set)
+
+    sub, replay = await loop.run_in_executor(
+        None, lambda: b.subscribe(categories, bbox, last_id, wake)
+    )
+    heartbeat = flask_app.config["STREAM_HEARTBEAT"]
+
+    async def disconnected() -> None:
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    gone = asyncio.ensure_future(disconnected())
+    try:
+        await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+        first = RETRY_FRAME + (
+            reset_frame(b.event_id) if replay is None else b"".join(ev.encode() for ev in replay)
+        )
+        await send({"type": "http.response.body", "body": first, "more_body": True})
+        while not gone.done():
+            waiter = asyncio.ensure_future(ready.wait())
+            await asyncio.wait(
+                {waiter, gone}, timeout=heartbeat, return_when=asyncio.FIRST_COMPLETED
+            )
+            waiter.cancel()
+            ready.clear()
+            if gone.done():
+                break
+            events, overflowed = sub.take()
+            if overflowed:
+                chunk = reset_frame(b.event_id)
+            elif events:
+                chunk = b"".join(ev.encode() for ev in events)
+            else:
+                chunk = KEEPALIVE_FRAME
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    finally:
+        gone.cancel()
+        b.unsubscribe(sub)
+
+
+async def app(scope: dict[str, Any], receive: Any, send: Any) -> None:
+    if scope["type"] == "http" and scope["path"] == STREAM_PATH and scope["method"] == "GET":
+        await _stream(scope, receive, send)
+    elif scope["type"] == "http":
+        await _wsgi(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] in ("lifespan.startup", "lifespan.shutdown"):
+                await send({"type": message["type"] + ".complete"})
+                if message["type"] == "lifespan.shutdown":
+                    return
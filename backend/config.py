@@ -25,7 +25,35 @@ class Config:
     BORDER_CROSSINGS_PATH: str = os.path.join(
         BASE_DIR, "aid_dashboard_data", "borders", "border_crossings.geojson"
     )
+    UPDATES_DIR: str = os.getenv(
+        "UPDATES_DIR", os.path.join(BASE_DIR, "aid_dashboard_data", "updates")
+    )
+    # "sqlite" also indexes every update in UPDATES_DB_PATH for the admin listing
+    UPDATES_BACKEND: str = os.getenv("UPDATES_BACKEND", "jsonl")
+    UPDATES_DB_PATH: str | None = os.getenv("UPDATES_DB_PATH")
+    # /api/v1/stream: how often (s) other workers' writes are picked up, keepalive period
+    STREAM_POLL_INTERVAL: float = float(os.getenv("STREAM_POLL_INTERVAL", "1"))
+    STREAM_HEARTBEAT: float = float(os.getenv("STREAM_HEARTBEAT", "15"))
+    # Fold update logs bigger than this into their snapshot when the app starts
+    # (0 disables; `make compact-updates` runs the same job on demand)
+    UPDATES_COMPACT_MIN_BYTES: int = int(os.getenv("UPDATES_COMPACT_MIN_BYTES", str(1 << 20)))
+
+    # Parsed datasets are shared per process; how often (s) to check source files for changes
+    DATASET_CHECK_INTERVAL: float = float(os.getenv("DATASET_CHECK_INTERVAL", "5"))
+
+    # Largest page size accepted by limit= on layer endpoints
+    PAGE_MAX_LIMIT: int = int(os.getenv("PAGE_MAX_LIMIT", "5000"))
+
+    # Vector tiles: in-process LRU size, optional on-disk cache (prewarmed by `make tiles`)
+    TILE_CACHE_SIZE: int = int(os.getenv("TILE_CACHE_SIZE", "4096"))
+    TILE_CACHE_DIR: str | None = os.getenv("TILE_CACHE_DIR")
 
     # Caching
     CACHE_TYPE: str = os.getenv("CACHE_TYPE", "SimpleCache")
     CACHE_DEFAULT_TIMEOUT: int = int(os.getenv("CACHE_DEFAULT_TIMEOUT", "300"))
+
+    # Compression (flask-compress for dynamic responses, pre-encoded layer bodies)
+    COMPRESS_ALGORITHM: tuple[str, ...] = ("br", "gzip")
+    COMPRESS_ALGORITHM_STREAMING: tuple[str, ...] = ("br", "deflate")
+    PRECOMPRESS_GZIP_LEVEL: int = int(os.getenv("PRECOMPRESS_GZIP_LEVEL", "9"))
+    PRECOMPRESS_BR_LEVEL: int = int(os.getenv("PRECOMPRESS_BR_LEVEL", "9"))
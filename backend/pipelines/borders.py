@@ -9,7 +9,10 @@ import re
 from pathlib import Path
 from typing import Any, Dict, Optional
 
+from ..services.changes import read_build, record_base_diff
 from ..services.files import atomic_write_json, write_meta_sidecar
+from .exports import write_dataset_exports
+from .snapshots import write_dataset_binary
 
 RUN_TS = datetime.now(timezone.utc)
 RUN_ISO = RUN_TS.isoformat()
@@ -126,12 +129,19 @@ def csv_to_geojson(csv_path: str | Path, geojson_out: str | Path) -> dict[str, A
             })
 
     geojson = {"type": "FeatureCollection", "features": features}
+    previous = read_build(out_p)
     changed, final_path = atomic_write_json(out_p, geojson)
     write_meta_sidecar(final_path, {
         "source": "border_crossings_csv",
         "csv": str(csv_p.resolve()),
         "records": len(features),
     })
+    # by-id diff against the previous build for /api/v1/changes
+    record_base_diff(final_path, previous, features, ("borders",))
+    # memory-mapped copy the API workers share instead of parsing the JSON
+    write_dataset_binary(final_path, ("borders",))
+    # FlatGeobuf / GeoParquet / qbin encodings for format=
+    write_dataset_exports(final_path, ("borders",))
     return {
         "data": geojson,
         "meta": {
@@ -7,7 +7,13 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, Tuple
 
 from ..services.http import make_session
+from ..services.changes import read_build, record_base_diff
 from ..services.files import atomic_write_json, write_meta_sidecar
+from ..services.lod import write_pyramid
+from ..services.routing import write_graph
+from ..services.registry import assign_ids, content_key, fingerprint
+from .exports import write_dataset_exports
+from .snapshots import write_dataset_binary
 
 OVERPASS_URL = "https://overpass-api.de/api/interpreter"
 
@@ -158,7 +164,7 @@ def fetch_overpass_tiles(
 ) -> dict[str, Any]:
     session = make_session()
     seen: set[Tuple[str, int]] = set()     # (type, id) to dedupe across tiles
-    features: list[dict] = []
+    features: list[dict[str, Any]] = []
     skipped_ways: list[int] = []
 
     for idx, tile in enumerate(split_bbox(bbox, grid_splits), start=1):
@@ -176,13 +182,13 @@ def fetch_overpass_tiles(
             continue
 
         for el in data.get("elements", []):
-            key = (el.get("type"), el.get("id"))
-            if key in seen:
+            ref = (el.get("type"), el.get("id"))
+            if ref in seen:
                 continue
             ft = to_feature(el)
             if ft:
                 features.append(ft)
-                seen.add(key)
+                seen.add(ref)
             else:
                 # remember ways couldn't convert due to missing geometry
                 if el.get("type") == "way" and "geometry" not in el:
@@ -193,6 +199,7 @@ def fetch_overpass_tiles(
     geojson: dict[str, Any] = {"type": "FeatureCollection", "features": features}
 
     out = Path(output_path)
+    previous = read_build(out)
     changed, final_path = atomic_write_json(out, geojson)
     write_meta_sidecar(
         final_path,
@@ -206,6 +213,22 @@ def fetch_overpass_tiles(
             "ingested_at": RUN_ISO,
         },
     )
+    # by-id diff against the previous build for /api/v1/changes
+    record_base_diff(final_path, previous, features, ("checkpoints", "roads"))
+    # memory-mapped copy the API workers share instead of parsing the JSON
+    write_dataset_binary(final_path, ("checkpoints", "roads"))
+    # FlatGeobuf / GeoParquet / qbin encodings for format=
+    write_dataset_exports(final_path, ("checkpoints", "roads"))
+
+    # precomputed levels of detail for the roads endpoint's zoom=/tolerance=
+    key = content_key(fingerprint(final_path)) or ""
+    roads = assign_ids("roads", [ft for ft in features if ft["geometry"]["type"] == "LineString"])
+    write_pyramid(final_path, roads, key)
+    # routable graph for /route and /isochrones
+    points = [ft for ft in features if ft["geometry"]["type"] == "Point"]
+    checkpoints = assign_ids("checkpoints", points)
+    write_graph(final_path, roads, checkpoints, key)
+
     return {
         "data": geojson,
         "meta": {
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any
+
+from ..services.updates import compact_all
+
+
+def compact_updates(updates_dir: str | Path, min_bytes: int = 0) -> list[dict[str, Any]]:
+    """
+    Rotate every ``<category>.jsonl`` in ``updates_dir`` into a gzipped
+    history segment and fold it into ``<category>.snapshot.json``, so readers
+    start from the snapshot instead of replaying the whole log.
+    """
+    return compact_all(updates_dir, min_bytes)
+
+
+# CLI usage: python -m backend.pipelines.compact_updates
+if __name__ == "__main__":  # pragma: no cover
+    base = Path(__file__).resolve().parents[2]
+    out = os.getenv("UPDATES_DIR", base / "aid_dashboard_data" / "updates")
+    for res in compact_updates(out):
+        rotated = res["rotated"] or "nothing"
+        print(f"{res['path']}: snapshot at segment {res['segment']}, rotated {rotated}")
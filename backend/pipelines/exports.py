@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from ..services.binary import open_binary
+from ..services.exports import FORMATS, write_exports
+from ..services.feature_store import FeatureStore
+from ..services.registry import LAYERS, _parse, content_key, fingerprint
+
+
+def write_dataset_exports(
+    data_path: str | Path, layer_names: tuple[str, ...], formats: tuple[str, ...] = tuple(FORMATS)
+) -> dict[str, dict[str, str | None]]:
+    """
+    Encode every layer of the dataset now at ``data_path`` in ``formats``
+    (FlatGeobuf, GeoParquet, qbin) for the layer endpoints' ``format=``.
+    Call after write_dataset_binary: the layers are read from its snapshot
+    when it is current. Formats whose dependencies are missing are skipped.
+    """
+    path = str(data_path)
+    key = content_key(fingerprint(path))
+    if key is None:
+        raise ValueError(f"{path} has no .meta.json sidecar; run its pipeline first")
+    names = list(layer_names)
+    snap = open_binary(path, key, names)
+    if snap is not None:
+        stores = {n: snap.store(n) for n in names}
+    else:
+        stores = {n: FeatureStore.from_features(feats) for n, feats in _parse(path, names).items()}
+    return write_exports(path, stores, key, formats)
+
+
+def write_all(paths: dict[str, str | Path]) -> dict[str, Any]:
+    """Exports for existing datasets: ``paths`` maps config key -> data file."""
+    out: dict[str, Any] = {}
+    for cfg_key, path in paths.items():
+        names = tuple(n for n, spec in LAYERS.items() if spec[0] == cfg_key)
+        out[str(path)] = write_dataset_exports(path, names) if Path(path).exists() else None
+    return out
+
+
+# CLI usage: python -m backend.pipelines.exports
+if __name__ == "__main__":  # pragma: no cover
+    from ..config import Config
+
+    paths = {k: getattr(Config, k) for k in {spec[0] for spec in LAYERS.values()}}
+    for src, res in write_all(paths).items():
+        for layer, written in (res or {}).items():
+            for fmt, target in written.items():
+                print(f"{src} [{layer}] {fmt} → {target or 'skipped (missing dependency)'}")
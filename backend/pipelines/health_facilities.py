@@ -13,7 +13,10 @@ from typing import Any, Optional
 import geopandas as gpd
 
 from ..services.http import make_session
+from ..services.changes import read_build, record_base_diff
 from ..services.files import atomic_write_json, write_meta_sidecar
+from .exports import write_dataset_exports
+from .snapshots import write_dataset_binary
 
 ZIP_URL = (
     "https://data.humdata.org/dataset/15d8f2ca-3528-4fb1-9cf5-a91ed3aba170/"
@@ -146,6 +149,7 @@ def build_health_facilities(output_path: str | Path, tmp_dir: str | Path) -> dic
     geojson = simplify_properties(raw_geojson)
 
     out = Path(output_path)
+    previous = read_build(out)
     changed, final_path = atomic_write_json(out, geojson)
     write_meta_sidecar(final_path, {
         "source": "health_facilities",
@@ -153,6 +157,12 @@ def build_health_facilities(output_path: str | Path, tmp_dir: str | Path) -> dic
         "records": len(geojson.get("features", [])),
         "ingested_at": RUN_ISO,
     })
+    # by-id diff against the previous build for /api/v1/changes
+    record_base_diff(final_path, previous, geojson.get("features", []), ("health",))
+    # memory-mapped copy the API workers share instead of parsing the JSON
+    write_dataset_binary(final_path, ("health",))
+    # FlatGeobuf / GeoParquet / qbin encodings for format=
+    write_dataset_exports(final_path, ("health",))
     return {
         "data": geojson,
         "meta": {
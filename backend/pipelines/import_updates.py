@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from ..services.update_store import import_updates
+
+# CLI usage: python -m backend.pipelines.import_updates
+# One-shot: loads every category's full history (rotated segments and live
+# tail) into the SQLite store; refuses categories the database already holds.
+if __name__ == "__main__":  # pragma: no cover
+    base = Path(__file__).resolve().parents[2]
+    src = Path(os.getenv("UPDATES_DIR", base / "aid_dashboard_data" / "updates"))
+    db = os.getenv("UPDATES_DB_PATH") or src / "updates.sqlite3"
+    for category, rows in import_updates(src, db).items():
+        print(f"{category}: {rows} updates → {db}")
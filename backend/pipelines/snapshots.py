@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+from ..services.binary import write_binary
+from ..services.registry import LAYERS, content_key, fingerprint, split_layers
+
+
+def write_dataset_binary(data_path: str | Path, layer_names: tuple[str, ...]) -> str | None:
+    """
+    Write the memory-mapped snapshot of the dataset now at ``data_path``
+    (read back from disk, so it matches what the API would parse). Call
+    after write_meta_sidecar, which fixes the content key it is filed under.
+    Returns its path, or None when the data cannot be represented.
+    """
+    path = str(data_path)
+    key = content_key(fingerprint(path))
+    if key is None:
+        raise ValueError(f"{path} has no .meta.json sidecar; run its pipeline first")
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    features = data.get("features", []) if isinstance(data, dict) else []
+    return write_binary(path, split_layers(features, list(layer_names)), key)
+
+
+def write_all(paths: dict[str, str | Path]) -> dict[str, Any]:
+    """Snapshots for existing datasets: ``paths`` maps config key -> data file."""
+    out: dict[str, Any] = {}
+    for cfg_key, path in paths.items():
+        names = tuple(n for n, spec in LAYERS.items() if spec[0] == cfg_key)
+        out[str(path)] = write_dataset_binary(path, names) if Path(path).exists() else None
+    return out
+
+
+# CLI usage: python -m backend.pipelines.snapshots
+if __name__ == "__main__":  # pragma: no cover
+    from ..config import Config
+
+    paths = {k: getattr(Config, k) for k in {spec[0] for spec in LAYERS.values()}}
+    for src, res in write_all(paths).items():
+        print(f"{src} → {res or 'skipped'}")
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..services import mvt
+from ..services.registry import LAYERS, assign_ids, content_key, fingerprint
+from ..services.spatial import GridIndex
+from ..services.tiles import disk_tile_path, write_tile
+
+PREWARM_ZOOMS = range(8, 15)
+TILE_LAYERS = ("checkpoints", "roads")
+
+
+def prewarm_tiles(
+    geojson_path: str | Path,
+    tiles_dir: str | Path,
+    zooms: range = PREWARM_ZOOMS,
+    layers: tuple[str, ...] = TILE_LAYERS,
+) -> dict[str, Any]:
+    """
+    Render every non-empty tile of ``layers`` at ``zooms`` into the on-disk
+    tile cache the API reads when TILE_CACHE_DIR points at ``tiles_dir``.
+    Tiles are filed under the dataset's content key, so a rebuild of the
+    GeoJSON starts a fresh directory.
+    """
+    path = str(geojson_path)
+    key = content_key(fingerprint(path))
+    if key is None:
+        raise ValueError(f"{path} has no .meta.json sidecar; run its pipeline first")
+
+    with open(path, encoding="utf-8") as f:
+        features = json.load(f).get("features", [])
+
+    written: dict[str, int] = {}
+    for layer in layers:
+        gtype = LAYERS[layer][1]
+        feats = [ft for ft in features if (ft.get("geometry") or {}).get("type") == gtype]
+        feats = assign_ids(layer, feats)
+        index = GridIndex.from_features(feats)
+        valid = index.envelopes[~np.isnan(index.envelopes).any(axis=1)]
+        if not len(valid):
+            continue
+        extent = (valid[:, 0].min(), valid[:, 1].min(), valid[:, 2].max(), valid[:, 3].max())
+        count = 0
+        for z in zooms:
+            x0, y0, x1, y1 = mvt.tile_range(extent, z)
+            for x in range(x0, x1 + 1):
+                for y in range(y0, y1 + 1):
+                    hits = index.query(mvt.buffered_bounds(z, x, y))
+                    if not len(hits):
+                        continue
+                    data = mvt.encode_layer(layer, (feats[i] for i in hits), z, x, y)
+                    if data:
+                        write_tile(disk_tile_path(tiles_dir, layer, key, z, x, y), data)
+                        count += 1
+        written[layer] = count
+    return {"path": str(Path(tiles_dir).resolve()), "content_key": key, "tiles": written}
+
+
+# CLI usage: python -m backend.pipelines.tiles
+if __name__ == "__main__":  # pragma: no cover
+    base = Path(__file__).resolve().parents[2]
+    src = base / "aid_dashboard_data" / "checkpoints" / "gaza_roads_checkpoints.geojson"
+    out = base / "aid_dashboard_data" / "tiles"
+    res = prewarm_tiles(src, out)
+    print(f"Prewarmed {res['tiles']} tiles → {res['path']}")
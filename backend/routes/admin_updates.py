@@ -1,65 +1,46 @@
 # backend/routes/admin_updates.py
 from __future__ import annotations
 from flask import Blueprint, request, jsonify, abort, current_app
+from flask.typing import ResponseReturnValue
 from pathlib import Path
-import csv, io, json
-from datetime import datetime, timezone
+import json
+from typing import Any
+
+from ..services.bulk_import import import_stream, normalize_ts, open_upload
+from ..services.layers import get_view, id_index
+from ..services.log_writer import log_writer
+from ..services.registry import LAYERS
+from ..services.update_store import (
+    SqliteStore,
+    filter_entries,
+    next_cursor,
+    parse_list_args,
+    sqlite_store,
+)
+from ..services.broadcast import notify_write
+from ..services.updates import CATEGORIES, status_log
 
 bp = Blueprint("admin_updates", __name__)
 
 def _updates_dir() -> Path:
-    return Path(current_app.root_path).parents[1] / "aid_dashboard_data" / "updates"
+    return Path(current_app.config["UPDATES_DIR"])
 
-ALLOWED_CATEGORIES = {"health","checkpoints","borders","roads","food","water","shelters"}
+def _known_ids(cat: str) -> frozenset[str] | None:
+    """Ids of the base layer a category overlays; None for categories without one."""
+    if cat not in LAYERS:
+        return None
+    view = get_view(cat)
+    ids = id_index(view)
+    return view.dataset.derive(("id_strs", cat), lambda: frozenset(map(str, ids)))
 
-def _parse_iso(ts: str) -> datetime:
-    # permissive ISO parser; require 'Z' or offset
-    try:
-        if ts.endswith("Z"):
-            return datetime.fromisoformat(ts[:-1]).replace(tzinfo=timezone.utc)
-        return datetime.fromisoformat(ts)
-    except Exception:
-        raise ValueError("verified_at must be ISO-8601, e.g. 2025-08-19T13:45:00Z")
-
-def _iter_jsonl(path: Path):
-    if not path.exists():
-        return
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                yield json.loads(line)
-            except json.JSONDecodeError:
-                # skip bad lines (or log)
-                continue
-
-def _latest_per_id(path: Path) -> list[dict]:
-    """Return only the latest row per id (by verified_at), stable-sorted by time desc."""
-    latest: dict[str, dict] = {}
-    for obj in _iter_jsonl(path):
-        _id = obj.get("id")
-        if not _id:
-            continue
-        try:
-            ts = _parse_iso(obj.get("verified_at",""))
-        except Exception:
-            continue
-        prev = latest.get(_id)
-        if not prev:
-            latest[_id] = obj
-        else:
-            try:
-                prev_ts = _parse_iso(prev.get("verified_at",""))
-            except Exception:
-                prev_ts = datetime.min.replace(tzinfo=timezone.utc)
-            if ts >= prev_ts:
-                latest[_id] = obj
-    # newest first
-    rows = list(latest.values())
-    rows.sort(key=lambda r: _parse_iso(r["verified_at"]), reverse=True)
-    return rows
+def _store() -> SqliteStore | None:
+    """The SQLite update store when UPDATES_BACKEND is "sqlite", else None."""
+    cfg = current_app.config
+    if cfg.get("UPDATES_BACKEND") != "sqlite":
+        return None
+    return sqlite_store(cfg.get("UPDATES_DB_PATH") or _updates_dir() / "updates.sqlite3")
+
+ALLOWED_CATEGORIES = set(CATEGORIES)
 
 @bp.post("/update")
 def post_update():
@@ -78,20 +59,25 @@ def post_update():
     if not upd.get("id") or not upd.get("status") or not upd.get("verified_at"):
         return {"error":"id, status, verified_at required"}, 400
 
+    # Re-emit as Z format to keep consistent; naive times are UTC, as in /bulk
     try:
-        ts = _parse_iso(upd["verified_at"])
-    except Exception as e:
+        upd["verified_at"] = normalize_ts(upd["verified_at"])
+    except ValueError as e:
         return {"error": str(e)}, 400
-    # Re-emit as Z format to keep consistent
-    upd["verified_at"] = ts.astimezone(timezone.utc).isoformat().replace("+00:00","Z")
 
     updates_dir = _updates_dir()
     updates_dir.mkdir(parents=True, exist_ok=True)
     out = updates_dir / f"{cat}.jsonl"
 
     line = json.dumps(upd, ensure_ascii=False)
-    with out.open("a", encoding="utf-8") as f:
-        f.write(line + "\n")
+    # returns once the line is fsynced, possibly in one batch with other requests
+    log_writer(out).append(line + "\n")
+    # fold the new line into the in-memory index now rather than on the next read
+    status_log(out).refresh()
+    notify_write(current_app)
+    store = _store()
+    if store is not None:
+        store.append(cat, [upd])
 
     return jsonify({"ok": True})
 
@@ -104,12 +90,27 @@ def get_list():
     if cat not in ALLOWED_CATEGORIES:
         return {"error":"invalid category"}, 400
 
-    path = _updates_dir() / f"{cat}.jsonl"
-    rows = _latest_per_id(path)
-    return jsonify(rows)
+    try:
+        flt = parse_list_args(request.args, current_app.config["PAGE_MAX_LIMIT"])
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    # latest row per id, newest first
+    store = _store()
+    if store is not None:
+        rows, last = store.list_latest(cat, flt)
+    else:
+        log = status_log(_updates_dir() / f"{cat}.jsonl")
+        log.refresh()
+        rows, last = filter_entries(log.entries(), flt)
+    resp = jsonify(rows)
+    cursor = next_cursor(last)
+    if cursor:
+        resp.headers["X-Next-Cursor"] = cursor
+    return resp
 
 @bp.post("/bulk")
-def post_bulk():
+def post_bulk() -> ResponseReturnValue:
     from ..services.auth import require_admin
     require_admin()
 
@@ -117,100 +118,36 @@ def post_bulk():
     if cat not in ALLOWED_CATEGORIES:
         return {"error":"invalid category"}, 400
 
-    # Accept either: (a) text body, (b) uploaded file under 'file'
-    incoming_bytes: bytes | None = None
-    if "file" in request.files:
-        incoming_bytes = request.files["file"].read()
+    # Accept either: (a) raw body, (b) uploaded file under 'file'; both are
+    # parsed off the stream (CSV, JSONL or a JSON array), never read whole
+    # (only multipart bodies are form-parsed, so `curl --data-binary` streams too)
+    if request.mimetype == "multipart/form-data":
+        if "file" not in request.files:
+            return {"error":"no data provided"}, 400
+        stream = request.files["file"].stream
     else:
-        incoming_bytes = request.get_data(cache=False, as_text=False)
-
-    if not incoming_bytes:
+        stream = request.stream
+    opened = open_upload(stream)
+    if opened is None:
         return {"error":"no data provided"}, 400
-
-    text = incoming_bytes.decode("utf-8", errors="ignore").strip()
-    if not text:
-        return {"error":"empty data"}, 400
+    kind, text = opened
 
     updates_dir = _updates_dir()
     updates_dir.mkdir(parents=True, exist_ok=True)
     out = updates_dir / f"{cat}.jsonl"
+    store = _store()
+    writer = log_writer(out)
+
+    def write_batch(rows: list[dict[str, Any]]) -> None:
+        writer.append("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+        if store is not None:
+            store.append(cat, rows)
+
+    try:
+        report = import_stream(kind, text, cat, _known_ids(cat), write_batch)
+    except ValueError as e:
+        return {"error": str(e)}, 400
 
-    # Heuristic: JSONL if starts with '{' or '[' on many lines, else CSV
-    is_jsonl = text.lstrip().startswith("{") or "\n{" in text or "\n[" in text
-
-    appended = 0
-    with out.open("a", encoding="utf-8") as fout:
-        if is_jsonl:
-            # Accept either JSONL or a single JSON array
-            if text.lstrip().startswith("["):
-                try:
-                    arr = json.loads(text)
-                    if not isinstance(arr, list):
-                        return {"error":"JSON payload must be array or JSONL"}, 400
-                except Exception as e:
-                    return {"error": f"invalid JSON array: {e}"}, 400
-                for obj in arr:
-                    if not isinstance(obj, dict):
-                        continue
-                    obj["category"] = cat
-                    if not (obj.get("id") and obj.get("status") and obj.get("verified_at")):
-                        continue
-                    # normalize timestamp
-                    try:
-                        ts = _parse_iso(obj["verified_at"])
-                        obj["verified_at"] = ts.astimezone(timezone.utc).isoformat().replace("+00:00","Z")
-                    except Exception:
-                        continue
-                    fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
-                    appended += 1
-            else:
-                # Treat each line as JSON
-                for line in text.splitlines():
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        obj = json.loads(line)
-                    except Exception:
-                        continue
-                    if isinstance(obj, dict):
-                        obj["category"] = cat
-                        if not (obj.get("id") and obj.get("status") and obj.get("verified_at")):
-                            continue
-                        try:
-                            ts = _parse_iso(obj["verified_at"])
-                            obj["verified_at"] = ts.astimezone(timezone.utc).isoformat().replace("+00:00","Z")
-                        except Exception:
-                            continue
-                        fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
-                        appended += 1
-        else:
-            # CSV mode; expect headers at least: id,status,verified_at
-            reader = csv.DictReader(io.StringIO(text))
-            required = {"id","status","verified_at"}
-            if not required.issubset(set(h.lower() for h in reader.fieldnames or [])):
-                return {"error":"CSV must include headers: id,status,verified_at"}, 400
-            for row in reader:
-                obj = {
-                    "id": row.get("id"),
-                    "status": row.get("status"),
-                    "verified_at": row.get("verified_at"),
-                    "name": row.get("name") or None,
-                    "notes": row.get("notes") or None,
-                    "priority": row.get("priority") or None,
-                    "source": row.get("source") or None,
-                    "reporter": row.get("reporter") or None,
-                    "tags": [t.strip() for t in (row.get("tags") or "").split("|") if t.strip()] or None,
-                    "category": cat,
-                }
-                if not (obj["id"] and obj["status"] and obj["verified_at"]):
-                    continue
-                try:
-                    ts = _parse_iso(obj["verified_at"])
-                    obj["verified_at"] = ts.astimezone(timezone.utc).isoformat().replace("+00:00","Z")
-                except Exception:
-                    continue
-                fout.write(json.dumps(obj, ensure_ascii=False) + "\n")
-                appended += 1
-
-    return jsonify({"ok": True, "appended": appended})
\ No newline at end of file
+    status_log(out).refresh()
+    notify_write(current_app)
+    return jsonify({"ok": True, **report})
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
+
+from ..services.changes import changes_since, decode_changes_cursor
+from ..services.encoded import json_response
+from ..services.registry import LAYERS
+
+bp = Blueprint("changes", __name__)
+
+
+@bp.get("/changes")
+def get_changes() -> ResponseReturnValue:
+    """
+    Features changed since ``since`` (a cursor from an earlier response), per
+    layer. Without ``since`` only the current cursor is returned: fetch the
+    layers, then poll from there.
+    """
+    parts = request.args.get("layers", "").split(",")
+    layers = [part.strip() for part in parts if part.strip()] or list(LAYERS)
+    unknown = [layer for layer in layers if layer not in LAYERS]
+    if unknown:
+        return {"error": f"unknown layer(s): {', '.join(unknown)}"}, 400
+    try:
+        state = decode_changes_cursor(request.args["since"]) if request.args.get("since") else None
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    return json_response(changes_since(state, layers))
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
+
+from ..services.clusters import cluster_index
+from ..services.encoded import json_response
+from ..services.layers import feature_collection, get_view, iter_features
+from ..services.registry import LAYERS
+from ..services.spatial import parse_bbox
+
+bp = Blueprint("clusters", __name__)
+
+WORLD = (-180.0, -85.0511, 180.0, 85.0511)
+
+
+@bp.get("/<layer>")
+def clusters(layer: str) -> ResponseReturnValue:
+    if layer not in LAYERS:
+        return {"error": "unknown layer"}, 404
+    if LAYERS[layer][1] == "LineString":
+        return {"error": "clusters are only available for point layers"}, 400
+    try:
+        zoom = int(request.args.get("zoom", "0"))
+    except ValueError:
+        return {"error": "zoom must be an integer"}, 400
+    try:
+        bbox = parse_bbox(request.args["bbox"]) if request.args.get("bbox") else WORLD
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    view = get_view(layer)
+    index = cluster_index(view)
+    # only the single points in view are built as features
+    features = index.query(zoom, bbox, lambda positions: iter_features(view, positions))
+    return json_response(feature_collection(features, meta={"zoom": zoom, **index.as_meta()}))
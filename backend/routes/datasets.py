@@ -1,22 +1,50 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, make_response, request, current_app
+from flask import Blueprint, jsonify, request, current_app
 from pathlib import Path
 import json, glob
+import threading
+from typing import Any
 
 from .. import cache
-from ..services.datasets import get_bundle
+from ..services.datasets import bundle_key, get_bundle, iter_bundle
+from ..services.encoded import json_response, stream_response
 
 bp = Blueprint("datasets", __name__)
 
 
+def _streamed() -> bool:
+    return request.args.get("stream") in ("1", "true")
+
+
+def _include() -> list[str] | None:
+    include = request.args.get("include")
+    return sorted({p.strip() for p in include.split(",") if p.strip()}) if include else None
+
+
+# latest cache key per include set: an entry its version superseded is
+# deleted, as nothing expires it
+_latest_keys: dict[tuple[str, ...], str] = {}
+_latest_lock = threading.Lock()
+
+
+def _bundle_key(*args: Any, **kwargs: Any) -> str:
+    include = _include()
+    key = bundle_key(include)
+    with _latest_lock:
+        previous = _latest_keys.get(tuple(include or ()))
+        _latest_keys[tuple(include or ())] = key
+    if previous is not None and previous != key:
+        cache.delete(previous)
+    return key
+
+
 @bp.get("/")
-@cache.cached()
+# keyed by every included layer's dataset and overlay version, so no TTL
+@cache.cached(timeout=0, make_cache_key=_bundle_key, unless=_streamed)
 def datasets_bundle():
-    include = request.args.get("include")
-    parts = [p.strip() for p in include.split(",")] if include else None
-    data = get_bundle(parts)
-    resp = make_response(jsonify(data))
+    parts = _include()
+    resp = stream_response(iter_bundle(parts)) if _streamed() else json_response(get_bundle(parts))
     resp.headers["Cache-Control"] = "public, max-age=300"
     return resp
 
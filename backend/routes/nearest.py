@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
+
+from ..services.encoded import json_response
+from ..services.layers import feature_collection, get_view, iter_features
+from ..services.nearest import nearest_index, status_mask, with_distance
+from ..services.registry import LAYERS
+
+bp = Blueprint("nearest", __name__)
+
+DEFAULT_K = 5
+MAX_K = 100
+MAX_ORIGINS = 10_000
+
+
+def _layer(raw: Any) -> str:
+    layer = raw or "health"
+    if layer not in LAYERS:
+        raise ValueError(f"unknown layer: {layer}")
+    if LAYERS[layer][1] == "LineString":
+        raise ValueError("nearest is only available for point layers")
+    return layer
+
+
+def _k(raw: Any) -> int:
+    if raw in (None, ""):
+        return DEFAULT_K
+    try:
+        k = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("k must be a positive integer") from None
+    if k < 1:
+        raise ValueError("k must be a positive integer")
+    return min(k, MAX_K)
+
+
+def _lonlat(lon: Any, lat: Any) -> tuple[float, float]:
+    try:
+        lon, lat = float(lon), float(lat)
+    except (TypeError, ValueError):
+        raise ValueError("lat and lon must be numbers") from None
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        raise ValueError("lat/lon out of range")
+    return lon, lat
+
+
+def _origin(raw: Any) -> tuple[float, float]:
+    if isinstance(raw, dict):
+        return _lonlat(raw.get("lon"), raw.get("lat"))
+    if isinstance(raw, list) and len(raw) == 2:
+        return _lonlat(*raw)
+    raise ValueError("origins must be [lon, lat] pairs or {lat, lon} objects")
+
+
+def _statuses(raw: Any) -> list[str]:
+    if isinstance(raw, list):
+        return [str(s).strip() for s in raw]
+    return [s.strip() for s in (raw or "").split(",")]
+
+
+@bp.get("/nearest")
+def nearest() -> ResponseReturnValue:
+    args = request.args
+    try:
+        layer = _layer(args.get("layer"))
+        k = _k(args.get("k"))
+        lon, lat = _lonlat(args.get("lon"), args.get("lat"))
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    view = get_view(layer)
+    mask = status_mask(view, _statuses(args.get("status")))
+    metres, positions = nearest_index(view).query(lon, lat, k, mask)
+    found = iter_features(view, positions.tolist())
+    features = [with_distance(ft, d) for ft, d in zip(found, metres.tolist(), strict=True)]
+    meta = {"layer": layer, "origin": [lon, lat], "k": k}
+    return json_response(feature_collection(features, meta=meta))
+
+
+@bp.post("/nearest")
+def nearest_batch() -> ResponseReturnValue:
+    """
+    Many origins at once: ``{"origins": [[lon, lat], ...], "layer": ..., "k": ...,
+    "status": [...]}``. Results come back in origin order.
+    """
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict) or not isinstance(body.get("origins"), list):
+        return {"error": "expected a JSON object with an origins list"}, 400
+    try:
+        layer = _layer(body.get("layer"))
+        k = _k(body.get("k"))
+        if len(body["origins"]) > MAX_ORIGINS:
+            raise ValueError(f"at most {MAX_ORIGINS} origins per request")
+        origins = np.array([_origin(o) for o in body["origins"]], dtype=float).reshape(-1, 2)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    view = get_view(layer)
+    metres, positions = nearest_index(view).query_many(
+        origins, k, status_mask(view, _statuses(body.get("status")))
+    )
+    results = [
+        {
+            "origin": origin,
+            "features": [
+                with_distance(ft, d)
+                for ft, d in zip(iter_features(view, row_i), row_d, strict=True)
+            ],
+        }
+        for origin, row_d, row_i in zip(
+            origins.tolist(), metres.tolist(), positions.tolist(), strict=True
+        )
+    ]
+    return json_response({"layer": layer, "k": k, "results": results})
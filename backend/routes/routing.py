@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
+
+from ..services.encoded import json_response
+from ..services.layers import feature_collection, feature_ids, get_view, iter_features
+from ..services.nearest import status_mask
+from ..services.routing import (
+    ACCESS_SPEED_KMH,
+    CLOSED_STATUSES,
+    closed_nodes,
+    convex_hull,
+    facility_targets,
+    reachable,
+    road_graph,
+    route,
+    route_cache,
+)
+
+bp = Blueprint("routing", __name__)
+
+DEFAULT_MINUTES = (5, 10, 15, 30)
+MAX_MINUTES = 120
+
+
+def _lonlat(args: Any) -> tuple[float, float]:
+    try:
+        lon, lat = float(args.get("lon")), float(args.get("lat"))
+    except (TypeError, ValueError):
+        raise ValueError("lat and lon must be numbers") from None
+    if not (-180 <= lon <= 180 and -90 <= lat <= 90):
+        raise ValueError("lat/lon out of range")
+    return lon, lat
+
+
+def _csv(raw: str | None, default: tuple[str, ...] = ()) -> tuple[str, ...]:
+    values = tuple(sorted(v.strip() for v in (raw or "").split(",") if v.strip()))
+    return values or default
+
+
+def _minutes(raw: str | None) -> list[float]:
+    try:
+        minutes = (
+            sorted({float(m) for m in _csv(raw)}) if raw else [float(m) for m in DEFAULT_MINUTES]
+        )
+    except ValueError:
+        raise ValueError("minutes must be a comma-separated list of numbers") from None
+    if not minutes or minutes[0] <= 0 or minutes[-1] > MAX_MINUTES:
+        raise ValueError(f"minutes must be between 0 and {MAX_MINUTES}")
+    return minutes
+
+
+def _context(args: Any) -> tuple[Any, ...]:
+    network = get_view("checkpoints")
+    graph = road_graph(network)
+    if not graph.size:
+        raise LookupError("no road network loaded")
+    blocked = closed_nodes(network, _csv(args.get("avoid"), CLOSED_STATUSES))
+    return network, graph, blocked
+
+
+@bp.get("/route")
+def shortest_route() -> ResponseReturnValue:
+    """
+    Fastest route from ``lat``/``lon`` to the nearest health facility that
+    passes ``status=``, avoiding checkpoints whose status is in ``avoid=``
+    (default: closed).
+    """
+    args = request.args
+    try:
+        lon, lat = _lonlat(args)
+        network, graph, blocked = _context(args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except LookupError as e:
+        return {"error": str(e)}, 503
+
+    health = get_view("health")
+    statuses = _csv(args.get("status"))
+    origin, access_m = graph.snap(lon, lat)
+    key = ("route", network.dataset.version, health.version, blocked, statuses, origin)
+    found = route_cache.get(key)
+    if found is None:
+        targets = facility_targets(network, health)
+        found = route(graph, targets, origin, status_mask(health, statuses), blocked) or {}
+        route_cache.put(key, found)
+    if not found:
+        return {"error": "no facility reachable from this point"}, 404
+
+    access_s = access_m / (ACCESS_SPEED_KMH / 3.6)
+    # only the chosen facility is built; road ids come from the id column
+    facility = next(iter_features(health, [found["facility"]]))
+    road_ids = feature_ids(network.dataset, "roads")
+    coordinates = [[lon, lat], *found["coordinates"], facility["geometry"]["coordinates"][:2]]
+    leg = {
+        "type": "Feature",
+        "geometry": {"type": "LineString", "coordinates": coordinates},
+        "properties": {
+            "kind": "route",
+            "duration_s": round(found["seconds"] + access_s, 1),
+            "distance_m": round(found["metres"] + access_m, 1),
+            "facility_id": facility["properties"]["id"],
+            "road_ids": [road_ids[r] for r in found["roads"]],
+            "avoided_checkpoints": len(blocked),
+        },
+    }
+    return json_response(feature_collection([leg, facility]))
+
+
+@bp.get("/isochrones")
+def isochrones() -> ResponseReturnValue:
+    """
+    Travel-time bands (``minutes=5,10,15``) reachable from ``lat``/``lon`` over
+    the road network, avoiding checkpoints whose status is in ``avoid=``, with
+    the health facilities inside each band.
+    """
+    args = request.args
+    try:
+        lon, lat = _lonlat(args)
+        minutes = _minutes(args.get("minutes"))
+        network, graph, blocked = _context(args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    except LookupError as e:
+        return {"error": str(e)}, 503
+
+    health = get_view("health")
+    origin, access_m = graph.snap(lon, lat)
+    access_s = access_m / (ACCESS_SPEED_KMH / 3.6)
+    key = ("isochrones", network.dataset.version, blocked, origin, tuple(minutes))
+    times = route_cache.get(key)
+    if times is None:
+        times = reachable(graph, origin, 0.0, minutes[-1] * 60, blocked)
+        route_cache.put(key, times)
+    times = times + access_s
+
+    targets = facility_targets(network, health)
+    facility_ids = feature_ids(health.dataset, health.name)
+    on_network = targets.node >= 0
+    reached = np.where(on_network, times[np.maximum(targets.node, 0)] + targets.access_s, np.inf)
+    bands = []
+    for m in minutes:
+        inside = times <= m * 60
+        ring = convex_hull(map(tuple, graph.lonlat[inside].tolist()))
+        geometry = (
+            {"type": "Polygon", "coordinates": [ring]}
+            if len(ring) >= 4
+            else {"type": "MultiPoint", "coordinates": ring or [[lon, lat]]}
+        )
+        facilities = np.flatnonzero(reached <= m * 60)
+        bands.append(
+            {
+                "type": "Feature",
+                "geometry": geometry,
+                "properties": {
+                    "minutes": m,
+                    "nodes": int(inside.sum()),
+                    "facility_ids": [facility_ids[i] for i in facilities.tolist()],
+                },
+            }
+        )
+    meta = {"origin": [lon, lat], "avoided_checkpoints": len(blocked)}
+    return json_response(feature_collection(bands, meta=meta))
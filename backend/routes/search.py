@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from flask import Blueprint, request
+from flask.typing import ResponseReturnValue
+
+from ..services.encoded import json_response
+from ..services.layers import feature_collection
+from ..services.pagination import parse_limit
+from ..services.registry import LAYERS
+from ..services.search import search
+
+bp = Blueprint("search", __name__)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+@bp.get("/search")
+def search_names() -> ResponseReturnValue:
+    query = request.args.get("q", "").strip()
+    parts = request.args.get("layers", "").split(",")
+    layers = [part.strip() for part in parts if part.strip()] or list(LAYERS)
+    unknown = [layer for layer in layers if layer not in LAYERS]
+    if unknown:
+        return {"error": f"unknown layer(s): {', '.join(unknown)}"}, 400
+    try:
+        limit = parse_limit(request.args.get("limit"), MAX_LIMIT) or DEFAULT_LIMIT
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    features = search(query, layers, limit) if query else []
+    return json_response(feature_collection(features, meta={"q": query, "layers": layers}))
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from flask import Blueprint, Response, current_app, request
+from flask.typing import ResponseReturnValue
+
+from ..services.broadcast import broadcaster, parse_stream_args, sse_frames
+
+bp = Blueprint("stream", __name__)
+
+
+@bp.get("/stream")
+def stream() -> ResponseReturnValue:
+    """
+    Server-Sent Events: one ``update`` event per accepted status update,
+    optionally limited to ``categories=`` and features inside ``bbox=``.
+    Reconnects resume from Last-Event-ID; a ``reset`` event means updates
+    were missed and the layers should be refetched. Each open stream holds a
+    worker thread here; ``backend.asgi`` serves the same endpoint on an
+    event loop for large numbers of idle clients.
+    """
+    try:
+        categories, bbox = parse_stream_args(request.args)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    b = broadcaster(app)
+    last_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    sub, replay = b.subscribe(categories, bbox, last_id)
+    frames = sse_frames(b, sub, replay, app.config["STREAM_HEARTBEAT"])
+    return Response(
+        frames,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
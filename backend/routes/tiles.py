@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from flask import Blueprint, Response
+from flask.blueprints import BlueprintSetupState
+from flask.typing import ResponseReturnValue
+
+from ..services.encoded import send_encoded
+from ..services.layers import get_view
+from ..services.registry import LAYERS
+from ..services.tiles import get_tile, tile_cache
+
+bp = Blueprint("tiles", __name__)
+
+MAX_ZOOM = 22
+
+
+@bp.record_once
+def _configure(state: BlueprintSetupState) -> None:
+    tile_cache.maxsize = state.app.config["TILE_CACHE_SIZE"]
+
+
+@bp.get("/<layer>/<int:z>/<int:x>/<int:y>.mvt")
+def tile(layer: str, z: int, x: int, y: int) -> ResponseReturnValue:
+    if layer not in LAYERS:
+        return {"error": "unknown layer"}, 404
+    if z > MAX_ZOOM or x >= 2**z or y >= 2**z:
+        return {"error": "tile out of range"}, 404
+
+    body = get_tile(get_view(layer), z, x, y)
+    if not body.raw:
+        return Response(status=204)
+    return send_encoded(body)
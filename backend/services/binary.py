@@ -0,0 +1,188 @@
+"""
+Binary snapshots of the GeoJSON datasets, memory-mapped by the API.
+
+The pipelines write ``<data>.bin`` next to each dataset: its layers already
+split and id'd, with coordinates as one flat float64 array per layer plus
+offsets (feature -> parts -> rings -> vertices) and properties as
+dictionary-encoded columns over one table of distinct values. Workers map
+the file read-only, so every process on the host shares a single copy in
+the page cache, and a cold start decodes arrays instead of parsing JSON.
+
+The arrays are those of a FeatureStore (services.feature_store), so a store
+over a mapped snapshot copies nothing. The layout is an 8-byte magic, the
+little-endian length of a JSON header, the header, then 8-byte aligned
+arrays it locates by (offset, dtype, shape).
+A snapshot is only used while its content key matches the dataset's
+sidecar; the registry falls back to the JSON otherwise.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .feature_store import FeatureStore, ValueTable
+
+MAGIC = b"AIDBIN\x00\x01"
+ALIGN = 8
+
+# per-layer arrays, as FeatureStore holds them
+LAYER_ARRAYS = ("geom_type", "geom_offsets", "part_offsets", "ring_offsets", "coords", "schema")
+
+
+def binary_path(data_path: str | Path) -> Path:
+    return Path(str(data_path) + ".bin")
+
+
+def encode(layers: dict[str, list[dict[str, Any]]], key: str) -> bytes:
+    """Snapshot bytes of already split and id'd ``layers``; raises ValueError."""
+    table = ValueTable()
+    arrays: list[tuple[str, np.ndarray]] = []
+    header: dict[str, Any] = {"content_key": key, "layers": {}}
+    for name, feats in layers.items():
+        store = FeatureStore.from_features(feats, table)
+        spec: dict[str, Any] = {"count": len(store)}
+        for field in LAYER_ARRAYS:
+            spec[field] = f"{name}.{field}"
+            arrays.append((spec[field], getattr(store, field)))
+        spec["schemas"] = [
+            [list(members), keys if keys is None else list(keys)] for members, keys in store.schemas
+        ]
+        spec["columns"] = []
+        for j, ((scope, k), codes) in enumerate(store.columns.items()):
+            spec["columns"].append([scope, k, f"{name}.col{j}"])
+            arrays.append((f"{name}.col{j}", codes))
+        header["layers"][name] = spec
+
+    blobs = [
+        json.dumps(v, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        for v in table.values
+    ]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    arrays.append(("values.offsets", offsets))
+    arrays.append(("values.blob", np.frombuffer(b"".join(blobs), dtype=np.uint8)))
+    header["values"] = {"offsets": "values.offsets", "blob": "values.blob"}
+
+    located: dict[str, list[Any]] = {}
+    pos = 0
+    for name, arr in arrays:
+        pos = -(-pos // ALIGN) * ALIGN
+        located[name] = [pos, arr.dtype.str, list(arr.shape)]
+        pos += arr.nbytes
+    header["arrays"] = located
+
+    raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    raw += b" " * (-(len(MAGIC) + 8 + len(raw)) % ALIGN)
+    out = bytearray(MAGIC + struct.pack("<Q", len(raw)) + raw)
+    start = len(out)
+    for name, arr in arrays:
+        out += b"\0" * (start + located[name][0] - len(out))
+        out += np.ascontiguousarray(arr).tobytes()
+    return bytes(out)
+
+
+def write_binary(
+    data_path: str | Path, layers: dict[str, list[dict[str, Any]]], key: str
+) -> str | None:
+    """
+    Write ``<data>.bin`` for the split and id'd ``layers`` of the dataset at
+    ``data_path`` whose content key is ``key``. Returns its path, or None
+    (and removes any stale snapshot) when the layers hold geometries the
+    format cannot represent.
+    """
+    target = binary_path(data_path)
+    try:
+        payload = encode(layers, key)
+    except (TypeError, ValueError):
+        target.unlink(missing_ok=True)
+        return None
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target.parent)) as tmp:
+        tmp.write(payload)
+        tmp_path = Path(tmp.name)
+    tmp_path.replace(target)
+    return str(target)
+
+
+class BinarySnapshot:
+    """A read-only mapping of one snapshot file; arrays are views into it."""
+
+    def __init__(self, path: str | Path) -> None:
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a dataset snapshot")
+        (size,) = struct.unpack_from("<Q", self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        self.header: dict[str, Any] = json.loads(self._map[start : start + size])
+        self._data = start + size
+        self._values: list[Any] | None = None
+
+    @property
+    def content_key(self) -> str:
+        return str(self.header["content_key"])
+
+    @property
+    def layer_names(self) -> list[str]:
+        return list(self.header["layers"])
+
+    def array(self, name: str) -> np.ndarray:
+        offset, dtype, shape = self.header["arrays"][name]
+        count = int(np.prod(shape)) if shape else 1
+        arr = np.frombuffer(self._map, dtype=dtype, count=count, offset=self._data + offset)
+        return arr.reshape(shape)
+
+    def layer_array(self, layer: str, field: str) -> np.ndarray:
+        """``field`` (coords, ring_offsets, geom_type...) of ``layer``."""
+        return self.array(self.header["layers"][layer][field])
+
+    def values(self) -> list[Any]:
+        """The decoded value table (built once; shared by every feature)."""
+        if self._values is None:
+            offsets = self.array(self.header["values"]["offsets"]).tolist()
+            blob = self.array(self.header["values"]["blob"]).tobytes()
+            self._values = [
+                json.loads(blob[a:b]) for a, b in zip(offsets[:-1], offsets[1:], strict=True)
+            ]
+        return self._values
+
+    def store(self, layer: str) -> FeatureStore:
+        """``layer`` as a FeatureStore whose arrays are views into the mapping."""
+        spec = self.header["layers"][layer]
+        return FeatureStore(
+            **{field: self.array(spec[field]) for field in LAYER_ARRAYS},
+            schemas=[
+                (tuple(members), None if keys is None else tuple(keys))
+                for members, keys in spec["schemas"]
+            ],
+            columns={(scope, key): self.array(name) for scope, key, name in spec["columns"]},
+            values=self.values(),
+        )
+
+    def features(self, layer: str) -> list[dict[str, Any]]:
+        """``layer`` as GeoJSON features, equal to the ones parsed from the JSON."""
+        return self.store(layer).features()
+
+
+def open_binary(
+    data_path: str | Path, key: str | None, layer_names: list[str]
+) -> BinarySnapshot | None:
+    """
+    The snapshot next to ``data_path`` if it was built from the dataset with
+    content key ``key`` and holds exactly ``layer_names``; else None.
+    """
+    if key is None:
+        return None
+    try:
+        snap = BinarySnapshot(binary_path(data_path))
+    except (OSError, ValueError, KeyError):
+        return None
+    if snap.content_key != key or sorted(snap.layer_names) != sorted(layer_names):
+        return None
+    return snap
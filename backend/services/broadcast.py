@@ -0,0 +1,315 @@
+"""
+Fan-out of accepted status updates to live subscribers (/api/v1/stream).
+
+One follower thread per process tails every category log (read_since), so
+an update accepted by any worker reaches the subscribers of all of them.
+Writes made in this process wake it at once; other processes are noticed
+within STREAM_POLL_INTERVAL. The follower applies each subscriber's filter
+and appends matching events to its queue: an idle subscriber is a deque
+and a condition (plus one suspended coroutine in the ASGI mode), not a
+poll loop of its own.
+
+An event's id is the position in every log just after it. A client
+reconnecting with Last-Event-ID has what it missed replayed from the logs,
+and live delivery resumes exactly where the replay stops.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from flask import Flask
+
+from .layers import get_view, id_index, spatial_index
+from .registry import LAYERS
+from .spatial import BBox, parse_bbox
+from .updates import CATEGORIES, log_position, read_since
+
+MAX_PENDING = 1000  # queued events per subscriber before it is told to reset
+MAX_REPLAY = 10_000
+RETRY_MS = 3000
+
+Position = tuple[int, int]
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    category: str
+    data: bytes
+    envelope: tuple[float, float, float, float] | None
+
+    def encode(self) -> bytes:
+        return b"id: " + self.id.encode() + b"\nevent: update\ndata: " + self.data + b"\n\n"
+
+
+def encode_event_id(positions: Mapping[str, Position]) -> str:
+    return ";".join(f"{c}={s}.{o}" for c, (s, o) in sorted(positions.items()))
+
+
+def decode_event_id(raw: str) -> dict[str, Position]:
+    """Raises ValueError for an id this server did not issue."""
+    out = {}
+    try:
+        for part in raw.split(";"):
+            cat, pos = part.split("=")
+            seg, off = pos.split(".")
+            out[cat] = (int(seg), int(off))
+    except ValueError:
+        raise ValueError("invalid Last-Event-ID") from None
+    return out
+
+
+def reset_frame(event_id: str) -> bytes:
+    """Tells the client it missed events and should refetch the layers."""
+    return b"id: " + event_id.encode() + b"\nevent: reset\ndata: {}\n\n"
+
+
+RETRY_FRAME = b"retry: %d\n\n" % RETRY_MS
+KEEPALIVE_FRAME = b": keepalive\n\n"
+
+
+def parse_stream_args(args: Mapping[str, str]) -> tuple[frozenset[str] | None, BBox | None]:
+    """``categories=`` (comma-separated) and ``bbox=``; raises ValueError."""
+    cats = frozenset(c.strip() for c in (args.get("categories") or "").split(",") if c.strip())
+    unknown = sorted(cats - set(CATEGORIES))
+    if unknown:
+        raise ValueError(f"unknown categor(y/ies): {', '.join(unknown)}")
+    bbox = parse_bbox(args["bbox"]) if args.get("bbox") else None
+    return cats or None, bbox
+
+
+class Subscription:
+    def __init__(
+        self,
+        categories: frozenset[str] | None,
+        bbox: BBox | None,
+        notify: Callable[[], None] | None = None,
+    ) -> None:
+        self.categories = categories
+        self.bbox = bbox
+        self.notify = notify  # extra wake-up hook (the ASGI mode's loop)
+        self.overflowed = False
+        self._pending: deque[Event] = deque()
+        self._cond = threading.Condition()
+
+    def wants(self, ev: Event) -> bool:
+        if self.categories is not None and ev.category not in self.categories:
+            return False
+        if self.bbox is None:
+            return True
+        env = ev.envelope
+        b = self.bbox
+        return (
+            env is not None
+            and env[0] <= b[2]
+            and env[2] >= b[0]
+            and env[1] <= b[3]
+            and env[3] >= b[1]
+        )
+
+    def push(self, ev: Event) -> None:
+        with self._cond:
+            if len(self._pending) >= MAX_PENDING:
+                self._pending.clear()
+                self.overflowed = True
+            else:
+                self._pending.append(ev)
+            self._cond.notify_all()
+        if self.notify is not None:
+            self.notify()
+
+    def take(self, timeout: float = 0.0) -> tuple[list[Event], bool]:
+        """(queued events, whether some were dropped), waiting up to ``timeout``."""
+        with self._cond:
+            if not self._pending and not self.overflowed and timeout > 0:
+                self._cond.wait(timeout)
+            events = list(self._pending)
+            self._pending.clear()
+            overflowed, self.overflowed = self.overflowed, False
+            return events, overflowed
+
+
+class Broadcaster:
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self.poll_interval = float(app.config.get("STREAM_POLL_INTERVAL", 1.0))
+        self._subs: set[Subscription] = set()
+        self._positions: dict[str, Position] = {}
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()  # one reader of the logs at a time
+        self._wake = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _path(self, category: str) -> Path:
+        return Path(self.app.config["UPDATES_DIR"]) / f"{category}.jsonl"
+
+    @property
+    def event_id(self) -> str:
+        with self._lock:
+            return encode_event_id(self._positions)
+
+    def wake(self) -> None:
+        self._wake.set()
+
+    def subscribe(
+        self,
+        categories: frozenset[str] | None = None,
+        bbox: BBox | None = None,
+        last_event_id: str | None = None,
+        notify: Callable[[], None] | None = None,
+    ) -> tuple[Subscription, list[Event] | None]:
+        """
+        A new subscription and the events it missed since ``last_event_id``
+        (None when they cannot be replayed and the client must reset). Starts
+        the follower thread if it is not running.
+        """
+        sub = Subscription(categories, bbox, notify)
+        with self._lock:
+            # added under the same lock the follower checks before it exits,
+            # so a subscriber is never left without one
+            self._subs.add(sub)
+            if self._thread is None:
+                self._positions = {c: log_position(self._path(c)) for c in CATEGORIES}
+                self._thread = threading.Thread(
+                    target=self._run, name="stream-follower", daemon=True
+                )
+                self._thread.start()
+            now = dict(self._positions)
+        replay: list[Event] | None = []
+        if last_event_id:
+            try:
+                replay = self._replay(sub, decode_event_id(last_event_id), now)
+            except ValueError:
+                replay = None
+        return sub, replay
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subs.discard(sub)
+
+    def _replay(
+        self, sub: Subscription, since: dict[str, Position], now: dict[str, Position]
+    ) -> list[Event] | None:
+        # a category not yet replayed is still at ``since``: an id issued
+        # mid-replay must not skip what is left of it
+        replayed = [c for c in sorted(now) if sub.categories is None or c in sub.categories]
+        running = {c: since.get(c, now[c]) if c in replayed else now[c] for c in now}
+        events: list[Event] = []
+        with self.app.app_context():
+            for cat in replayed:
+                if cat not in since:
+                    return None
+                found = read_since(self._path(cat), *since[cat])
+                if found is None:
+                    return None
+                for seg, off, upd in found[0]:
+                    if (seg, off) > now[cat]:
+                        break  # live delivery takes over from here
+                    running[cat] = (seg, off)
+                    ev = self._event(cat, upd, running)
+                    if sub.wants(ev):
+                        events.append(ev)
+                        if len(events) > MAX_REPLAY:
+                            return None
+                running[cat] = now[cat]
+        return events
+
+    def _event(
+        self, category: str, upd: dict[str, Any], positions: Mapping[str, Position]
+    ) -> Event:
+        envelope = None
+        if category in LAYERS and upd.get("id"):
+            view = get_view(category)
+            pos = id_index(view).get(str(upd["id"]))
+            if pos is not None:
+                env = spatial_index(view).envelopes[pos]
+                if env[0] == env[0]:  # NaN for an empty geometry
+                    x0, y0, x1, y1 = env.tolist()
+                    envelope = (x0, y0, x1, y1)
+        data = json.dumps(upd, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        return Event(encode_event_id(positions), category, data, envelope)
+
+    def poll(self) -> int:
+        """Read new log lines and hand them to subscribers; returns events read."""
+        read = 0
+        with self._poll_lock, self.app.app_context():
+            for cat in CATEGORIES:
+                path = self._path(cat)
+                with self._lock:
+                    start = self._positions.get(cat) or log_position(path)
+                found = read_since(path, *start)
+                if found is None:  # log truncated or pruned under us: skip to its end
+                    with self._lock:
+                        self._positions[cat] = log_position(path)
+                    continue
+                for seg, off, upd in found[0]:
+                    with self._lock:
+                        self._positions[cat] = (seg, off)
+                        positions = dict(self._positions)
+                        subs = list(self._subs)
+                    ev = self._event(cat, upd, positions)
+                    for sub in subs:
+                        if sub.wants(ev):
+                            sub.push(ev)
+                    read += 1
+                with self._lock:
+                    self._positions[cat] = (found[1], found[2])
+        return read
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._subs:
+                    self._thread = None
+                    return
+            try:
+                self.poll()
+            except Exception:  # keep serving; the next poll retries from the same position
+                self.app.logger.exception("stream follower failed")
+
+
+def broadcaster(app: Flask) -> Broadcaster:
+    """The app's broadcaster, created on first use."""
+    b: Broadcaster = app.extensions.get("broadcaster") or app.extensions.setdefault(
+        "broadcaster", Broadcaster(app)
+    )
+    return b
+
+
+def notify_write(app: Flask) -> None:
+    """Wake the follower after a local write, if anyone is streaming."""
+    b = app.extensions.get("broadcaster")
+    if b is not None:
+        b.wake()
+
+
+def sse_frames(
+    b: Broadcaster, sub: Subscription, replay: Iterable[Event] | None, heartbeat: float
+) -> Iterable[bytes]:
+    """Blocking SSE body for the WSGI route; unsubscribes when the client goes away."""
+    try:
+        yield RETRY_FRAME
+        if replay is None:
+            yield reset_frame(b.event_id)
+        else:
+            for ev in replay:
+                yield ev.encode()
+        while True:
+            events, overflowed = sub.take(heartbeat)
+            if overflowed:
+                yield reset_frame(b.event_id)
+            elif not events:
+                yield KEEPALIVE_FRAME
+            for ev in events:
+                yield ev.encode()
+    finally:
+        b.unsubscribe(sub)
@@ -0,0 +1,263 @@
+"""
+Streaming parser for admin bulk uploads (CSV, JSONL or a JSON array).
+
+Rows are read straight off the request stream, validated one at a time and
+handed on in batches, so memory stays at one batch plus the rejection
+report no matter how large the upload is. The report lists the first
+MAX_REPORTED rejections in full and counts the rest.
+"""
+
+from __future__ import annotations
+
+import codecs
+import csv
+import io
+import json
+import re
+from collections.abc import Callable, Collection, Iterator
+from datetime import UTC, datetime
+from typing import IO, Any
+
+BATCH_SIZE = 1000
+MAX_REPORTED = 1000
+READ_SIZE = 1 << 16
+MAX_ROW_SIZE = 1 << 20
+REQUIRED = ("id", "status", "verified_at")
+CSV_FIELDS = ("name", "notes", "priority", "source", "reporter")
+
+# already in the canonical form the log stores: validate, do not re-render
+_CANONICAL_TS = re.compile(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(?:\.\d{1,6})?Z")
+
+
+def normalize_ts(ts: str) -> str:
+    """``ts`` as UTC ISO-8601 with a Z suffix; raises ValueError."""
+    if not isinstance(ts, str):
+        raise ValueError("verified_at must be ISO-8601, e.g. 2025-08-19T13:45:00Z")
+    try:
+        if _CANONICAL_TS.fullmatch(ts):
+            datetime.fromisoformat(ts[:-1])  # range check only
+            return ts
+        dt = datetime.fromisoformat(ts[:-1] + "+00:00" if ts.endswith("Z") else ts)
+    except ValueError:
+        raise ValueError("verified_at must be ISO-8601, e.g. 2025-08-19T13:45:00Z") from None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC)
+    return dt.replace(tzinfo=None).isoformat() + "Z"
+
+
+class _Prefixed(io.RawIOBase):
+    """``stream`` with ``head`` (bytes already read from it) put back in front."""
+
+    def __init__(self, head: bytes, stream: IO[bytes]) -> None:
+        self.head, self.stream = head, stream
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buf: Any) -> int:
+        if self.head:
+            n = min(len(buf), len(self.head))
+            buf[:n], self.head = self.head[:n], self.head[n:]
+            return n
+        data = self.stream.read(len(buf))
+        buf[: len(data)] = data
+        return len(data)
+
+
+def open_upload(stream: IO[bytes]) -> tuple[str, IO[str]] | None:
+    """
+    (kind, text stream) for an upload: "array" when it starts with '[',
+    "jsonl" with '{', otherwise "csv". None when it is blank.
+    """
+    head = b""
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            return None
+        head += chunk
+        stripped = head.lstrip(codecs.BOM_UTF8).lstrip()
+        if stripped:
+            break
+    kind = {ord("["): "array", ord("{"): "jsonl"}.get(stripped[0], "csv")
+    raw = io.BufferedReader(_Prefixed(head, stream), READ_SIZE)
+    return kind, io.TextIOWrapper(raw, encoding="utf-8-sig", errors="replace", newline="")
+
+
+def _iter_jsonl(text: IO[str]) -> Iterator[tuple[int, Any]]:
+    n = 0
+    while line := text.readline(MAX_ROW_SIZE + 1):
+        n += 1
+        if len(line) > MAX_ROW_SIZE:
+            # drop the rest of the line without holding it
+            while (rest := text.readline(READ_SIZE)) and not rest.endswith("\n"):
+                pass
+            yield n, ValueError(f"row longer than {MAX_ROW_SIZE} characters")
+            continue
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield n, json.loads(line)
+        except ValueError as e:
+            yield n, ValueError(f"invalid JSON: {e}")
+
+
+# what can open, close or separate an array element, outside strings / inside one
+_STRUCTURAL = re.compile(r'["\[\]{},]')
+_IN_STRING = re.compile(r'["\\]')
+
+
+def _element_end(
+    buf: str, i: int, depth: int, in_string: bool
+) -> tuple[int, tuple[int, int, bool]]:
+    """
+    Index of the top-level ',' or ']' closing the array element scanned from
+    ``i``, or -1 and the state to resume from once ``buf`` has grown.
+    """
+    while m := (_IN_STRING if in_string else _STRUCTURAL).search(buf, i):
+        c, i = m.group(), m.end()
+        if in_string:
+            if c == "\\":
+                i += 1
+            else:
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "[{":
+            depth += 1
+        elif depth and c in "]}":
+            depth -= 1
+        elif not depth and c in ",]":
+            return i - 1, (i, depth, in_string)
+    return -1, (i, depth, in_string)
+
+
+def _iter_array(text: IO[str]) -> Iterator[tuple[int, Any]]:
+    """
+    Elements of a top-level JSON array, decoded one at a time. Each element
+    is delimited by scanning for the next top-level ',' or ']' first, so a
+    malformed one is rejected on its own and parsing resumes after it; one
+    that runs past MAX_ROW_SIZE without closing ends the upload.
+    """
+    buf, pos, n = "", 0, 0
+    started = False
+
+    def fill() -> bool:
+        nonlocal buf, pos
+        chunk = text.read(READ_SIZE)
+        buf, pos = buf[pos:] + chunk, 0
+        return bool(chunk)
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,[]":
+            if buf[pos] == "[":
+                started = True
+            elif buf[pos] == "]":
+                return
+            pos += 1
+        if pos >= len(buf):
+            if not fill():
+                return
+            continue
+        if not started:
+            raise ValueError("JSON payload must be array or JSONL")
+
+        # find the end of the element, scanning as the buffer fills
+        end, state = _element_end(buf, pos, 0, False)
+        while end < 0:
+            if len(buf) - pos > MAX_ROW_SIZE:
+                yield n + 1, ValueError(f"array element longer than {MAX_ROW_SIZE} characters")
+                return
+            i, depth, in_string = state
+            i -= pos
+            if not fill():
+                end = len(buf)  # unterminated array: the element runs to EOF
+                break
+            end, state = _element_end(buf, i, depth, in_string)
+        n += 1
+        try:
+            obj: Any = json.loads(buf[pos:end])
+        except ValueError as e:
+            obj = ValueError(f"invalid JSON array element: {e}")
+        pos = end
+        yield n, obj
+
+
+def _iter_csv(text: IO[str]) -> Iterator[tuple[int, Any]]:
+    reader = csv.reader(text)
+    header = [h.strip().lower() for h in next(reader, [])]
+    if not set(REQUIRED).issubset(header):
+        raise ValueError("CSV must include headers: id,status,verified_at")
+    for n, values in enumerate(reader, 1):
+        if not any(v.strip() for v in values):
+            continue
+        row = dict(zip(header, values, strict=False))
+        obj: dict[str, Any] = {k: row.get(k) for k in REQUIRED}
+        obj.update({k: row.get(k) or None for k in CSV_FIELDS})
+        obj["tags"] = [t.strip() for t in (row.get("tags") or "").split("|") if t.strip()] or None
+        yield n, obj
+
+
+PARSERS: dict[str, Callable[[IO[str]], Iterator[tuple[int, Any]]]] = {
+    "array": _iter_array,
+    "jsonl": _iter_jsonl,
+    "csv": _iter_csv,
+}
+
+
+def validate(obj: Any, category: str, known_ids: Collection[str] | None) -> dict[str, Any]:
+    """The row as it will be logged; raises ValueError naming the problem."""
+    if isinstance(obj, Exception):
+        raise obj
+    if not isinstance(obj, dict):
+        raise ValueError("row must be a JSON object")
+    missing = [k for k in REQUIRED if not obj.get(k)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    obj["id"] = str(obj["id"])
+    if known_ids is not None and obj["id"] not in known_ids:
+        raise ValueError(f"unknown {category} id")
+    obj["verified_at"] = normalize_ts(obj["verified_at"])
+    obj["category"] = category
+    return obj
+
+
+def import_stream(
+    kind: str,
+    text: IO[str],
+    category: str,
+    known_ids: Collection[str] | None,
+    write_batch: Callable[[list[dict[str, Any]]], None],
+    *,
+    batch_size: int = BATCH_SIZE,
+) -> dict[str, Any]:
+    """
+    Parse, validate and hand accepted rows to ``write_batch`` ``batch_size`` at
+    a time. Returns {"appended", "rejected", "rejections", "truncated"}; a
+    malformed upload (bad CSV header, not an array) raises ValueError.
+    """
+    batch: list[dict[str, Any]] = []
+    appended = rejected = 0
+    rejections: list[dict[str, Any]] = []
+    for n, obj in PARSERS[kind](text):
+        try:
+            batch.append(validate(obj, category, known_ids))
+        except ValueError as e:
+            rejected += 1
+            if len(rejections) < MAX_REPORTED:
+                fid = obj.get("id") if isinstance(obj, dict) else None
+                rejections.append({"row": n, "id": fid, "error": str(e)})
+            continue
+        if len(batch) >= batch_size:
+            write_batch(batch)
+            appended += len(batch)
+            batch = []
+    if batch:
+        write_batch(batch)
+        appended += len(batch)
+    return {
+        "appended": appended,
+        "rejected": rejected,
+        "rejections": rejections,
+        "truncated": rejected > len(rejections),
+    }
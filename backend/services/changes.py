@@ -0,0 +1,241 @@
+"""
+Delta sync: which features changed since a client's cursor.
+
+Two sources feed it. Status overlays come from the updates logs, read from
+the byte position the cursor remembers; compaction renames the tail into a
+numbered segment without rewriting it, so (segment, offset) stays a valid,
+monotonic position. Base records come from ``<data>.changes.jsonl``, one
+line per pipeline run listing the ids it changed or removed, written by
+``record_base_diff`` next to the dataset.
+
+A cursor holds, per layer, [base records seen, segment, offset, content key
+of the build it was issued for]. Answering it reads only what was appended
+after that position, so the cost follows the number of changes, not the size
+of the layers. When the position can no longer be followed (a log was
+truncated, a segment pruned, or a dataset replaced outside the pipelines, so
+that the cursor's build is not where the records put it), the layer is
+listed under ``reset`` and the client refetches it in full.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from .layers import OVERLAY_CATEGORY, get_view, id_index, iter_features
+from .pagination import decode_cursor, encode_cursor
+from .registry import Dataset, build_key, split_layers
+from .updates import log_position, read_since, status_log, updates_path
+
+CURSOR_VERSION = "changes"
+
+
+# --- base dataset diffs, written at pipeline time ---------------------------
+
+
+def base_changes_path(data_path: str | Path) -> Path:
+    return Path(str(data_path) + ".changes.jsonl")
+
+
+@dataclass
+class Build:
+    """A dataset build as it was before a pipeline replaced it."""
+
+    features: list[dict[str, Any]]
+    key: str | None  # its content key, as the API reported it
+
+
+def read_build(data_path: str | Path) -> Build | None:
+    """The build currently at ``data_path``; None if there is none."""
+    try:
+        with open(data_path, encoding="utf-8") as f:
+            data = json.load(f)
+        key = build_key(str(data_path))
+    except (OSError, ValueError):
+        return None
+    return Build(data.get("features", []) if isinstance(data, dict) else [], key)
+
+
+def _read_records(data_path: str | Path) -> list[dict[str, Any]]:
+    try:
+        with base_changes_path(data_path).open(encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def diff_layers(
+    old: dict[str, list[dict[str, Any]]], new: dict[str, list[dict[str, Any]]]
+) -> dict[str, dict[str, list[str]]]:
+    """Per layer, ids added or modified in ``new`` and ids gone from it."""
+    out = {}
+    for layer, feats in new.items():
+        before = {
+            str(ft["properties"]["id"]): json.dumps(ft, sort_keys=True) for ft in old.get(layer, [])
+        }
+        after = {str(ft["properties"]["id"]): json.dumps(ft, sort_keys=True) for ft in feats}
+        out[layer] = {
+            "changed": sorted(fid for fid, body in after.items() if before.get(fid) != body),
+            "removed": sorted(before.keys() - after.keys()),
+        }
+    return out
+
+
+def record_base_diff(
+    data_path: str | Path,
+    previous: Build | None,
+    new_features: list[dict[str, Any]],
+    layers: Iterable[str],
+) -> dict[str, Any]:
+    """
+    Append the by-id diff between the ``previous`` build (read with
+    ``read_build`` before it was overwritten) and the one now at
+    ``data_path``. Call after write_meta_sidecar, which fixes the new
+    content key. A first build is recorded as a reset.
+    """
+    layers = list(layers)
+    records = _read_records(data_path)
+    record: dict[str, Any] = {
+        "seq": len(records) + 1,
+        "from": previous.key if previous is not None else None,
+        "to": build_key(str(data_path)),
+        "at": datetime.now(UTC).isoformat().replace("+00:00", "Z"),
+    }
+    if previous is None:
+        record["reset"] = True
+    else:
+        # split_layers assigns ids in place; leave the caller's features alone
+        record["layers"] = diff_layers(
+            split_layers(previous.features, layers),
+            split_layers(copy.deepcopy(new_features), layers),
+        )
+    with base_changes_path(data_path).open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return record
+
+
+def base_records(ds: Dataset) -> list[dict[str, Any]] | None:
+    """
+    Pipeline diff records up to the build ``ds`` holds, memoized per dataset
+    load. None when ``ds`` is not the last recorded build (swapped in by
+    hand, or loaded before its pipeline finished writing the record).
+    """
+    cached: list[dict[str, Any]] | None = ds.peek("base_changes")
+    if cached is not None:
+        return cached
+    records = _read_records(ds.path)
+    if records and records[-1]["to"] != ds.content_key:
+        return None
+    return ds.derive("base_changes", lambda: records)
+
+
+# --- status overlays, read from the updates logs ----------------------------
+
+
+def overlay_changes(path: Path, segment: int, offset: int) -> tuple[set[str], int, int] | None:
+    """
+    Ids written to the log at ``path`` after (segment, offset), and the
+    position after them; None when that position cannot be followed.
+    """
+    found = read_since(path, segment, offset)
+    if found is None:
+        return None
+    entries, segment, offset = found
+    return {str(u["id"]) for _, _, u in entries if u.get("id")}, segment, offset
+
+
+# --- the feed ---------------------------------------------------------------
+
+
+# per layer: base records seen, log segment, offset, content key of the build
+Position = tuple[int, int, int, str]
+
+
+def encode_changes_cursor(state: dict[str, Position]) -> str:
+    return encode_cursor(CURSOR_VERSION, json.dumps(state, separators=(",", ":"), sort_keys=True))
+
+
+def decode_changes_cursor(token: str) -> dict[str, Position | None]:
+    """
+    Raises ValueError for a malformed cursor. A layer whose position lacks
+    the build key (issued before cursors carried it) maps to None: reset.
+    """
+    try:
+        state = json.loads(decode_cursor(token, CURSOR_VERSION))
+        out: dict[str, Position | None] = {}
+        for k, pos in state.items():
+            seen, seg, off, *key = pos
+            out[str(k)] = (int(seen), int(seg), int(off), str(key[0])) if key else None
+        return out
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError("invalid cursor") from None
+
+
+def _base_followable(records: list[dict[str, Any]], seen: int, key: str, current: str) -> bool:
+    """
+    Whether the records after the first ``seen`` lead, diff by diff, from
+    ``key`` (the build the cursor was issued for) to the ``current`` build.
+    A build swapped in outside the pipelines breaks that chain.
+    """
+    if seen > len(records) or (seen and records[seen - 1]["to"] != key):
+        return False
+    for r in records[seen:]:
+        if r.get("reset") or r.get("from") != key:
+            return False
+        key = r["to"]
+    return key == current
+
+
+def changes_since(
+    state: dict[str, Position | None] | None, layers: Iterable[str]
+) -> dict[str, Any]:
+    """
+    Features of ``layers`` whose overlay or base record changed after the
+    cursor ``state`` (with their current status), ids removed from the base
+    data, layers to refetch, and the cursor to send next time. Without a
+    cursor only the current one is returned.
+    """
+    out: dict[str, Any] = {"layers": {}, "reset": []}
+    cursor: dict[str, Position] = {}
+    for layer in layers:
+        path = updates_path(OVERLAY_CATEGORY[layer])
+        prev = (state or {}).get(layer)
+        overlay = overlay_changes(path, prev[1], prev[2]) if prev is not None else None
+        # the view must include everything the new cursor moves past
+        status_log(path).refresh()
+        view = get_view(layer)
+        records = base_records(view.dataset)
+        if overlay is None:
+            seg, off = log_position(path)
+        else:
+            _, seg, off = overlay
+        cursor[layer] = (len(records or ()), seg, off, view.dataset.content_key)
+        if state is None:
+            continue
+        if (
+            prev is None
+            or overlay is None
+            or records is None
+            or not _base_followable(records, prev[0], prev[3], view.dataset.content_key)
+        ):
+            out["reset"].append(layer)
+            continue
+        changed = set(overlay[0])
+        removed: set[str] = set()
+        for r in records[prev[0] :]:
+            diff = r["layers"].get(layer, {})
+            changed |= set(diff.get("changed", ()))
+            removed |= set(diff.get("removed", ()))
+        ids = id_index(view)
+        out["layers"][layer] = {
+            # only the changed rows; over a snapshot the layer is never decoded
+            "features": list(iter_features(view, [ids[f] for f in sorted(changed) if f in ids])),
+            "removed": sorted(f for f in removed if f not in ids),
+        }
+    out["cursor"] = encode_changes_cursor(cursor)
+    return out
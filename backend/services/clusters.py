@@ -0,0 +1,232 @@
+"""
+Supercluster-style hierarchical point clustering.
+
+Points are projected to unit Web Mercator and clustered greedily from the
+deepest zoom upwards: each level groups the items of the level below that
+fall within ``RADIUS`` screen pixels, found with a KD-tree. Every point keeps
+its cluster id per level, so a status change is applied by moving one count
+per level instead of rebuilding the hierarchy.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import numpy as np
+
+from .facets import STATUS_FIELD
+from .kdtree import KDTree
+from .layers import (
+    LayerView,
+    base_store,
+    id_index,
+    iter_features,
+    on_view_change,
+    point_coords,
+    view_column,
+)
+
+MIN_ZOOM = 0
+MAX_ZOOM = 16  # above this every point is its own item
+RADIUS = 40  # px on a 256 px tile
+TILE_SIZE = 256
+
+
+def _status(value: Any) -> str:
+    return str(value or "unknown")
+
+
+def _project(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    lat = np.radians(np.clip(lat, -85.0511, 85.0511))
+    return np.column_stack([(lon + 180.0) / 360.0, (1 - np.arcsinh(np.tan(lat)) / math.pi) / 2])
+
+
+def _unproject(x: float, y: float) -> tuple[float, float]:
+    return x * 360.0 - 180.0, math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+
+
+class Level:
+    """Clusters of one zoom level."""
+
+    def __init__(
+        self, xy: np.ndarray, counts: np.ndarray, statuses: list[Counter[str]], member: np.ndarray
+    ) -> None:
+        self.xy = xy
+        self.counts = counts
+        self.statuses = statuses
+        self.tree = KDTree(xy)
+        # one (valid) point per cluster; exact for single-point clusters
+        self.representative = np.zeros(len(counts), dtype=np.int64)
+        self.representative[member] = np.arange(len(member))
+
+
+class ClusterIndex:
+    def __init__(self, features: list[dict[str, Any]]) -> None:
+        coords = np.array(
+            [
+                (ft.get("geometry") or {}).get("coordinates", [np.nan, np.nan])[:2]
+                for ft in features
+            ],
+            dtype=float,
+        ).reshape(-1, 2)
+        self._build(coords, [(ft.get("properties") or {}).get(STATUS_FIELD) for ft in features])
+
+    @classmethod
+    def from_columns(cls, coords: np.ndarray, statuses: Sequence[Any]) -> ClusterIndex:
+        """Hierarchy over (n, 2) lon/lat rows (NaN: no point) with their statuses."""
+        index = cls.__new__(cls)
+        index._build(coords, statuses)
+        return index
+
+    def _build(self, coords: np.ndarray, statuses: Sequence[Any]) -> None:
+        self.valid = np.flatnonzero(~np.isnan(coords).any(axis=1))
+        self.point_status = [_status(v) for v in statuses]
+        self.overlay_version: str | None = None
+        self._lock = threading.Lock()
+
+        xy = _project(coords[self.valid, 0], coords[self.valid, 1])
+        counts = np.ones(len(self.valid), dtype=np.int64)
+        statuses = [Counter({self.point_status[i]: 1}) for i in self.valid.tolist()]
+        # assign[z][j]: cluster of valid point j at zoom z
+        self.assign: dict[int, np.ndarray] = {}
+        member = np.arange(len(self.valid))
+        self.levels: dict[int, Level] = {MAX_ZOOM + 1: Level(xy, counts, statuses, member)}
+        for z in range(MAX_ZOOM, MIN_ZOOM - 1, -1):
+            below = self.levels[z + 1]
+            parent = self._cluster(below, RADIUS / (TILE_SIZE * 2**z))
+            n = int(parent.max()) + 1 if len(parent) else 0
+            w = below.counts
+            cnt = np.bincount(parent, weights=w, minlength=n).astype(np.int64)
+            cx = np.bincount(parent, weights=below.xy[:, 0] * w, minlength=n) / np.maximum(cnt, 1)
+            cy = np.bincount(parent, weights=below.xy[:, 1] * w, minlength=n) / np.maximum(cnt, 1)
+            st: list[Counter[str]] = [Counter() for _ in range(n)]
+            for child, p in enumerate(parent.tolist()):
+                st[p].update(below.statuses[child])
+            member = parent[member]
+            self.assign[z] = member
+            self.levels[z] = Level(np.column_stack([cx, cy]), cnt, st, member)
+
+    @staticmethod
+    def _cluster(level: Level, r: float) -> np.ndarray:
+        """Greedy radius clustering; returns the parent cluster of every item."""
+        parent = np.full(len(level.counts), -1, dtype=np.int64)
+        next_id = 0
+        # visit heavier items first so existing clusters absorb their neighbours
+        for i in np.argsort(-level.counts, kind="stable").tolist():
+            if parent[i] >= 0:
+                continue
+            near = level.tree.within(level.xy[i], r)
+            near = near[parent[near] < 0]
+            parent[near] = next_id
+            parent[i] = next_id
+            next_id += 1
+        return parent
+
+    def set_status(self, point: int, status: str) -> None:
+        """Move one point between status buckets on every level (O(levels))."""
+        old = self.point_status[point]
+        if old == status:
+            return
+        self.point_status[point] = status
+        j = int(np.searchsorted(self.valid, point))
+        if j >= len(self.valid) or self.valid[j] != point:
+            return
+        for z, level in self.levels.items():
+            c = j if z == MAX_ZOOM + 1 else int(self.assign[z][j])
+            bucket = level.statuses[c]
+            bucket[old] -= 1
+            if bucket[old] <= 0:
+                del bucket[old]
+            bucket[status] += 1
+
+    def sync(self, statuses: Callable[[], Iterable[tuple[int, Any]]], overlay_version: str) -> None:
+        """
+        Bring statuses in line with the (point, status) pairs ``statuses()``
+        yields, unless ``overlay_version`` is already applied.
+        """
+        with self._lock:
+            if self.overlay_version == overlay_version:
+                return
+            for i, status in statuses():
+                self.set_status(i, _status(status))
+            self.overlay_version = overlay_version
+
+    def query(
+        self,
+        zoom: int,
+        bbox: tuple[float, float, float, float],
+        points: Callable[[list[int]], Iterable[dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """
+        Clusters and single points at ``zoom`` inside ``bbox`` as GeoJSON
+        features; ``points`` builds the features at the given positions.
+        """
+        z = max(MIN_ZOOM, min(MAX_ZOOM + 1, zoom))
+        level = self.levels[z]
+        lo = _project(np.array([bbox[0]]), np.array([bbox[3]]))[0]
+        hi = _project(np.array([bbox[2]]), np.array([bbox[1]]))[0]
+        hits = np.sort(level.tree.range(lo, hi)).tolist()
+        singles = [c for c in hits if level.counts[c] == 1]
+        positions = self.valid[level.representative[singles]].tolist()
+        single = dict(zip(singles, points(positions), strict=True))
+        out = []
+        for c in hits:
+            if c in single:
+                out.append(single[c])
+                continue
+            lon, lat = _unproject(*level.xy[c])
+            out.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "Point", "coordinates": [lon, lat]},
+                    "properties": {
+                        "cluster": True,
+                        "cluster_id": f"{z}:{c}",
+                        "point_count": int(level.counts[c]),
+                        "status_counts": dict(level.statuses[c]),
+                    },
+                }
+            )
+        return out
+
+    def as_meta(self) -> dict[str, Any]:
+        return {"min_zoom": MIN_ZOOM, "max_zoom": MAX_ZOOM, "radius_px": RADIUS}
+
+
+def cluster_index(view: LayerView) -> ClusterIndex:
+    """Cluster hierarchy of a point layer, built once per dataset load."""
+    ds, name = view.dataset, view.name
+    index: ClusterIndex
+    if ds.binary is not None:
+        coords, store = point_coords(ds, name), base_store(ds, name)
+        index = ds.derive(
+            ("clusters", name),
+            lambda: ClusterIndex.from_columns(coords, store.column_values(STATUS_FIELD)),
+        )
+    else:
+        index = ds.derive(("clusters", name), lambda: ClusterIndex(ds.layers[name]))
+    # overlays that landed before the hierarchy existed or while nobody listened
+    index.sync(lambda: enumerate(view_column(view, STATUS_FIELD)), view.overlay_version)
+    return index
+
+
+@on_view_change
+def _apply_status_changes(view: LayerView, changed: set[str] | None) -> None:
+    if changed is None:
+        return
+    index = view.dataset.peek(("clusters", view.name))
+    if index is None:
+        return
+    ids = id_index(view)
+    positions = [ids[f] for f in changed if f in ids]
+
+    def statuses() -> Iterable[tuple[int, Any]]:
+        features = iter_features(view, positions)
+        props = ((ft.get("properties") or {}) for ft in features)
+        return zip(positions, (p.get(STATUS_FIELD) for p in props), strict=True)
+
+    index.sync(statuses, view.overlay_version)
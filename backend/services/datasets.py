@@ -1,60 +1,94 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import Any
 
 from flask import current_app
 
+from .encoded import dumps, iter_collection
+from .layers import LayerView, cache_key, feature_collection, feature_ids, get_view, iter_features
+from .registry import LAYERS
 
-def get_bundle(include: Iterable[str] | None = None) -> dict[str, Any]:
+# one task per source file; layers sharing a file come from the same parse
+_pool = ThreadPoolExecutor(
+    max_workers=len({spec[0] for spec in LAYERS.values()}), thread_name_prefix="bundle"
+)
+
+
+def _select(include: Iterable[str] | None) -> dict[str, str]:
     cfg = current_app.config
-    loaders = {
-        "health": lambda: _load_existing(cfg["HEALTH_FACILITIES_PATH"]),
-        "checkpoints": lambda: _extract_points(cfg["COMBINED_CHECKPOINTS_PATH"]),
-        "roads": lambda: _extract_lines(cfg["COMBINED_CHECKPOINTS_PATH"]),
-        "borders": lambda: _load_existing(cfg["BORDER_CROSSINGS_PATH"]),
+    sources = {
+        "health": Path(cfg["HEALTH_FACILITIES_PATH"]).stem,
+        "checkpoints": "checkpoints",
+        "roads": "roads",
+        "borders": Path(cfg["BORDER_CROSSINGS_PATH"]).stem,
     }
-    selected = loaders if not include else {k: v for k, v in loaders.items() if k in include}
+    return sources if not include else {k: v for k, v in sources.items() if k in include}
 
-    bundle: dict[str, Any] = {"data": {}, "meta": {"included": list(selected), "sources": {}}}
-    for key, fn in selected.items():
-        chunk = fn()
-        bundle["data"][key] = chunk["data"]
-        bundle["meta"]["sources"][key] = chunk["meta"]
-    return bundle
 
+def bundle_key(include: Iterable[str] | None = None) -> str:
+    """Versioned cache key of the bundle for ``include`` (order-insensitive)."""
+    selected = _select(include)
+    load_views(selected)  # cold start: parse the files side by side, not in key order
+    return cache_key("datasets", selected)
 
-# Helpers that read already-built files and wrap with consistent meta
-import json
-from pathlib import Path
 
+def load_views(layers: Iterable[str]) -> dict[str, LayerView]:
+    """
+    Overlaid views of ``layers`` (as the layer routes serve them). Each source
+    file is loaded on its own pool thread, so a cold start parses the files
+    side by side rather than one after another.
+    """
+    layers = list(layers)
+    by_file: dict[str, list[str]] = {}
+    for layer in layers:
+        by_file.setdefault(LAYERS[layer][0], []).append(layer)
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
 
-def _wrap(data: dict, path: str, source: str) -> dict[str, Any]:
-    feats = data.get("features", []) if isinstance(data, dict) else []
-    return {
-        "data": data,
-        "meta": {"source": source, "path": str(Path(path).resolve()), "records": len(feats)},
-    }
+    def load(group: list[str]) -> dict[str, LayerView]:
+        with app.app_context():
+            return {layer: get_view(layer) for layer in group}
 
+    if len(by_file) <= 1:
+        views = {layer: get_view(layer) for layer in layers}
+    else:
+        views = {}
+        for part in _pool.map(load, by_file.values()):
+            views.update(part)
+    return {layer: views[layer] for layer in layers}
 
-def _load_json(path: str) -> dict:
-    with open(path, encoding="utf-8") as f:
-        return json.load(f)
 
+def get_bundle(include: Iterable[str] | None = None) -> dict[str, Any]:
+    selected = _select(include)
+    bundle: dict[str, Any] = {"data": {}, "meta": {"included": list(selected), "sources": {}}}
+    for key, view in load_views(selected).items():
+        bundle["data"][key] = feature_collection(list(iter_features(view)))
+        bundle["meta"]["sources"][key] = _meta(view, selected[key])
+    return bundle
 
-def _extract_points(path: str) -> dict[str, Any]:
-    data = _load_json(path)
-    feats = [ft for ft in data.get("features", []) if ft.get("geometry", {}).get("type") == "Point"]
-    return _wrap({"type": "FeatureCollection", "features": feats}, path, "checkpoints")
 
+def iter_bundle(include: Iterable[str] | None = None) -> Iterator[bytes]:
+    """get_bundle serialized section by section and feature by feature."""
+    selected = _select(include)
+    views = load_views(selected)
+    meta: dict[str, Any] = {"included": list(selected), "sources": {}}
+    yield b'{"data":{'
+    for n, (key, view) in enumerate(views.items()):
+        meta["sources"][key] = _meta(view, selected[key])
+        yield (b"," if n else b"") + dumps(key) + b":"
+        yield from iter_collection(iter_features(view))
+    yield b'},"meta":' + dumps(meta) + b"}"
 
-def _extract_lines(path: str) -> dict[str, Any]:
-    data = _load_json(path)
-    feats = [
-        ft for ft in data.get("features", []) if ft.get("geometry", {}).get("type") == "LineString"
-    ]
-    return _wrap({"type": "FeatureCollection", "features": feats}, path, "roads")
 
+# Consistent meta for a layer, read off the registry's dataset; over a binary
+# snapshot neither this nor iter_features decodes the layer into dicts
 
-def _load_existing(path: str) -> dict[str, Any]:
-    return _wrap(_load_json(path), path, Path(path).stem)
+
+def _meta(view: LayerView, source: str) -> dict[str, Any]:
+    return {
+        "source": source,
+        "path": str(Path(view.dataset.path).resolve()),
+        "records": len(feature_ids(view.dataset, view.name)),
+    }
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from flask import Response, current_app, request, stream_with_context
+
+try:  # brotli ships with flask-compress; fall back to gzip-only without it
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def dumps(payload: Any) -> bytes:
+    """Compact UTF-8 JSON, the form every pre-encoded body is built from."""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def iter_collection(
+    features: Iterable[dict[str, Any]],
+    extra: dict[str, Any] | None = None,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Serialize a FeatureCollection feature by feature. The opening bytes go out
+    with the first feature; after that features are batched into chunks of
+    about ``chunk_size`` bytes, so memory stays bounded by one chunk.
+    """
+    buf = [b'{"type":"FeatureCollection","features":[']
+    size = 0
+    first = True
+    for ft in features:
+        piece = dumps(ft)
+        buf.append(piece if first else b"," + piece)
+        size += len(piece) + 1
+        if first or size >= chunk_size:
+            yield b"".join(buf)
+            buf, size = [], 0
+        first = False
+    buf.append(b"]")
+    for key, value in (extra or {}).items():
+        buf.append(b"," + dumps(key) + b":" + dumps(value))
+    buf.append(b"}")
+    yield b"".join(buf)
+
+
+def stream_response(chunks: Iterable[bytes]) -> Response:
+    """Chunked JSON response; flask-compress compresses it as it streams."""
+    return Response(stream_with_context(iter(chunks)), mimetype="application/json")
+
+
+class EncodedBody:
+    """
+    A JSON body plus its gzip/brotli encodings, keyed by a content hash.
+    Each encoding is produced at most once, on the first request that asks for it.
+    """
+
+    def __init__(self, raw: bytes, mimetype: str = "application/json") -> None:
+        self.raw = raw
+        self.mimetype = mimetype
+        self.digest = hashlib.sha256(raw).hexdigest()[:32]
+        self._encodings: dict[str, bytes] = {"identity": raw}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> EncodedBody:
+        return cls(dumps(payload))
+
+    def etag(self, encoding: str = "identity") -> str:
+        # strong validators differ per content-coding
+        return self.digest if encoding == "identity" else f"{self.digest}-{encoding}"
+
+    def encoded(self, encoding: str) -> bytes:
+        body = self._encodings.get(encoding)
+        if body is not None:
+            return body
+        with self._lock:
+            if encoding not in self._encodings:
+                self._encodings[encoding] = _compress(self.raw, encoding)
+            return self._encodings[encoding]
+
+
+def _compress(raw: bytes, encoding: str) -> bytes:
+    cfg = current_app.config
+    if encoding == "br":
+        out: bytes = brotli.compress(raw, quality=cfg.get("PRECOMPRESS_BR_LEVEL", 9))
+        return out
+    if encoding == "gzip":
+        return gzip.compress(raw, compresslevel=cfg.get("PRECOMPRESS_GZIP_LEVEL", 9), mtime=0)
+    raise ValueError(f"unsupported encoding {encoding!r}")
+
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """Compact JSON for per-query bodies; flask-compress handles their encoding."""
+    return Response(dumps(payload), status=status, mimetype="application/json")
+
+
+def _negotiate() -> str:
+    accepted = request.accept_encodings
+    if brotli is not None and accepted["br"]:
+        return "br"
+    if accepted["gzip"]:
+        return "gzip"
+    return "identity"
+
+
+def send_encoded(body: EncodedBody, cache_control: str = "public, no-cache") -> Response:
+    """
+    Serve ``body`` in the best encoding the client accepts, answering
+    If-None-Match with 304 when any encoding's ETag matches.
+    """
+    encoding = _negotiate()
+    if request.if_none_match and any(
+        request.if_none_match.contains(body.etag(enc)) for enc in ("identity", "gzip", "br")
+    ):
+        resp = Response(status=304)
+    else:
+        resp = Response(body.encoded(encoding), mimetype=body.mimetype)
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+    resp.set_etag(body.etag(encoding))
+    resp.headers["Cache-Control"] = cache_control
+    resp.vary.add("Accept-Encoding")
+    return resp
@@ -0,0 +1,302 @@
+"""
+Binary encodings of whole layers for clients on slow links.
+
+Layer endpoints negotiate one with ``format=`` or ``Accept``:
+
+- ``fgb``: FlatGeobuf, readable by GDAL, QGIS and flatgeobuf.js;
+- ``parquet``: GeoParquet (WKB geometry), for pandas/DuckDB/Arrow clients;
+- ``qbin``: this server's own compact format, below.
+
+FlatGeobuf and GeoParquet are written through geopandas (pyogrio, pyarrow:
+the "formats" extra); without them those formats answer 406. ``qbin``
+needs only numpy.
+
+qbin quantizes coordinates to QBIN_PRECISION decimals (about 0.1 m),
+delta-encodes them across the whole layer and stores every integer as a
+zigzag LEB128 varint, so consecutive road vertices take two or three bytes
+per axis instead of eleven characters. The layout is the magic, a format
+byte, the little-endian length of a JSON header, the header, then the
+sections it sizes. The header carries the distinct property values and the
+per-feature key orders of the FeatureStore it was encoded from; the
+sections hold, in order, geometry types (one byte each), parts per feature,
+rings per part, vertices per ring, the coordinate deltas (x, y
+interleaved), the schema of each feature, and each property column as
+code + 1 (0 where absent). ``decode_qbin`` is the reference decoder.
+
+The pipelines write the full-layer encodings next to each dataset, filed
+under its content key, and the API serves them as long as no status update
+hits a feature of the layer; otherwise it encodes the current view once per
+version.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import struct
+import tempfile
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .feature_store import FeatureStore
+
+# format -> (mimetype, file extension)
+FORMATS: dict[str, tuple[str, str]] = {
+    "fgb": ("application/flatgeobuf", "fgb"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "qbin": ("application/vnd.aid-dashboard.qbin", "qbin"),
+}
+ALIASES = {"flatgeobuf": "fgb", "geoparquet": "parquet"}
+JSON_MIMETYPES = ("application/json", "application/geo+json")
+
+QBIN_MAGIC = b"AIDQ"
+QBIN_VERSION = 1
+QBIN_PRECISION = 6
+
+
+class FormatUnavailable(Exception):
+    """The format's optional dependencies are not installed."""
+
+
+def negotiate(args: Mapping[str, str], accept: Any) -> str | None:
+    """
+    The binary format a request asks for, or None for GeoJSON. ``format=``
+    wins over ``Accept`` (werkzeug's MIMEAccept); raises ValueError for an
+    unknown ``format=``.
+    """
+    raw = (args.get("format") or "").strip().lower()
+    if raw:
+        fmt = ALIASES.get(raw, raw)
+        if fmt in ("json", "geojson"):
+            return None
+        if fmt not in FORMATS:
+            raise ValueError(f"format must be one of: json, {', '.join(FORMATS)}")
+        return fmt
+    # GeoJSON first, so */* and browsers keep getting JSON
+    offered = [*JSON_MIMETYPES, *(mime for mime, _ in FORMATS.values())]
+    best = accept.best_match(offered, default=JSON_MIMETYPES[0]) if accept else None
+    return next((fmt for fmt, (mime, _) in FORMATS.items() if mime == best), None)
+
+
+def export_path(data_path: str | Path, layer: str, key: str, fmt: str) -> Path:
+    return Path(f"{data_path}.{layer}.{key}.{FORMATS[fmt][1]}")
+
+
+# --- qbin -------------------------------------------------------------------
+
+
+def _zigzag(v: np.ndarray) -> np.ndarray:
+    v = v.astype(np.int64)
+    return ((v << 1) ^ (v >> 63)).astype(np.uint64)
+
+
+def _unzigzag(u: np.ndarray) -> np.ndarray:
+    return (u >> np.uint64(1)).astype(np.int64) ^ -(u & np.uint64(1)).astype(np.int64)
+
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128 encoding of unsigned ``values``, vectorized."""
+    v = np.asarray(values, dtype=np.uint64)
+    if not len(v):
+        return b""
+    nbytes = np.ones(len(v), dtype=np.int64)
+    for k in range(1, 10):
+        nbytes += v >= np.uint64(1 << (7 * k))
+    pos = np.zeros(len(v), dtype=np.int64)
+    np.cumsum(nbytes[:-1], out=pos[1:])
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max())):
+        m = nbytes > k
+        byte = (v[m] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        byte |= np.where(nbytes[m] > k + 1, np.uint64(0x80), np.uint64(0))
+        out[pos[m] + k] = byte.astype(np.uint8)
+    return out.tobytes()
+
+
+def decode_varints(data: bytes | memoryview) -> np.ndarray:
+    """Inverse of encode_varints."""
+    b = np.frombuffer(data, dtype=np.uint8)
+    if not len(b):
+        return np.zeros(0, dtype=np.uint64)
+    ends = np.flatnonzero(b < 0x80)
+    starts = np.zeros(len(ends), dtype=np.int64)
+    starts[1:] = ends[:-1] + 1
+    shift = (np.arange(len(b)) - np.repeat(starts, ends - starts + 1)) * 7
+    parts = (b & 0x7F).astype(np.uint64) << shift.astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def encode_qbin(store: FeatureStore, layer: str, precision: int = QBIN_PRECISION) -> bytes:
+    # only the values this store's columns refer to, renumbered densely
+    used = np.unique(
+        np.concatenate([c[c >= 0] for c in store.columns.values()] or [np.zeros(0, np.int32)])
+    )
+    remap = np.zeros(len(store.values) + 1, dtype=np.int64)
+    remap[used + 1] = np.arange(1, len(used) + 1)
+    columns = list(store.columns.items())
+
+    q = np.rint(store.coords * 10**precision).astype(np.int64).ravel()
+    deltas = np.diff(q.reshape(-1, 2), axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).ravel()
+    sections = [
+        store.geom_type.astype(np.uint8).tobytes(),
+        encode_varints(np.diff(store.geom_offsets)),
+        encode_varints(np.diff(store.part_offsets)),
+        encode_varints(np.diff(store.ring_offsets)),
+        encode_varints(_zigzag(deltas)),
+        encode_varints(store.schema),
+        *(encode_varints(remap[codes.astype(np.int64) + 1]) for _, codes in columns),
+    ]
+    header = {
+        "layer": layer,
+        "count": len(store),
+        "precision": precision,
+        "schemas": [
+            [list(members), keys if keys is None else list(keys)] for members, keys in store.schemas
+        ],
+        "columns": [[scope, key] for (scope, key), _ in columns],
+        "values": [store.values[c] for c in used.tolist()],
+        "sections": [len(s) for s in sections],
+    }
+    raw = json.dumps(header, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return QBIN_MAGIC + struct.pack("<BI", QBIN_VERSION, len(raw)) + raw + b"".join(sections)
+
+
+def decode_qbin(data: bytes) -> FeatureStore:
+    """A FeatureStore of the encoded layer; ``.features()`` gives GeoJSON back."""
+    if data[:4] != QBIN_MAGIC:
+        raise ValueError("not a qbin payload")
+    version, size = struct.unpack_from("<BI", data, 4)
+    if version != QBIN_VERSION:
+        raise ValueError(f"unsupported qbin version {version}")
+    start = 4 + struct.calcsize("<BI")
+    header = json.loads(data[start : start + size])
+    view = memoryview(data)[start + size :]
+    sections, pos = [], 0
+    for n in header["sections"]:
+        sections.append(view[pos : pos + n])
+        pos += n
+
+    def offsets(section: memoryview) -> np.ndarray:
+        counts = decode_varints(section).astype(np.int64)
+        out = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=out[1:])
+        return out
+
+    deltas = _unzigzag(decode_varints(sections[4])).reshape(-1, 2)
+    coords = np.cumsum(deltas, axis=0) / 10 ** header["precision"]
+    return FeatureStore(
+        geom_type=np.frombuffer(sections[0], dtype=np.uint8),
+        geom_offsets=offsets(sections[1]),
+        part_offsets=offsets(sections[2]),
+        ring_offsets=offsets(sections[3]),
+        coords=coords.reshape(-1, 2),
+        schema=decode_varints(sections[5]).astype(np.int32),
+        schemas=[(tuple(m), None if k is None else tuple(k)) for m, k in header["schemas"]],
+        columns={
+            (scope, key): decode_varints(section).astype(np.int32) - 1
+            for (scope, key), section in zip(header["columns"], sections[6:], strict=True)
+        },
+        values=header["values"],
+    )
+
+
+# --- FlatGeobuf / GeoParquet through geopandas -----------------------------
+
+
+def _frame(features: Iterable[dict[str, Any]]) -> Any:
+    """GeoDataFrame of ``features``; nested or mixed-type properties become JSON text."""
+    try:
+        import geopandas as gpd
+    except ImportError:
+        raise FormatUnavailable("geopandas is not installed") from None
+    features = list(features)
+    keys: dict[str, None] = {}
+    for ft in features:
+        keys.update(dict.fromkeys(ft.get("properties") or {}))
+    rows = [{k: (ft.get("properties") or {}).get(k) for k in keys} for ft in features]
+    for k in keys:
+        kinds = {type(r[k]) for r in rows if r[k] is not None}
+        if len(kinds) > 1 or kinds - {str, int, float, bool}:
+            for r in rows:
+                if r[k] is not None:
+                    r[k] = json.dumps(r[k], ensure_ascii=False, separators=(",", ":"))
+    flat = [
+        {"type": "Feature", "geometry": ft.get("geometry"), "properties": row}
+        for ft, row in zip(features, rows, strict=True)
+    ]
+    return gpd.GeoDataFrame.from_features(flat, crs="EPSG:4326", columns=[*keys, "geometry"])
+
+
+def encode_fgb(features: Iterable[dict[str, Any]]) -> bytes:
+    frame = _frame(features)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "layer.fgb")
+        try:
+            frame.to_file(path, driver="FlatGeobuf")
+        except ImportError:
+            raise FormatUnavailable("pyogrio (or fiona) is not installed") from None
+        return path.read_bytes()
+
+
+def encode_parquet(features: Iterable[dict[str, Any]]) -> bytes:
+    frame = _frame(features)
+    buf = io.BytesIO()
+    try:
+        frame.to_parquet(buf)
+    except ImportError:
+        raise FormatUnavailable("pyarrow is not installed") from None
+    return buf.getvalue()
+
+
+def encode(fmt: str, store: FeatureStore, layer: str) -> bytes:
+    """``store`` in ``fmt``; raises FormatUnavailable."""
+    if fmt == "qbin":
+        return encode_qbin(store, layer)
+    if fmt == "fgb":
+        return encode_fgb(store.iter_features())
+    if fmt == "parquet":
+        return encode_parquet(store.iter_features())
+    raise ValueError(f"unknown format {fmt!r}")
+
+
+def write_exports(
+    data_path: str | Path,
+    stores: Mapping[str, FeatureStore],
+    key: str,
+    formats: Iterable[str] = tuple(FORMATS),
+) -> dict[str, dict[str, str | None]]:
+    """
+    Write every layer of ``stores`` in ``formats`` next to the dataset, filed
+    under its content key, and remove older builds. A format whose
+    dependencies are missing is recorded as None.
+    """
+    data_path = Path(data_path)
+    out: dict[str, dict[str, str | None]] = {}
+    for layer, store in stores.items():
+        out[layer] = {}
+        for fmt in formats:
+            target = export_path(data_path, layer, key, fmt)
+            for old in data_path.parent.glob(f"{data_path.name}.{layer}.*.{FORMATS[fmt][1]}"):
+                if old != target:
+                    old.unlink(missing_ok=True)
+            try:
+                payload = encode(fmt, store, layer)
+            except FormatUnavailable:
+                out[layer][fmt] = None
+                continue
+            with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target.parent)) as tmp:
+                tmp.write(payload)
+                tmp_path = Path(tmp.name)
+            tmp_path.replace(target)
+            out[layer][fmt] = str(target)
+    return out
+
+
+def read_export(data_path: str | Path, layer: str, key: str, fmt: str) -> bytes | None:
+    try:
+        return export_path(data_path, layer, key, fmt).read_bytes()
+    except OSError:
+        return None
@@ -0,0 +1,134 @@
+"""
+Inverted attribute indexes for server-side filtering and facet counts.
+
+Every distinct value of a facet field maps to a boolean bitmap over the
+layer's features, so a filter is an OR of bitmaps within a field and an AND
+across fields. Values are bilingual strings such as ``"Clinic | عيادة"``;
+a filter matches the full value or either language part, case-insensitively.
+``SERVICES`` holds several ``+``-separated services per facility.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+FACET_FIELDS: dict[str, tuple[str, ...]] = {
+    "health": ("TYPE", "SERVICES", "GOVERNORATE", "REGION", "SUPERVISING", "URBANIZATION"),
+}
+STATUS_FIELD = "status"
+MULTI_VALUE_SEP = {"SERVICES": "+"}
+MISSING = "unknown"  # same bucket the cluster status counts use
+
+
+def _labels(field: str, value: Any) -> list[str]:
+    """Display values of one property; multi-valued fields are split and re-paired."""
+    if value is None or value == "":
+        return [MISSING]
+    text = str(value).strip()
+    sep = MULTI_VALUE_SEP.get(field)
+    if not sep:
+        return [text]
+    en, _, ar = (part.strip() for part in text.partition("|"))
+    en_parts = [p.strip() for p in en.split(sep) if p.strip()]
+    ar_parts = [p.strip() for p in ar.split(sep) if p.strip()]
+    if ar_parts and len(ar_parts) == len(en_parts):
+        return [f"{e} | {a}" for e, a in zip(en_parts, ar_parts, strict=True)]
+    return en_parts + ar_parts or [MISSING]
+
+
+def _keys(label: str) -> set[str]:
+    keys = {label.casefold()}
+    for part in label.split("|"):
+        if part.strip():
+            keys.add(part.strip().casefold())
+    return keys
+
+
+class FacetIndex:
+    def __init__(self, features: Sequence[dict[str, Any]], fields: Iterable[str]) -> None:
+        columns = {
+            field: [(ft.get("properties") or {}).get(field) for ft in features] for field in fields
+        }
+        self._build(len(features), columns)
+
+    @classmethod
+    def from_columns(cls, size: int, columns: Mapping[str, Sequence[Any]]) -> FacetIndex:
+        """Index over values already laid out per field, one per feature."""
+        index = cls.__new__(cls)
+        index._build(size, columns)
+        return index
+
+    def _build(self, size: int, columns: Mapping[str, Sequence[Any]]) -> None:
+        self.size = size
+        self.bitmaps: dict[str, dict[str, np.ndarray]] = {}
+        self.lookup: dict[str, dict[str, set[str]]] = {}
+        for field, values in columns.items():
+            rows: dict[str, list[int]] = {}
+            for i, value in enumerate(values):
+                for label in _labels(field, value):
+                    rows.setdefault(label, []).append(i)
+            bitmaps = {}
+            lookup: dict[str, set[str]] = {}
+            for label, positions in rows.items():
+                bm = np.zeros(self.size, dtype=bool)
+                bm[positions] = True
+                bitmaps[label] = bm
+                for key in _keys(label):
+                    lookup.setdefault(key, set()).add(label)
+            self.bitmaps[field] = bitmaps
+            self.lookup[field] = lookup
+
+    @property
+    def fields(self) -> list[str]:
+        return list(self.bitmaps)
+
+    def mask(self, field: str, wanted: Iterable[str]) -> np.ndarray:
+        """Features whose ``field`` matches any of ``wanted``."""
+        out = np.zeros(self.size, dtype=bool)
+        for value in wanted:
+            for label in self.lookup[field].get(value.strip().casefold(), ()):
+                out |= self.bitmaps[field][label]
+        return out
+
+    def counts(self, field: str, within: np.ndarray | None) -> dict[str, int]:
+        """Features per value of ``field`` among ``within`` (all when None)."""
+        out = {}
+        for label, bm in self.bitmaps[field].items():
+            n = int(bm.sum() if within is None else np.count_nonzero(bm & within))
+            if n:
+                out[label] = n
+        return dict(sorted(out.items(), key=lambda kv: (-kv[1], kv[0])))
+
+
+def parse_filters(args: Mapping[str, Any], fields: Iterable[str]) -> dict[str, list[str]]:
+    """Filter values per field from ``FIELD=`` or ``field=`` (repeated or comma-separated)."""
+    getlist = getattr(args, "getlist", lambda k: [args[k]] if k in args else [])
+    out: dict[str, list[str]] = {}
+    for field in fields:
+        raw = getlist(field) + (getlist(field.lower()) if field.lower() != field else [])
+        values = [v for item in raw for v in item.split(",") if v.strip()]
+        if values:
+            out[field] = values
+    return out
+
+
+def facet_counts(
+    indexes: Sequence[FacetIndex], masks: Mapping[str, np.ndarray], base: np.ndarray | None
+) -> dict[str, dict[str, int]]:
+    """
+    Disjunctive facet counts: each field is counted over the features that
+    pass every *other* filter (and ``base``), so a dropdown lists the values
+    still worth picking.
+    """
+    out = {}
+    for index in indexes:
+        for field in index.fields:
+            within = base
+            for other, m in masks.items():
+                if other != field:
+                    within = m if within is None else within & m
+            out[field] = index.counts(field, within)
+    return out
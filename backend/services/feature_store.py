@@ -0,0 +1,431 @@
+"""
+Columnar, array-backed representation of a layer.
+
+Coordinates of every feature live in one float64 (n, 2) array, located by
+offsets (feature -> parts -> rings -> vertices), instead of a list per
+vertex. Properties are dictionary-encoded: each key is an int32 column of
+codes into one table of distinct values (-1 where a feature lacks the key),
+so a value shared by thousands of features (a highway class, a tag bag) is
+stored once. Filters, bbox tests and projections work on the arrays and
+evaluate Python only once per distinct value; GeoJSON dicts are built only
+for the features being serialized.
+
+Binary snapshots (services.binary) store exactly these arrays, so a store
+over a mapped snapshot shares the page cache and copies nothing.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Collection, Iterable, Iterator, Mapping
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Any
+
+import numpy as np
+
+from .projection import Projection
+from .spatial import BBox
+
+# geometry type <-> code; 0 is a null geometry
+GEOM_TYPES = ("", "Point", "LineString", "Polygon", "MultiPoint", "MultiLineString", "MultiPolygon")
+GEOM_CODES = {t: i for i, t in enumerate(GEOM_TYPES) if t}
+
+# a column holds either a top-level feature member or a property
+FEATURE, PROPERTY = 0, 1
+
+# overlay fields added by services.updates, in the order it adds them
+STATUS_KEYS = (
+    ("status", "status"),
+    ("status_verified_at", "verified_at"),
+    ("status_source", "source"),
+    ("status_confidence", "confidence"),
+)
+
+Column = tuple[int, str]
+Schema = tuple[tuple[str, ...], "tuple[str, ...] | None"]  # feature members, property keys
+
+
+def _parts(gtype: str, coords: Any) -> list[list[list[Any]]]:
+    """Any geometry as parts -> rings -> vertices."""
+    if gtype == "Point":
+        return [[[coords]]]
+    if gtype in ("LineString", "MultiPoint"):
+        return [[coords]]
+    if gtype in ("Polygon", "MultiLineString"):
+        return [coords]
+    parts: list[list[list[Any]]] = coords  # MultiPolygon
+    return parts
+
+
+def _unparts(gtype: str, parts: list[list[list[Any]]]) -> Any:
+    if gtype == "Point":
+        return parts[0][0][0]
+    if gtype in ("LineString", "MultiPoint"):
+        return parts[0][0]
+    if gtype in ("Polygon", "MultiLineString"):
+        return parts[0]
+    return parts
+
+
+class ValueTable:
+    """Distinct property values, each stored once and referred to by code."""
+
+    def __init__(self, values: list[Any] | None = None) -> None:
+        self.values: list[Any] = values if values is not None else []
+        self._codes: dict[Any, int] = {}
+
+    @staticmethod
+    def _key(v: Any) -> Any:
+        if v is None or isinstance(v, (str, int, float)):
+            return (type(v), v)
+        return json.dumps(v, ensure_ascii=False, separators=(",", ":"))
+
+    def code(self, v: Any) -> int:
+        key = self._key(v)
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.values)
+            self.values.append(v)
+        return code
+
+
+@dataclass(frozen=True)
+class FeatureStore:
+    geom_type: np.ndarray  # uint8 (n,)
+    geom_offsets: np.ndarray  # int64 (n + 1,) into part_offsets
+    part_offsets: np.ndarray  # int64 (parts + 1,) into ring_offsets
+    ring_offsets: np.ndarray  # int64 (rings + 1,) into coords
+    coords: np.ndarray  # float64 (vertices, 2)
+    schema: np.ndarray  # int32 (n,) into schemas
+    schemas: list[Schema]
+    columns: dict[Column, np.ndarray]  # int32 (n,) codes into values, -1 absent
+    values: list[Any]
+
+    def __len__(self) -> int:
+        return len(self.geom_type)
+
+    # --- building ------------------------------------------------------------
+
+    @classmethod
+    def from_features(
+        cls, features: list[dict[str, Any]], table: ValueTable | None = None
+    ) -> FeatureStore:
+        """
+        Columnar copy of ``features``; ``table`` lets several layers share one
+        value table. Raises ValueError for geometries it cannot hold (anything
+        but 2D GeoJSON geometries with exactly type and coordinates).
+        """
+        table = table if table is not None else ValueTable()
+        n = len(features)
+        gtypes = np.zeros(n, dtype=np.uint8)
+        geom_off, part_off, ring_off = [0], [0], [0]
+        xy: list[Any] = []
+        columns: dict[Column, list[int]] = {}
+        schemas: dict[Schema, int] = {}
+        schema = np.zeros(n, dtype=np.int32)
+
+        def column(col: Column) -> list[int]:
+            codes = columns.get(col)
+            if codes is None:
+                codes = columns[col] = [-1] * n
+            return codes
+
+        for i, ft in enumerate(features):
+            geom = ft.get("geometry")
+            if geom is not None:
+                if set(geom) != {"type", "coordinates"} or geom["type"] not in GEOM_CODES:
+                    raise ValueError(f"unsupported geometry {sorted(geom)}")
+                gtypes[i] = GEOM_CODES[geom["type"]]
+                for part in _parts(geom["type"], geom["coordinates"]):
+                    for ring in part:
+                        if any(len(p) != 2 for p in ring):
+                            raise ValueError("only 2D coordinates are supported")
+                        xy.extend(ring)
+                        ring_off.append(len(xy))
+                    part_off.append(len(ring_off) - 1)
+            geom_off.append(len(part_off) - 1)
+
+            props = ft.get("properties")
+            keys = None if props is None else tuple(props)
+            schema[i] = schemas.setdefault((tuple(ft), keys), len(schemas))
+            for k in ft:
+                if k not in ("geometry", "properties"):
+                    column((FEATURE, k))[i] = table.code(ft[k])
+            for k, v in (props or {}).items():
+                column((PROPERTY, k))[i] = table.code(v)
+
+        return cls(
+            geom_type=gtypes,
+            geom_offsets=np.asarray(geom_off, dtype=np.int64),
+            part_offsets=np.asarray(part_off, dtype=np.int64),
+            ring_offsets=np.asarray(ring_off, dtype=np.int64),
+            coords=np.asarray(xy, dtype=np.float64).reshape(-1, 2),
+            schema=schema,
+            schemas=list(schemas),
+            columns={col: np.asarray(codes, dtype=np.int32) for col, codes in columns.items()},
+            values=table.values,
+        )
+
+    def _recode(self, codes: np.ndarray, fn: Callable[[Any], Any], values: list[Any]) -> np.ndarray:
+        """
+        ``codes`` with every distinct value v replaced by ``fn(v)``, appended
+        to ``values``; ``fn`` returns _ABSENT to drop the key.
+        """
+        present = codes >= 0
+        distinct = np.unique(codes[present])
+        lookup = np.full(len(self.values), -1, dtype=np.int32)
+        for code in distinct.tolist():
+            out = fn(self.values[code])
+            if out is not _ABSENT:
+                lookup[code] = len(values)
+                values.append(out)
+        return np.where(present, lookup[np.maximum(codes, 0)], -1).astype(np.int32)
+
+    # --- geometry --------------------------------------------------------------
+
+    @property
+    def vertex_offsets(self) -> np.ndarray:
+        """int64 (n + 1,): the vertices of feature i are coords[o[i]:o[i + 1]]."""
+        offsets: np.ndarray = self.ring_offsets[self.part_offsets[self.geom_offsets]]
+        return offsets
+
+    @property
+    def envelopes(self) -> np.ndarray:
+        """float64 (n, 4) minx, miny, maxx, maxy per feature; NaN when empty."""
+        starts = self.vertex_offsets
+        env = np.full((len(self), 4), np.nan)
+        nonempty = np.diff(starts) > 0
+        if nonempty.any():
+            at = starts[:-1][nonempty]
+            env[nonempty, 0:2] = np.minimum.reduceat(self.coords, at, axis=0)
+            env[nonempty, 2:4] = np.maximum.reduceat(self.coords, at, axis=0)
+        return env
+
+    def bbox(self, bbox: BBox, envelopes: np.ndarray | None = None) -> np.ndarray:
+        """Mask of features whose envelope intersects ``bbox``."""
+        env = self.envelopes if envelopes is None else envelopes
+        with np.errstate(invalid="ignore"):
+            return (
+                (env[:, 0] <= bbox[2])
+                & (env[:, 2] >= bbox[0])
+                & (env[:, 1] <= bbox[3])
+                & (env[:, 3] >= bbox[1])
+            )
+
+    # --- properties ------------------------------------------------------------
+
+    def _column(self, path: str) -> tuple[np.ndarray, str | None]:
+        top, _, sub = path.partition(".")
+        codes = self.columns.get((PROPERTY, top))
+        if codes is None:
+            codes = np.full(len(self), -1, dtype=np.int32)
+        return codes, sub or None
+
+    def where(self, path: str, predicate: Callable[[Any], bool]) -> np.ndarray:
+        """
+        Mask of features whose property at ``path`` (``tags.name`` reaches
+        into a nested bag) satisfies ``predicate``. It runs once per distinct
+        value, not once per feature; absent values never match.
+        """
+        codes, sub = self._column(path)
+        present = codes >= 0
+        table = np.zeros(len(self.values), dtype=bool)
+        for code in np.unique(codes[present]).tolist():
+            v = self.values[code]
+            if sub is not None:
+                if not isinstance(v, Mapping) or sub not in v:
+                    continue
+                v = v[sub]
+            table[code] = bool(predicate(v))
+        mask: np.ndarray = present & table[np.maximum(codes, 0)]
+        return mask
+
+    def isin(self, path: str, wanted: Collection[Any]) -> np.ndarray:
+        """Mask of features whose property at ``path`` equals one of ``wanted``."""
+        if not isinstance(wanted, (set, frozenset)):
+            wanted = list(wanted)
+        return self.where(path, lambda v: _hashable(v) and v in wanted)
+
+    def column_values(self, path: str) -> list[Any]:
+        """The property at ``path`` of every feature (None when absent)."""
+        codes, sub = self._column(path)
+        values = self.values
+        if sub is None:
+            return [values[c] if c >= 0 else None for c in codes.tolist()]
+        return [
+            values[c].get(sub) if c >= 0 and isinstance(values[c], Mapping) else None
+            for c in codes.tolist()
+        ]
+
+    def project(self, projection: Projection) -> FeatureStore:
+        """
+        The store with ``projection`` applied to every feature's properties
+        (as Projection.apply does), computed per distinct value. Geometry and
+        untouched columns are shared with this store.
+        """
+        values = list(self.values)
+        columns = dict(self.columns)
+        if projection.include is not None:
+            bare, subs = projection.included
+            for (scope, key), codes in self.columns.items():
+                if scope != PROPERTY or key in bare:
+                    continue
+                if key not in subs:
+                    del columns[(scope, key)]
+                    continue
+                columns[(scope, key)] = self._recode(
+                    codes, partial(_keep_subkeys, subs[key]), values
+                )
+        for path in projection.exclude:
+            top, _, sub = path.partition(".")
+            col = (PROPERTY, top)
+            if col not in columns:
+                continue
+            if not sub:
+                if top != "id":
+                    del columns[col]
+                continue
+            # recode against the (possibly already projected) values
+            staged = replace(self, columns=columns, values=values)
+            columns[col] = staged._recode(columns[col], partial(_drop_subkey, sub), values)
+
+        def keys_of(keys: tuple[str, ...] | None) -> tuple[str, ...] | None:
+            if keys is None:
+                return None
+            return tuple(k for k in keys if (PROPERTY, k) in columns)
+
+        schemas = [(members, keys_of(keys)) for members, keys in self.schemas]
+        return replace(self, schemas=schemas, columns=columns, values=values)
+
+    def with_updates(self, updates: Mapping[str, Mapping[str, Any]]) -> FeatureStore:
+        """The store with the status overlay of ``updates`` (by feature id) applied."""
+        ids = self.column_values("id")
+        hit = [(i, updates[fid]) for i, fid in enumerate(ids) if fid and fid in updates]
+        if not hit:
+            return self
+        table = ValueTable(list(self.values))
+        columns = dict(self.columns)
+        for key, field in STATUS_KEYS:
+            codes = columns.get((PROPERTY, key))
+            codes = np.full(len(self), -1, dtype=np.int32) if codes is None else codes.copy()
+            for i, upd in hit:
+                codes[i] = table.code(
+                    upd.get(field, "unknown") if field == "status" else upd.get(field)
+                )
+            columns[(PROPERTY, key)] = codes
+
+        schemas = list(self.schemas)
+        schema = self.schema.copy()
+        extended: dict[int, int] = {}
+        for i, _ in hit:
+            s = int(schema[i])
+            if s not in extended:
+                members, keys = schemas[s]
+                keys = keys or ()
+                new = (members, keys + tuple(k for k, _ in STATUS_KEYS if k not in keys))
+                if "properties" not in members:
+                    new = (members + ("properties",), new[1])
+                extended[s] = len(schemas)
+                schemas.append(new)
+            schema[i] = extended[s]
+        return replace(self, schema=schema, schemas=schemas, columns=columns, values=table.values)
+
+    # --- serialization ---------------------------------------------------------
+
+    def iter_features(
+        self, index: Iterable[int] | np.ndarray | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """
+        GeoJSON features (all, or those at ``index`` in that order), built one
+        at a time; values are shared with the store, so treat them as read-only.
+        """
+        if index is None:
+            sel = np.arange(len(self))
+        elif isinstance(index, np.ndarray) and index.dtype == bool:
+            sel = np.flatnonzero(index)
+        else:
+            sel = np.asarray(
+                list(index) if not isinstance(index, np.ndarray) else index, dtype=np.int64
+            )
+        # the selected features' vertices, gathered into one list conversion
+        vo = self.vertex_offsets
+        starts = vo[sel]
+        lengths = vo[sel + 1] - starts
+        base = np.zeros(len(sel) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=base[1:])
+        shift = starts - base[:-1]
+        if index is None:
+            xy = self.coords.tolist()
+        else:
+            xy = self.coords[np.repeat(shift, lengths) + np.arange(base[-1])].tolist()
+        rings, parts, geoms = (
+            self.ring_offsets.tolist(),
+            self.part_offsets.tolist(),
+            self.geom_offsets.tolist(),
+        )
+
+        values = self.values
+        cols = {col: codes[sel].tolist() for col, codes in self.columns.items()}
+        # per schema: feature members with their columns, property keys with theirs
+        shapes = [
+            (
+                [(k, cols.get((FEATURE, k))) for k in members],
+                None if keys is None else [(k, cols[(PROPERTY, k)]) for k in keys],
+            )
+            for members, keys in self.schemas
+        ]
+        gtypes, schema = self.geom_type[sel].tolist(), self.schema[sel].tolist()
+
+        for j, (i, sh) in enumerate(zip(sel.tolist(), shift.tolist(), strict=True)):
+            members, keys = shapes[schema[j]]
+            gtype = GEOM_TYPES[gtypes[j]]
+            if gtype:
+                nested = [
+                    [xy[rings[r] - sh : rings[r + 1] - sh] for r in range(parts[p], parts[p + 1])]
+                    for p in range(geoms[i], geoms[i + 1])
+                ]
+                geom: dict[str, Any] | None = {
+                    "type": gtype,
+                    "coordinates": _unparts(gtype, nested),
+                }
+            else:
+                geom = None
+            props = None
+            if keys is not None:
+                props = {}
+                for k, col in keys:
+                    c = col[j]
+                    if c >= 0:
+                        props[k] = values[c]
+            ft: dict[str, Any] = {}
+            for k, col in members:
+                if k == "geometry":
+                    ft[k] = geom
+                elif k == "properties":
+                    ft[k] = props
+                else:
+                    ft[k] = values[col[j]]
+            yield ft
+
+    def features(self, index: Iterable[int] | np.ndarray | None = None) -> list[dict[str, Any]]:
+        return list(self.iter_features(index))
+
+
+_ABSENT = object()
+
+
+def _keep_subkeys(keep: Collection[str], v: Any) -> Any:
+    if not isinstance(v, Mapping):
+        return _ABSENT
+    return {k: x for k, x in v.items() if k in keep} or _ABSENT
+
+
+def _drop_subkey(sub: str, v: Any) -> Any:
+    if isinstance(v, Mapping) and sub in v:
+        return {k: x for k, x in v.items() if k != sub}
+    return v
+
+
+def _hashable(v: Any) -> bool:
+    return v is None or isinstance(v, (str, int, float, bool, tuple))
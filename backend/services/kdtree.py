@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import heapq
+
+import numpy as np
+
+
+class KDTree:
+    """
+    Static KD-tree over ``points`` (n, d) with NumPy leaf buckets.
+
+    Nodes are implicit (kdbush-style): building sorts the point order in place
+    so every node's points are a contiguous slice ``order[lo:hi]`` split at the
+    median, and leaves of up to ``leaf_size`` points are scanned vectorized.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 32) -> None:
+        self.points = np.asarray(points, dtype=float)
+        self.n, self.dim = self.points.shape if self.points.size else (0, 2)
+        self.leaf_size = leaf_size
+        self.order = np.arange(self.n)
+        self._build(0, self.n, 0)
+        self.sorted = self.points[self.order]
+
+    def _build(self, lo: int, hi: int, depth: int) -> None:
+        stack = [(lo, hi, depth)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= self.leaf_size:
+                continue
+            axis = depth % self.dim
+            mid = (lo + hi) // 2
+            seg = self.order[lo:hi]
+            part = np.argpartition(self.points[seg, axis], mid - lo)
+            self.order[lo:hi] = seg[part]
+            stack.append((lo, mid, depth + 1))
+            stack.append((mid + 1, hi, depth + 1))
+
+    def range(self, lo_corner: np.ndarray, hi_corner: np.ndarray) -> np.ndarray:
+        """Indices of points inside the axis-aligned box [lo_corner, hi_corner]."""
+        out = []
+        stack = [(0, self.n, 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= self.leaf_size:
+                pts = self.sorted[lo:hi]
+                inside = ((pts >= lo_corner) & (pts <= hi_corner)).all(axis=1)
+                out.append(self.order[lo:hi][inside])
+                continue
+            axis = depth % self.dim
+            mid = (lo + hi) // 2
+            p = self.sorted[mid]
+            if (p >= lo_corner).all() and (p <= hi_corner).all():
+                out.append(self.order[mid : mid + 1])
+            if lo_corner[axis] <= p[axis]:
+                stack.append((lo, mid, depth + 1))
+            if hi_corner[axis] >= p[axis]:
+                stack.append((mid + 1, hi, depth + 1))
+        return np.concatenate(out) if out else np.empty(0, dtype=np.int64)
+
+    def within(self, center: np.ndarray, radius: float) -> np.ndarray:
+        """Indices of points within Euclidean ``radius`` of ``center``."""
+        center = np.asarray(center, dtype=float)
+        cand = self.range(center - radius, center + radius)
+        if not len(cand):
+            return cand
+        d2 = ((self.points[cand] - center) ** 2).sum(axis=1)
+        inside: np.ndarray = cand[d2 <= radius * radius]
+        return inside
+
+    def nearest(
+        self, point: np.ndarray, k: int = 1, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (distances, indices) of the ``k`` nearest points, closest first.
+        ``mask`` (bool per point) restricts the search to eligible points.
+        """
+        point = np.asarray(point, dtype=float)
+        best: list[tuple[float, int]] = []  # max-heap via negated distance
+        # (lower bound on squared distance, lo, hi, depth)
+        queue = [(0.0, 0, self.n, 0)]
+        while queue:
+            bound, lo, hi, depth = heapq.heappop(queue)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            if hi - lo <= self.leaf_size:
+                idx = self.order[lo:hi]
+                d2 = ((self.sorted[lo:hi] - point) ** 2).sum(axis=1)
+                if mask is not None:
+                    ok = mask[idx]
+                    idx, d2 = idx[ok], d2[ok]
+                for dist, i in zip(d2.tolist(), idx.tolist(), strict=True):
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, i))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, i))
+                continue
+            axis = depth % self.dim
+            mid = (lo + hi) // 2
+            p = self.sorted[mid]
+            i = int(self.order[mid])
+            if mask is None or mask[i]:
+                dist = float(((p - point) ** 2).sum())
+                if len(best) < k:
+                    heapq.heappush(best, (-dist, i))
+                elif dist < -best[0][0]:
+                    heapq.heapreplace(best, (-dist, i))
+            delta = float(point[axis] - p[axis])
+            near, far = ((lo, mid), (mid + 1, hi)) if delta < 0 else ((mid + 1, hi), (lo, mid))
+            heapq.heappush(queue, (bound, near[0], near[1], depth + 1))
+            heapq.heappush(queue, (max(bound, delta * delta), far[0], far[1], depth + 1))
+        best.sort(key=lambda t: -t[0])
+        return (
+            np.sqrt(np.array([-d for d, _ in best], dtype=float)),
+            np.array([i for _, i in best], dtype=np.int64),
+        )
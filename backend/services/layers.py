@@ -0,0 +1,523 @@
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+import numpy as np
+from flask import Response, current_app, request
+
+from .encoded import EncodedBody, iter_collection, send_encoded, stream_response
+from .exports import FORMATS, FormatUnavailable, encode as encode_export, negotiate, read_export
+from .facets import FACET_FIELDS, STATUS_FIELD, FacetIndex, facet_counts, parse_filters
+from .feature_store import FeatureStore
+from .lod import level_for, load_pyramid
+from .pagination import (
+    DEFAULT_LIMIT,
+    CursorExpired,
+    IdOrder,
+    decode_cursor,
+    encode_cursor,
+    parse_limit,
+)
+from .projection import Projection, from_args as projection_from_args
+from .registry import LAYERS, Dataset, get_dataset
+from .spatial import GridIndex, parse_bbox
+from .updates import apply_updates, iter_updates, patch_updates, status_log, updates_path
+
+T = TypeVar("T")
+
+# layer name -> updates category whose overlay applies to it
+OVERLAY_CATEGORY = {
+    "health": "health",
+    "checkpoints": "checkpoints",
+    "roads": "roads",
+    "borders": "borders",
+}
+
+
+@dataclass
+class LayerView:
+    """
+    Base features of a layer with the current status overlay applied. Over a
+    binary snapshot the merged dicts are only built when something reads
+    ``features``; the layer endpoints work from ``feature_store`` instead.
+    """
+
+    name: str
+    dataset: Dataset
+    overlay_version: str
+    updates: dict[str, dict[str, Any]] = field(default_factory=dict)
+    _features: list[dict[str, Any]] | None = field(default=None, repr=False)
+    _bodies: dict[Hashable, EncodedBody] = field(default_factory=dict, repr=False)
+    _derived: dict[Hashable, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def features(self) -> list[dict[str, Any]]:
+        if self._features is None:
+            base = self.dataset.layers[self.name]
+            self._features = apply_updates(base, self.updates, id_field="id")
+        return self._features
+
+    @property
+    def base_version(self) -> str:
+        return self.dataset.version
+
+    @property
+    def version(self) -> str:
+        return f"{self.base_version}.{self.overlay_version}"
+
+    def body(
+        self, variant: Hashable = None, build: Callable[[], Iterable[dict[str, Any]]] | None = None
+    ) -> EncodedBody:
+        """
+        Pre-encoded FeatureCollection of this view, or of a ``variant`` of it
+        whose features ``build`` returns. Each is encoded once per view.
+        """
+        body = self._bodies.get(variant)
+        if body is None:
+            features = iter_features(self) if build is None else build()
+            body = EncodedBody(b"".join(iter_collection(features)))
+            self._bodies[variant] = body
+        return body
+
+    def derive(self, key: Hashable, build: Callable[[], T]) -> T:
+        """Value of ``build()`` memoized for the lifetime of this view."""
+        if key not in self._derived:
+            self._derived[key] = build()
+        value: T = self._derived[key]
+        return value
+
+
+_views: dict[str, LayerView] = {}
+_lock = threading.Lock()
+
+# Called with (new view, ids whose overlay changed) when only the overlay of a
+# layer changed, or (new view, None) when its base dataset was reloaded.
+ViewListener = Callable[[LayerView, "set[str] | None"], None]
+_listeners: list[ViewListener] = []
+
+
+def on_view_change(fn: ViewListener) -> ViewListener:
+    _listeners.append(fn)
+    return fn
+
+
+def _changed_ids(old: dict[str, dict[str, Any]], new: dict[str, dict[str, Any]]) -> set[str]:
+    return {fid for fid in old.keys() | new.keys() if old.get(fid) != new.get(fid)}
+
+
+def get_view(name: str) -> LayerView:
+    """
+    Current merged view of ``name``; rebuilt only when base or overlay change.
+    An overlay change re-applies just the features whose latest update moved.
+    """
+    ds = get_dataset(name)
+    log = status_log(updates_path(OVERLAY_CATEGORY[name]))
+    log.poll(current_app.config.get("DATASET_CHECK_INTERVAL", 0.0))
+    key = f"{ds.path}:{name}"
+    view = _views.get(key)
+    if view is not None and view.base_version == ds.version and view.overlay_version == log.version:
+        return view
+    with _lock:
+        view = _views.get(key)
+        if view is None or view.base_version != ds.version or view.overlay_version != log.version:
+            previous = view
+            # the view this one is patched from: same base, older overlay
+            same = previous if previous is not None and previous.dataset is ds else None
+            since = int(same.overlay_version) if same is not None else None
+            ov, updates, changed = log.snapshot(since)
+            if same is not None and changed is None:
+                changed = _changed_ids(same.updates, updates)
+            merged = None  # over a snapshot: built on first use of view.features
+            if same is not None and same._features is not None and changed is not None:
+                ids = id_index(same)
+                positions = [ids[f] for f in changed if f in ids]
+                merged = patch_updates(ds.layers[name], same._features, positions, updates)
+            elif ds.binary is None:
+                merged = apply_updates(ds.layers[name], updates, id_field="id")
+            view = LayerView(name, ds, ov, updates, merged)
+            _views[key] = view
+            if previous is not None:
+                for fn in _listeners:
+                    fn(view, changed if same is not None else None)
+        return view
+
+
+def cache_key(prefix: str, names: Iterable[str]) -> str:
+    """
+    Cache key for a response built from the layers in ``names``. It embeds each
+    layer's (dataset version, overlay version), so cached entries never go
+    stale and need no TTL: an update or reload simply moves on to a new key.
+    """
+    return prefix + "|" + "|".join(f"{n}={get_view(n).version}" for n in sorted(set(names)))
+
+
+def feature_collection(features: list[dict[str, Any]], **extra: Any) -> dict[str, Any]:
+    return {"type": "FeatureCollection", "features": features, **extra}
+
+
+def base_store(ds: Dataset, name: str) -> FeatureStore:
+    """
+    Columnar form of the base layer, built once per dataset load: views into
+    the mapped binary snapshot when there is one, else converted from dicts.
+    """
+    snap = ds.binary
+    if snap is not None:
+        return ds.derive(("store", name), lambda: snap.store(name))
+    return ds.derive(("store", name), lambda: FeatureStore.from_features(ds.layers[name]))
+
+
+def _base_column(ds: Dataset, name: str, field: str) -> Callable[[], list[Any]]:
+    """
+    Builder of the base layer's property ``field`` per feature, read off the
+    snapshot's arrays when there is one so that no dicts are built. The store
+    is resolved here, outside the caller's derive(), which must not nest.
+    """
+    if ds.binary is not None:
+        store = base_store(ds, name)
+        return lambda: store.column_values(field)
+    return lambda: [(ft.get("properties") or {}).get(field) for ft in ds.layers[name]]
+
+
+def feature_ids(ds: Dataset, name: str) -> list[Any]:
+    """Feature id per position of the base layer, built once per dataset load."""
+    return ds.derive(("id_list", name), _base_column(ds, name, "id"))
+
+
+def point_coords(ds: Dataset, name: str) -> np.ndarray:
+    """
+    Lon/lat (n, 2) of the base features of a point layer, NaN where one has
+    no point; read off the snapshot when there is one (a point's envelope is
+    the point itself). Built once per dataset load.
+    """
+    if ds.binary is not None:
+        store = base_store(ds, name)
+        return ds.derive(("points", name), lambda: store.envelopes[:, :2])
+
+    def build() -> np.ndarray:
+        return np.array(
+            [
+                (ft.get("geometry") or {}).get("coordinates", [np.nan, np.nan])[:2]
+                for ft in ds.layers[name]
+            ],
+            dtype=float,
+        ).reshape(-1, 2)
+
+    return ds.derive(("points", name), build)
+
+
+def view_column(view: LayerView, field: str) -> list[Any]:
+    """Property ``field`` of every feature of the view (None when absent), once per view."""
+    if view.dataset.binary is not None:
+        store = feature_store(view)
+        return view.derive(("column", field), lambda: store.column_values(field))
+    return view.derive(
+        ("column", field),
+        lambda: [(ft.get("properties") or {}).get(field) for ft in view.features],
+    )
+
+
+def id_index(view: LayerView) -> dict[str, int]:
+    """Feature id -> position in the layer, built once per dataset load."""
+    ds, name = view.dataset, view.name
+    ids = _base_column(ds, name, "id")
+    return ds.derive(("ids", name), lambda: {fid: i for i, fid in enumerate(ids())})
+
+
+def id_order(view: LayerView) -> IdOrder:
+    """Id-sorted index used for cursor pagination, built once per dataset load."""
+    ds, name = view.dataset, view.name
+    ids = _base_column(ds, name, "id")
+    return ds.derive(("id_order", name), lambda: IdOrder.from_ids(ids()))
+
+
+def spatial_index(view: LayerView) -> GridIndex:
+    """Grid index over the envelopes of a layer, built once per dataset load."""
+    ds, name = view.dataset, view.name
+    if ds.binary is not None:
+        store = base_store(ds, name)
+        return ds.derive(("spatial", name), lambda: GridIndex(store.envelopes))
+    return ds.derive(("spatial", name), lambda: GridIndex.from_features(ds.layers[name]))
+
+
+def feature_store(view: LayerView) -> FeatureStore:
+    """Columnar form of the view (base store plus overlay), built once per view."""
+    base = base_store(view.dataset, view.name)
+    return view.derive("store", lambda: base.with_updates(view.updates))
+
+
+def overlaid(view: LayerView) -> bool:
+    """Whether any update of the view's overlay hits a feature of this layer."""
+    if not view.updates:
+        return False
+    ids = id_index(view)
+    return bool(view.derive("overlaid", lambda: any(fid in ids for fid in view.updates)))
+
+
+def projected_store(view: LayerView, projection: Projection, profile: str | None) -> FeatureStore:
+    """``feature_store(view)`` reduced to ``projection``; named profiles once per view."""
+    store = feature_store(view)
+    if profile is None:
+        return store.project(projection)
+    return view.derive(("store", profile), lambda: store.project(projection))
+
+
+def lod_pyramid(view: LayerView) -> dict[int, list[Any]]:
+    """Simplified geometries per zoom level, loaded or built once per dataset load."""
+    ds, name = view.dataset, view.name
+    ids = _base_column(ds, name, "id")
+    return ds.derive(
+        ("lod", name), lambda: load_pyramid(ds.path, ids(), ds.content_key, lambda: ds.layers[name])
+    )
+
+
+def status_index(view: LayerView) -> FacetIndex:
+    """Inverted index over the overlay status, built once per view."""
+    if view.dataset.binary is not None:
+        store = feature_store(view)
+        return view.derive(
+            ("facets", STATUS_FIELD),
+            lambda: FacetIndex.from_columns(
+                len(store), {STATUS_FIELD: store.column_values(STATUS_FIELD)}
+            ),
+        )
+    return view.derive(("facets", STATUS_FIELD), lambda: FacetIndex(view.features, (STATUS_FIELD,)))
+
+
+def facet_indexes(view: LayerView) -> list[FacetIndex]:
+    """
+    Inverted indexes for the filterable fields of ``view``: base attributes
+    once per dataset load, overlay status once per view.
+    """
+    ds, name = view.dataset, view.name
+    out = []
+    fields = FACET_FIELDS.get(name)
+    if fields:
+        builders = {f: _base_column(ds, name, f) for f in fields}
+
+        def build() -> FacetIndex:
+            columns = {f: column() for f, column in builders.items()}
+            return FacetIndex.from_columns(len(next(iter(columns.values()))), columns)
+
+        out.append(ds.derive(("facets", name), build))
+    out.append(status_index(view))
+    return out
+
+
+def projected(view: LayerView, projection: Projection, profile: str | None) -> list[dict[str, Any]]:
+    """
+    Features of ``view`` reduced to ``projection``. Named profiles project the
+    base layer once per dataset load and re-project only overlaid features.
+    """
+    ds, name = view.dataset, view.name
+    if profile is None:
+        return [projection.apply(ft) for ft in view.features]
+    base = ds.derive(
+        ("profile", name, profile), lambda: [projection.apply(ft) for ft in ds.layers[name]]
+    )
+    if not view.updates:
+        return base
+    ids = id_index(view)
+    out = list(base)
+    for fid in view.updates:
+        i = ids.get(fid)
+        if i is not None:
+            out[i] = projection.apply(view.features[i])
+    return out
+
+
+def iter_features(
+    view: LayerView,
+    indices: Iterable[int] | None = None,
+    level: int | None = None,
+    projection: Projection | None = None,
+    profile: str | None = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    Features of ``view`` (all, or those at ``indices``) one at a time, with the
+    requested projection and simplified level of detail applied lazily. Over
+    a binary snapshot they are built from the arrays, one feature at a time.
+    """
+    positions: Iterable[int]
+    if view.dataset.binary is not None:
+        store = feature_store(view)
+        if projection is not None:
+            store = projected_store(view, projection, profile)
+        positions = range(len(store)) if indices is None else indices
+        features = store.iter_features(indices)
+    elif projection is None and level is None and indices is None:
+        # straight from the base layer plus overlay; no merged list needed
+        yield from iter_updates(view.dataset.layers[view.name], view.updates)
+        return
+    else:
+        source = view.features
+        if projection is not None and profile is not None:
+            source, projection = projected(view, projection, profile), None
+        positions = range(len(source)) if indices is None else indices
+        features = (
+            source[i] if projection is None else projection.apply(source[i]) for i in positions
+        )
+    if level is None:
+        yield from features
+        return
+    coords = lod_pyramid(view)[level]
+    for i, ft in zip(positions, features, strict=True):
+        yield {**ft, "geometry": {"type": "LineString", "coordinates": coords[i]}}
+
+
+# query parameters a binary format can honour; it always encodes whole layers
+EXPORT_ARGS = frozenset({"format", "profile", "fields", "exclude"})
+
+
+def export_body(
+    view: LayerView, fmt: str, projection: Projection | None, profile: str | None
+) -> EncodedBody:
+    """
+    ``view`` encoded as ``fmt`` (see services.exports); raises FormatUnavailable.
+    The pipeline's full-layer file is served while no update hits a feature of
+    the layer; otherwise the view is encoded once per version (and named profile).
+    """
+    ds, name = view.dataset, view.name
+    mimetype = FORMATS[fmt][0]
+    if projection is None and not overlaid(view):
+        stored = ds.derive(
+            ("export", name, fmt), lambda: read_export(ds.path, name, ds.content_key, fmt)
+        )
+        if stored is not None:
+            return ds.derive(("export_body", name, fmt), lambda: EncodedBody(stored, mimetype))
+
+    def build() -> EncodedBody:
+        store = (
+            feature_store(view)
+            if projection is None
+            else projected_store(view, projection, profile)
+        )
+        return EncodedBody(encode_export(fmt, store, name), mimetype)
+
+    if projection is not None and profile is None:
+        return build()  # ad-hoc fields=/exclude=: not worth keeping
+    return view.derive(("export", fmt, profile), build)
+
+
+def _float_arg(args: Any, key: str) -> float | None:
+    raw = args.get(key)
+    if raw in (None, ""):
+        return None
+    try:
+        return float(raw)
+    except ValueError:
+        raise ValueError(f"{key} must be a number") from None
+
+
+def _lod_level(view: LayerView, args: Any) -> int | None:
+    zoom, tolerance = _float_arg(args, "zoom"), _float_arg(args, "tolerance")
+    if LAYERS[view.name][1] != "LineString":
+        return None  # nothing to simplify on point layers
+    return level_for(zoom=zoom, tolerance=tolerance)
+
+
+def _select(
+    view: LayerView, args: Any, bbox: tuple[float, float, float, float] | None
+) -> tuple[np.ndarray | None, dict[str, Any] | None]:
+    """
+    Positions matching ``bbox`` and the attribute filters (None for all), plus
+    the facet counts when filters or ``facets=1`` were given.
+    """
+    hits = spatial_index(view).query(bbox) if bbox is not None else None
+    indexes = facet_indexes(view)
+    filters = parse_filters(args, [f for index in indexes for f in index.fields])
+    if not filters and args.get("facets") not in ("1", "true"):
+        return hits, None
+
+    in_bbox = None
+    if hits is not None:
+        in_bbox = np.zeros(spatial_index(view).size, dtype=bool)
+        in_bbox[hits] = True
+    masks = {
+        f: index.mask(f, filters[f]) for index in indexes for f in index.fields if f in filters
+    }
+    selected = in_bbox
+    for m in masks.values():
+        selected = m if selected is None else selected & m
+    positions = np.flatnonzero(selected) if selected is not None else None
+    return positions, {"facets": facet_counts(indexes, masks, in_bbox)}
+
+
+def serve_layer(name: str) -> Response | tuple[dict[str, str], int]:
+    """
+    Response for a layer endpoint. Without query parameters the pre-encoded
+    full body is sent; ``bbox=`` narrows it through the spatial index,
+    ``zoom=``/``tolerance=`` pick a simplified level of detail for lines and
+    ``profile=``/``fields=``/``exclude=`` project the properties.
+    ``limit=``/``cursor=`` page through the result in feature-id order.
+    Attribute filters (``TYPE=``, ``status=``, ...) intersect inverted indexes
+    and add per-value ``facets`` counts to the response, as does ``facets=1``.
+    ``format=`` (or ``Accept``) selects a binary encoding of the whole layer
+    (FlatGeobuf, GeoParquet or qbin), optionally projected.
+
+    Named variants (profiles, levels) are pre-encoded once per view; anything
+    else, or any request with ``stream=1``, is serialized as a chunked stream.
+    """
+    view = get_view(name)
+    args = request.args
+    try:
+        bbox = parse_bbox(args["bbox"]) if args.get("bbox") else None
+        level = _lod_level(view, args)
+        projection, profile = projection_from_args(name, args)
+        fmt = negotiate(args, request.accept_mimetypes)
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    unsupported = sorted(set(args) - EXPORT_ARGS)
+    if fmt is not None and unsupported and args.get("format"):
+        return {"error": f"format={fmt} encodes whole layers; drop {', '.join(unsupported)}"}, 400
+    if fmt is not None and not unsupported:
+        try:
+            body = export_body(view, fmt, projection, profile)
+        except FormatUnavailable as e:
+            if args.get("format"):
+                return {"error": f"format {fmt} is not available: {e}"}, 406
+            body = None  # Accept is only a preference: answer in GeoJSON
+        if body is not None:
+            resp = send_encoded(body)
+            resp.vary.add("Accept")
+            return resp
+
+    try:
+        limit = parse_limit(args.get("limit"), current_app.config["PAGE_MAX_LIMIT"])
+        after = decode_cursor(args["cursor"], view.base_version) if args.get("cursor") else None
+    except CursorExpired as e:
+        return {"error": str(e)}, 410
+    except ValueError as e:
+        return {"error": str(e)}, 400
+
+    stream = args.get("stream") in ("1", "true")
+    hits, extra = _select(view, args, bbox)
+    if limit is not None or after is not None:
+        page, last = id_order(view).page(after, limit or DEFAULT_LIMIT, hits)
+        next_cursor = encode_cursor(view.base_version, last) if last is not None else None
+        return stream_response(
+            iter_collection(
+                iter_features(view, page, level, projection, profile),
+                extra={**(extra or {}), "next_cursor": next_cursor},
+            )
+        )
+
+    indices = hits.tolist() if hits is not None else None
+    named = projection is None or profile is not None
+    if indices is None and extra is None and named and not stream:
+        if projection is None and level is None:
+            resp = send_encoded(view.body())
+        else:
+            resp = send_encoded(
+                view.body(
+                    (profile, level), lambda: iter_features(view, None, level, projection, profile)
+                )
+            )
+        resp.vary.add("Accept")  # the same URL may be negotiated into a binary format
+        return resp
+    return stream_response(
+        iter_collection(iter_features(view, indices, level, projection, profile), extra=extra)
+    )
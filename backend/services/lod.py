@@ -0,0 +1,107 @@
+"""
+Zoom-dependent levels of detail for road geometries.
+
+Each level is the road network simplified with a tolerance of half a screen
+pixel at that zoom, keeping every vertex shared between roads so the network
+stays connected. The checkpoints pipeline writes the pyramid next to the
+GeoJSON; the API falls back to building it once per dataset load.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .files import atomic_write_json
+from .simplify import simplify_many
+
+LOD_ZOOMS: tuple[int, ...] = (8, 10, 12, 14)
+
+
+def tolerance_for_zoom(z: float) -> float:
+    """Half a 256 px screen pixel at zoom ``z``, in degrees."""
+    return 0.5 * 360.0 / (256 * 2**z)
+
+
+def level_for(zoom: float | None = None, tolerance: float | None = None) -> int | None:
+    """
+    Coarsest precomputed level that is still accurate enough for ``zoom`` or
+    ``tolerance`` (degrees); None means full resolution.
+    """
+    if tolerance is None:
+        if zoom is None:
+            return None
+        tolerance = tolerance_for_zoom(zoom)
+    fitting = [z for z in LOD_ZOOMS if tolerance_for_zoom(z) <= tolerance * (1 + 1e-9)]
+    return min(fitting) if fitting else None
+
+
+def lod_path(geojson_path: str | Path) -> Path:
+    p = Path(geojson_path)
+    return p.with_suffix(p.suffix + ".lod.json")
+
+
+def build_pyramid(
+    features: list[dict[str, Any]], zooms: tuple[int, ...] = LOD_ZOOMS
+) -> dict[int, list[Any]]:
+    """{zoom: [coordinates per feature]} for LineString features."""
+    lines = [ft["geometry"]["coordinates"] for ft in features]
+    lengths = np.fromiter((len(c) for c in lines), dtype=np.int64, count=len(lines))
+    offsets = np.zeros(len(lines) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    coords = np.array([p[:2] for c in lines for p in c], dtype=float).reshape(-1, 2)
+
+    # vertices used by more than one road (or twice by one) are junctions
+    _, inverse, counts = np.unique(coords, axis=0, return_inverse=True, return_counts=True)
+    anchors = counts[inverse.ravel()] > 1
+
+    pyramid: dict[int, list[Any]] = {}
+    line_of = np.repeat(np.arange(len(lines)), lengths)
+    for z in zooms:
+        keep = simplify_many(coords, offsets, tolerance_for_zoom(z), anchors)
+        kept = coords[keep].tolist()
+        bounds = np.zeros(len(lines) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(line_of[keep], minlength=len(lines)), out=bounds[1:])
+        pyramid[z] = [
+            kept[a:b] for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist(), strict=True)
+        ]
+    return pyramid
+
+
+def write_pyramid(
+    geojson_path: str | Path, features: list[dict[str, Any]], content_key: str
+) -> dict[int, list[Any]]:
+    pyramid = build_pyramid(features)
+    atomic_write_json(
+        lod_path(geojson_path),
+        {
+            "content_key": content_key,
+            "ids": [str(ft["properties"]["id"]) for ft in features],
+            "levels": {str(z): coords for z, coords in pyramid.items()},
+        },
+    )
+    return pyramid
+
+
+def load_pyramid(
+    geojson_path: str | Path,
+    ids: Sequence[Any],
+    content_key: str,
+    features: Callable[[], list[dict[str, Any]]],
+) -> dict[int, list[Any]]:
+    """
+    The pipeline's pyramid if it matches this dataset (its feature ``ids``),
+    else one freshly built from ``features()``.
+    """
+    try:
+        with lod_path(geojson_path).open(encoding="utf-8") as f:
+            stored = json.load(f)
+        if stored.get("content_key") == content_key and stored.get("ids") == [str(i) for i in ids]:
+            return {int(z): coords for z, coords in stored["levels"].items()}
+    except (OSError, ValueError, KeyError):
+        pass
+    return build_pyramid(features())
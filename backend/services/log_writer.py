@@ -0,0 +1,122 @@
+"""
+Durable, group-committed appends to the updates logs.
+
+Every append is acknowledged only after it is on disk. Requests arriving
+while a commit is in flight queue up and go out together in the next one:
+a single write and a single fsync per batch, so throughput grows with
+concurrency instead of paying one fsync per request. Writes take an
+exclusive flock on the log, which serialises gunicorn workers (separate
+processes) and compaction; lines from different writers never interleave.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO
+
+try:  # POSIX only; without it appends from separate processes are not excluded
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+
+@contextmanager
+def locked_log(path: str | Path) -> Iterator[BinaryIO]:
+    """
+    ``path`` opened for appending under an exclusive flock. If the file was
+    rotated away while waiting for the lock, the new one is opened instead.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    while True:
+        f = path.open("ab")
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            current = os.fstat(f.fileno()).st_ino == os.stat(path).st_ino
+        except FileNotFoundError:
+            current = False
+        if current:
+            break
+        f.close()
+    try:
+        yield f
+    finally:
+        f.close()  # releases the lock
+
+
+class _Pending:
+    __slots__ = ("data", "done", "error")
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.done = False
+        self.error: BaseException | None = None
+
+
+class GroupWriter:
+    """
+    Group commit for one log. The first waiting thread becomes the leader,
+    takes everything queued so far, writes and fsyncs it, then wakes the
+    followers whose data went out with it.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.commits = 0
+        self.appends = 0
+        self._queue: list[_Pending] = []
+        self._flushing = False
+        self._cond = threading.Condition()
+
+    def append(self, data: str | bytes) -> None:
+        """Write ``data`` (whole lines) and return once it is durable."""
+        req = _Pending(data.encode("utf-8") if isinstance(data, str) else data)
+        with self._cond:
+            self._queue.append(req)
+            while not req.done:
+                if self._flushing:
+                    self._cond.wait()
+                    continue
+                self._flushing = True
+                batch, self._queue = self._queue, []
+                error = None
+                self._cond.release()
+                try:
+                    self._commit(batch)
+                except BaseException as e:  # hand the failure to every waiter
+                    error = e
+                finally:
+                    self._cond.acquire()
+                for r in batch:
+                    r.done, r.error = True, error
+                self._flushing = False
+                self._cond.notify_all()
+        if req.error is not None:
+            raise req.error
+
+    def _commit(self, batch: list[_Pending]) -> None:
+        with locked_log(self.path) as f:
+            f.write(b"".join(r.data for r in batch))
+            f.flush()
+            os.fsync(f.fileno())
+        self.commits += 1
+        self.appends += len(batch)
+
+
+_writers: dict[str, GroupWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def log_writer(path: str | Path) -> GroupWriter:
+    """The process-wide writer for the log at ``path``."""
+    key = str(path)
+    writer = _writers.get(key)
+    if writer is None:
+        with _writers_lock:
+            writer = _writers.setdefault(key, GroupWriter(path))
+    return writer
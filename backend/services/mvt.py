@@ -0,0 +1,253 @@
+"""
+Minimal Mapbox Vector Tile (spec v2.1) encoder for point and line layers.
+
+Features are projected to Web Mercator tile units, clipped to the tile plus a
+buffer, simplified in tile space and encoded as protobuf by hand, so serving
+and build-time prewarming need no extra dependencies.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+
+from .simplify import douglas_peucker
+
+EXTENT = 4096
+BUFFER = 64  # tile units kept around each edge so lines join without seams
+SIMPLIFY_TOLERANCE = 4.0  # tile units, ~1/4 px on a 256 px tile
+
+# scalar properties never worth shipping in a tile
+DROP_PROPERTIES = {"user", "uid", "changeset", "version", "ingested_ts", "ingested_at"}
+
+
+# ---------- tile math ----------
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    """(min_lon, min_lat, max_lon, max_lat) of an XYZ tile."""
+    n = 2.0**z
+
+    def lat(yy: float) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * yy / n))))
+
+    return (x / n * 360.0 - 180.0, lat(y + 1), (x + 1) / n * 360.0 - 180.0, lat(y))
+
+
+def buffered_bounds(z: int, x: int, y: int) -> tuple[float, float, float, float]:
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    fx = (max_lon - min_lon) * BUFFER / EXTENT
+    fy = (max_lat - min_lat) * BUFFER / EXTENT
+    return (min_lon - fx, min_lat - fy, max_lon + fx, max_lat + fy)
+
+
+def tile_range(bbox: tuple[float, float, float, float], z: int) -> tuple[int, int, int, int]:
+    """(x0, y0, x1, y1) inclusive range of tiles at ``z`` covering ``bbox``."""
+    n = 1 << z
+    min_lon, min_lat, max_lon, max_lat = bbox
+
+    def tx(lon: float) -> int:
+        return min(n - 1, max(0, int((lon + 180.0) / 360.0 * n)))
+
+    def ty(lat: float) -> int:
+        lat = max(-85.0511, min(85.0511, lat))
+        r = math.radians(lat)
+        return min(n - 1, max(0, int((1 - math.asinh(math.tan(r)) / math.pi) / 2 * n)))
+
+    return tx(min_lon), ty(max_lat), tx(max_lon), ty(min_lat)
+
+
+def project(coords: np.ndarray, z: int, x: int, y: int) -> np.ndarray:
+    """lon/lat (n, 2) -> tile units (n, 2), origin at the tile's top-left."""
+    n = 2.0**z
+    lat = np.radians(np.clip(coords[:, 1], -85.0511, 85.0511))
+    px = ((coords[:, 0] + 180.0) / 360.0 * n - x) * EXTENT
+    py = ((1 - np.arcsinh(np.tan(lat)) / math.pi) / 2 * n - y) * EXTENT
+    return np.column_stack([px, py])
+
+
+# ---------- clipping ----------
+
+
+def clip_line(pts: np.ndarray, lo: float, hi: float) -> list[np.ndarray]:
+    """Clip a polyline to the square [lo, hi]^2 (Liang-Barsky per segment)."""
+    parts: list[np.ndarray] = []
+    current: list[tuple[float, float]] = []
+    for (x0, y0), (x1, y1) in zip(pts[:-1].tolist(), pts[1:].tolist(), strict=True):
+        dx, dy = x1 - x0, y1 - y0
+        t0, t1 = 0.0, 1.0
+        ok = True
+        for p, q in ((-dx, x0 - lo), (dx, hi - x0), (-dy, y0 - lo), (dy, hi - y0)):
+            if p == 0:
+                if q < 0:
+                    ok = False
+                    break
+                continue
+            r = q / p
+            if p < 0:
+                if r > t1:
+                    ok = False
+                    break
+                t0 = max(t0, r)
+            else:
+                if r < t0:
+                    ok = False
+                    break
+                t1 = min(t1, r)
+        if not ok:
+            if len(current) > 1:
+                parts.append(np.array(current))
+            current = []
+            continue
+        a = (x0 + t0 * dx, y0 + t0 * dy)
+        b = (x0 + t1 * dx, y0 + t1 * dy)
+        if not current:
+            current = [a]
+        current.append(b)
+        if t1 < 1.0:  # segment leaves the box
+            parts.append(np.array(current))
+            current = []
+    if len(current) > 1:
+        parts.append(np.array(current))
+    return parts
+
+
+# ---------- protobuf ----------
+
+
+def _varint(v: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = v & 0x7F
+        v >>= 7
+        if v:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def _zigzag(v: int) -> int:
+    return (v << 1) ^ (v >> 63)
+
+
+def _field(num: int, wire: int) -> bytes:
+    return _varint((num << 3) | wire)
+
+
+def _bytes_field(num: int, payload: bytes) -> bytes:
+    return _field(num, 2) + _varint(len(payload)) + payload
+
+
+def _packed(num: int, values: Iterable[int]) -> bytes:
+    return _bytes_field(num, b"".join(_varint(v) for v in values))
+
+
+def _value(v: Any) -> bytes:
+    if isinstance(v, bool):
+        return _field(7, 0) + _varint(int(v))
+    if isinstance(v, int):
+        return _field(6, 0) + _varint(_zigzag(v)) if v < 0 else _field(5, 0) + _varint(v)
+    if isinstance(v, float):
+        return _field(3, 1) + struct.pack("<d", v)
+    return _bytes_field(1, str(v).encode("utf-8"))
+
+
+def _geometry(parts: Sequence[np.ndarray], point: bool) -> list[int]:
+    cmds: list[int] = []
+    cx = cy = 0
+    if point:
+        cmds.append((1 & 7) | (len(parts) << 3))
+        for p in parts:
+            px, py = int(p[0]), int(p[1])
+            cmds += [_zigzag(px - cx), _zigzag(py - cy)]
+            cx, cy = px, py
+        return cmds
+    for line in parts:
+        px, py = int(line[0][0]), int(line[0][1])
+        cmds += [(1 & 7) | (1 << 3), _zigzag(px - cx), _zigzag(py - cy)]
+        cx, cy = px, py
+        cmds.append((2 & 7) | ((len(line) - 1) << 3))
+        for x, y in line[1:]:
+            qx, qy = int(x), int(y)
+            cmds += [_zigzag(qx - cx), _zigzag(qy - cy)]
+            cx, cy = qx, qy
+    return cmds
+
+
+def tile_properties(props: dict[str, Any]) -> dict[str, Any]:
+    """Scalar attributes for a tile feature (tags flattened to name only)."""
+    out = {
+        k: v
+        for k, v in props.items()
+        if k not in DROP_PROPERTIES and isinstance(v, (str, int, float, bool))
+    }
+    tags = props.get("tags")
+    if isinstance(tags, dict):
+        for k in ("name", "name:en", "name:ar"):
+            if k in tags:
+                out.setdefault(k, tags[k])
+    return out
+
+
+def encode_layer(name: str, features: Iterable[dict[str, Any]], z: int, x: int, y: int) -> bytes:
+    """Encode ``features`` (GeoJSON dicts) into one MVT layer; b"" if none survive."""
+    keys: dict[str, int] = {}
+    values: dict[tuple[type, Any], int] = {}
+    encoded: list[bytes] = []
+    lo, hi = -BUFFER, EXTENT + BUFFER
+
+    for ft in features:
+        geom = ft.get("geometry") or {}
+        gtype = geom.get("type")
+        coords = geom.get("coordinates")
+        if not coords:
+            continue
+        if gtype == "Point":
+            p = np.rint(project(np.array([coords[:2]], dtype=float), z, x, y))[0]
+            if not (lo <= p[0] <= hi and lo <= p[1] <= hi):
+                continue
+            parts, kind = [p], 1
+        elif gtype == "LineString":
+            pts = project(np.asarray(coords, dtype=float), z, x, y)
+            if len(pts) > 2:
+                pts = douglas_peucker(pts, SIMPLIFY_TOLERANCE)
+            parts = []
+            for part in clip_line(pts, lo, hi):
+                q = np.rint(part)
+                q = q[np.r_[True, (np.diff(q, axis=0) != 0).any(axis=1)]]
+                if len(q) > 1:
+                    parts.append(q)
+            if not parts:
+                continue
+            kind = 2
+        else:
+            continue
+
+        tags: list[int] = []
+        props = tile_properties(ft.get("properties") or {})
+        for k, v in props.items():
+            ki = keys.setdefault(k, len(keys))
+            vi = values.setdefault((type(v), v), len(values))
+            tags += [ki, vi]
+
+        body = b""
+        fid = props.get("id")
+        if isinstance(fid, int) or (isinstance(fid, str) and fid.isdigit()):
+            body += _field(1, 0) + _varint(int(fid))
+        body += _packed(2, tags) + _field(3, 0) + _varint(kind)
+        body += _packed(4, _geometry(parts, point=kind == 1))
+        encoded.append(body)
+
+    if not encoded:
+        return b""
+    layer = _field(15, 0) + _varint(2) + _bytes_field(1, name.encode("utf-8"))
+    layer += b"".join(_bytes_field(2, f) for f in encoded)
+    layer += b"".join(_bytes_field(3, k.encode("utf-8")) for k in keys)
+    layer += b"".join(_bytes_field(4, _value(v)) for (_, v) in values)
+    layer += _field(5, 0) + _varint(EXTENT)
+    return _bytes_field(3, layer)
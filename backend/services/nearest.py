@@ -0,0 +1,131 @@
+"""
+k-nearest-neighbour queries on the sphere.
+
+Points are stored as 3D unit vectors: the straight-line (chord) distance
+between two of them orders exactly like the great-circle distance, so the
+Euclidean KD-tree answers haversine queries and the chord converts back to
+metres at the end. Batches of origins over layers of moderate size are
+answered with one matrix product per chunk instead of one tree walk per
+origin.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+import numpy as np
+
+from .facets import STATUS_FIELD
+from .kdtree import KDTree
+from .layers import LayerView, point_coords, status_index
+
+EARTH_RADIUS_M = 6_371_008.8
+BATCH_CHUNK = 2_000_000  # origin x point distances per matrix block
+# above this many eligible points one tree walk per origin beats the matrix
+# (see benchmarks/nearest.py)
+MATRIX_MAX_POINTS = 15_000
+
+
+def unit_vectors(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    lon, lat = np.radians(lon), np.radians(lat)
+    cos_lat = np.cos(lat)
+    return np.column_stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)])
+
+
+def chord_to_metres(chord: np.ndarray) -> np.ndarray:
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.clip(chord / 2, 0.0, 1.0))
+
+
+class NearestIndex:
+    def __init__(self, features: list[dict[str, Any]]) -> None:
+        coords = np.array(
+            [
+                (ft.get("geometry") or {}).get("coordinates", [np.nan, np.nan])[:2]
+                for ft in features
+            ],
+            dtype=float,
+        ).reshape(-1, 2)
+        self._build(coords)
+
+    @classmethod
+    def from_coords(cls, coords: np.ndarray) -> NearestIndex:
+        """Index over (n, 2) lon/lat rows, NaN where a feature has no point."""
+        index = cls.__new__(cls)
+        index._build(coords)
+        return index
+
+    def _build(self, coords: np.ndarray) -> None:
+        self.size = len(coords)
+        self.valid = np.flatnonzero(~np.isnan(coords).any(axis=1))
+        self.xyz = unit_vectors(coords[self.valid, 0], coords[self.valid, 1])
+        self.tree = KDTree(self.xyz)
+
+    def _eligible(self, mask: np.ndarray | None) -> np.ndarray | None:
+        return None if mask is None else mask[self.valid]
+
+    def query(
+        self, lon: float, lat: float, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(metres, feature positions) of the ``k`` nearest eligible points."""
+        origin = unit_vectors(np.array([lon]), np.array([lat]))[0]
+        chord, j = self.tree.nearest(origin, k, self._eligible(mask))
+        return chord_to_metres(chord), self.valid[j]
+
+    def query_many(
+        self, lonlat: np.ndarray, k: int, mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        ``query`` for (m, 2) origins. Returns (m, k') arrays with
+        k' = min(k, eligible points), closest first.
+        """
+        eligible = self._eligible(mask)
+        cand = np.arange(len(self.valid)) if eligible is None else np.flatnonzero(eligible)
+        pts = self.xyz[cand]
+        k = min(k, len(cand))
+        m = len(lonlat)
+        metres = np.empty((m, k))
+        positions = np.empty((m, k), dtype=np.int64)
+        if not k or not m:
+            return metres, positions
+        if len(cand) > MATRIX_MAX_POINTS:
+            for row, (lon, lat) in enumerate(lonlat.tolist()):
+                metres[row], positions[row] = self.query(lon, lat, k, mask)
+            return metres, positions
+        origins = unit_vectors(lonlat[:, 0], lonlat[:, 1])
+        step = max(1, BATCH_CHUNK // len(pts))
+        for lo in range(0, m, step):
+            block = origins[lo : lo + step]
+            # |p - q|^2 = 2 - 2 p.q for unit vectors
+            d2 = np.maximum(2.0 - 2.0 * (block @ pts.T), 0.0)
+            if k < len(pts):
+                top = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                top = np.tile(np.arange(len(pts)), (len(block), 1))
+            # the dot-product form is only good to ~1 m; measure the winners exactly
+            chord = np.linalg.norm(pts[top] - block[:, None, :], axis=2)
+            order = np.argsort(chord, axis=1, kind="stable")
+            top = np.take_along_axis(top, order, axis=1)
+            metres[lo : lo + step] = chord_to_metres(np.take_along_axis(chord, order, axis=1))
+            positions[lo : lo + step] = self.valid[cand[top]]
+        return metres, positions
+
+
+def nearest_index(view: LayerView) -> NearestIndex:
+    """Unit-vector KD-tree of a point layer, built once per dataset load."""
+    ds, name = view.dataset, view.name
+    coords = point_coords(ds, name)
+    return ds.derive(("nearest", name), lambda: NearestIndex.from_coords(coords))
+
+
+def status_mask(view: LayerView, statuses: Iterable[str]) -> np.ndarray | None:
+    """Features whose overlay status is one of ``statuses`` (None: no filter)."""
+    wanted = [s for s in statuses if s]
+    if not wanted:
+        return None
+    return status_index(view).mask(STATUS_FIELD, wanted)
+
+
+def with_distance(ft: dict[str, Any], metres: float) -> dict[str, Any]:
+    props = {**(ft.get("properties") or {}), "distance_m": round(float(metres), 1)}
+    return {**ft, "properties": props}
@@ -0,0 +1,97 @@
+"""
+Cursor pagination over stable feature ids.
+
+Pages are ordered by feature id. A cursor names the dataset version and the
+last id served, so it survives status-overlay changes and breaks only when
+the base dataset is reloaded. Each page is a bisect plus a slice over an
+id-sorted index built once per dataset load.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+DEFAULT_LIMIT = 1000
+
+
+class CursorExpired(ValueError):
+    """The cursor was issued for a different version of the dataset."""
+
+
+@dataclass
+class IdOrder:
+    order: np.ndarray  # feature positions sorted by id
+    sorted_ids: list[str]
+    rank: np.ndarray  # position -> rank in ``order``
+
+    @classmethod
+    def from_features(cls, features: list[dict[str, Any]]) -> IdOrder:
+        return cls.from_ids([ft["properties"]["id"] for ft in features])
+
+    @classmethod
+    def from_ids(cls, ids: Sequence[Any]) -> IdOrder:
+        """Order over the feature ids at each position."""
+        ids = [str(fid) for fid in ids]
+        order = np.array(sorted(range(len(ids)), key=ids.__getitem__), dtype=np.int64)
+        rank = np.empty(len(ids), dtype=np.int64)
+        rank[order] = np.arange(len(ids))
+        return cls(order, [ids[i] for i in order.tolist()], rank)
+
+    def page(
+        self, after: str | None, limit: int, subset: np.ndarray | None = None
+    ) -> tuple[list[int], str | None]:
+        """
+        Positions of up to ``limit`` features with ids greater than ``after``,
+        optionally restricted to the positions in ``subset``, plus the last id
+        served when more remain.
+        """
+        start = bisect_right(self.sorted_ids, after) if after is not None else 0
+        if subset is None:
+            ranks = np.arange(start, min(start + limit + 1, len(self.order)))
+        else:
+            ranks = np.sort(self.rank[subset])
+            ranks = ranks[np.searchsorted(ranks, start) :][: limit + 1]
+        more = len(ranks) > limit
+        ranks = ranks[:limit]
+        last = self.sorted_ids[int(ranks[-1])] if more and len(ranks) else None
+        return self.order[ranks].tolist(), last
+
+
+def encode_cursor(version: str, last_id: str) -> str:
+    raw = json.dumps({"v": version, "a": last_id}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, version: str) -> str:
+    """The last id encoded in ``token``; raises ValueError/CursorExpired."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        cursor_version, last_id = data["v"], str(data["a"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("invalid cursor") from None
+    if cursor_version != version:
+        raise CursorExpired(
+            "cursor refers to an older dataset version; restart from the first page"
+        )
+    return last_id
+
+
+def parse_limit(raw: str | None, maximum: int) -> int | None:
+    if raw in (None, ""):
+        return None
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("limit must be a positive integer") from None
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
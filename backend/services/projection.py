@@ -0,0 +1,118 @@
+"""
+Property projection for layer responses.
+
+Most of a feature's payload is properties the map never reads (OSM ``tags``
+and edit metadata, the shapefile row under ``__raw``). Layer endpoints accept
+a named ``profile`` and/or explicit ``fields=`` / ``exclude=`` lists; dotted
+paths such as ``tags.name`` address keys inside nested property bags.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+# overlay fields added by services.updates.apply_updates
+STATUS_FIELDS = ("status", "status_verified_at", "status_source", "status_confidence")
+TIME_FIELDS = ("observed_ts", "observed_at", "ingested_ts", "ingested_at")
+OSM_NAMES = ("tags.name", "tags.name:en", "tags.name:ar")
+
+# properties the frontend map and filters read, per layer
+MAP_FIELDS: dict[str, tuple[str, ...]] = {
+    "health": (
+        "NAME",
+        "TYPE",
+        "SERVICES",
+        "GOVERNORATE",
+        "REGION",
+        "SUPERVISING",
+        "URBANIZATION",
+    ),
+    "checkpoints": (*OSM_NAMES, "tags.barrier", "tags.military", "tags.is_in", "is_in"),
+    "roads": (*OSM_NAMES, "tags.ref", "highway", "oneway", "lanes", "maxspeed", "is_in"),
+    "borders": ("name", "type", "country", "org", "last_update", "last_seen_ts", "source"),
+}
+
+HEAVY_FIELDS = ("__raw", "user", "uid", "changeset", "version")
+
+
+@dataclass(frozen=True)
+class Projection:
+    include: frozenset[str] | None = None  # None keeps every property
+    exclude: frozenset[str] = frozenset()
+
+    @cached_property
+    def included(self) -> tuple[frozenset[str], dict[str, frozenset[str]]]:
+        """Whole properties kept (always ``id``), and the kept keys per nested one."""
+        bare: set[str] = {"id"}
+        subs: dict[str, set[str]] = {}
+        for path in self.include or ():
+            top, _, sub = path.partition(".")
+            if sub:
+                subs.setdefault(top, set()).add(sub)
+            else:
+                bare.add(top)
+        return frozenset(bare), {top: frozenset(keys) for top, keys in subs.items()}
+
+    def apply(self, ft: dict[str, Any]) -> dict[str, Any]:
+        # keys keep their order in the source, not the (per-process) set order
+        props = ft.get("properties") or {}
+        if self.include is not None:
+            bare, subs = self.included
+            out: dict[str, Any] = {}
+            for key, value in props.items():
+                if key in bare:
+                    out[key] = value
+                elif key in subs and isinstance(value, Mapping):
+                    kept = {k: v for k, v in value.items() if k in subs[key]}
+                    if kept:
+                        out[key] = kept
+        else:
+            out = dict(props)
+        for path in self.exclude:
+            top, _, sub = path.partition(".")
+            if not sub:
+                if top != "id":
+                    out.pop(top, None)
+            elif isinstance(out.get(top), Mapping) and sub in out[top]:
+                out[top] = {k: v for k, v in out[top].items() if k != sub}
+        return {**ft, "properties": out}
+
+
+PROFILES: dict[str, dict[str, Projection]] = {
+    "map": {
+        layer: Projection(include=frozenset(("id", "kind", *fields, *STATUS_FIELDS, *TIME_FIELDS)))
+        for layer, fields in MAP_FIELDS.items()
+    },
+    "detail": {layer: Projection(exclude=frozenset(HEAVY_FIELDS)) for layer in MAP_FIELDS},
+}
+
+
+def _paths(raw: str | None) -> list[str]:
+    return [p.strip() for p in (raw or "").split(",") if p.strip()]
+
+
+def from_args(layer: str, args: Mapping[str, str]) -> tuple[Projection | None, str | None]:
+    """
+    (projection, profile name) for a request. The profile name is set only when
+    the projection is exactly a named profile, which makes it cacheable; a None
+    projection means the full, unprojected features.
+    """
+    profile = args.get("profile") or "full"
+    if profile != "full" and profile not in PROFILES:
+        raise ValueError(f"profile must be one of: full, {', '.join(PROFILES)}")
+    fields, exclude = _paths(args.get("fields")), _paths(args.get("exclude"))
+
+    base = PROFILES[profile][layer] if profile != "full" else Projection()
+    if not fields and not exclude:
+        return (None, None) if profile == "full" else (base, profile)
+    include: Iterable[str] | None = fields or base.include
+    return (
+        Projection(
+            include=frozenset(include) if include is not None else None,
+            exclude=base.exclude | frozenset(exclude),
+        ),
+        None,
+    )
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import gc
+import hashlib
+import json
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TypeVar
+
+from flask import current_app
+
+from .binary import BinarySnapshot, open_binary
+from .ids import ensure_ids
+
+T = TypeVar("T")
+
+# layer name -> (config key of the source file, geometry type kept, id prefix)
+# Layers that share a source file are split from a single parse of it.
+LAYERS: dict[str, tuple[str, str | None, str]] = {
+    "health": ("HEALTH_FACILITIES_PATH", None, "health"),
+    "checkpoints": ("COMBINED_CHECKPOINTS_PATH", "Point", "checkpoint"),
+    "roads": ("COMBINED_CHECKPOINTS_PATH", "LineString", "road"),
+    "borders": ("BORDER_CROSSINGS_PATH", None, "border"),
+}
+
+
+@dataclass
+class Dataset:
+    """One parsed source file, split into its layers."""
+
+    path: str
+    fingerprint: tuple[Any, ...]
+    version: str
+    layers: Mapping[str, list[dict[str, Any]]]
+    loaded_at: float
+    binary: BinarySnapshot | None = None  # the mapped snapshot it was loaded from
+    _derived: dict[Any, Any] = field(default_factory=dict, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def content_key(self) -> str:
+        """
+        Version derived from the sidecar's updated_at/data_size only, so it is
+        stable across checkouts (unlike mtime) and computable at build time.
+        """
+        return content_key(self.fingerprint) or self.version
+
+    def peek(self, key: Any) -> Any:
+        """The structure memoized under ``key``, or None if nothing built it yet."""
+        return self._derived.get(key)
+
+    def derive(self, key: Any, build: Callable[[], T]) -> T:
+        """
+        Memoize a structure computed from this dataset (indexes, encodings...).
+        It lives exactly as long as this version of the file.
+        """
+        value: T
+        try:
+            value = self._derived[key]
+            return value
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            value = self._derived[key]
+            return value
+
+
+def _meta_path(path: str) -> Path:
+    return Path(path + ".meta.json")
+
+
+def fingerprint(path: str) -> tuple[Any, ...]:
+    """mtime/size of the data file plus data_size/updated_at from its sidecar."""
+    st = os.stat(path)
+    meta: dict[str, Any] = {}
+    try:
+        with _meta_path(path).open(encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        pass
+    return (st.st_mtime_ns, st.st_size, meta.get("data_size"), meta.get("updated_at"))
+
+
+def content_key(fp: tuple[Any, ...]) -> str | None:
+    data_size, updated_at = fp[2], fp[3]
+    if data_size is None or updated_at is None:
+        return None
+    return hashlib.sha1(f"{updated_at}|{data_size}".encode()).hexdigest()[:12]
+
+
+def dataset_version(fp: tuple[Any, ...]) -> str:
+    return hashlib.sha1(repr(fp).encode("utf-8")).hexdigest()[:12]
+
+
+def build_key(path: str) -> str:
+    """Content key of the file at ``path`` as its Dataset reports it; raises OSError."""
+    fp = fingerprint(path)
+    return content_key(fp) or dataset_version(fp)
+
+
+def assign_ids(layer: str, features: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    prefix = LAYERS[layer][2]
+    if prefix == "health":
+        # health ids are positional in the source file
+        for i, ft in enumerate(features):
+            ft.setdefault("properties", {}).setdefault("id", f"health:{i}")
+        return features
+    return ensure_ids(features, prefix=prefix)  # type: ignore[arg-type]
+
+
+def split_layers(
+    features: list[dict[str, Any]], layer_names: list[str]
+) -> dict[str, list[dict[str, Any]]]:
+    """``features`` of one source file divided into ``layer_names``, ids assigned."""
+    unfiltered = [n for n in layer_names if LAYERS[n][1] is None]
+    by_geom = {LAYERS[n][1]: n for n in layer_names if LAYERS[n][1] is not None}
+    layers: dict[str, list[dict[str, Any]]] = {n: [] for n in layer_names}
+    if unfiltered:
+        for n in unfiltered:
+            layers[n] = features
+    else:
+        # single pass over the combined file
+        for ft in features:
+            name = by_geom.get((ft.get("geometry") or {}).get("type"))
+            if name is not None:
+                layers[name].append(ft)
+    return {n: assign_ids(n, feats) for n, feats in layers.items()}
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Building a layer allocates hundreds of thousands of small containers, and
+    each allocation burst would otherwise set off another cyclic GC pass over
+    all of them. None of it is garbage, so the collector resumes once it is built.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+class SnapshotLayers(Mapping[str, list[dict[str, Any]]]):
+    """
+    The layers of a mapped snapshot, each built as GeoJSON dicts only when
+    first asked for. The array-backed paths of services.layers never ask,
+    so a worker serving only those keeps no per-feature objects and shares
+    the snapshot's pages with every other worker on the host.
+    """
+
+    def __init__(self, snap: BinarySnapshot, names: list[str]) -> None:
+        self._snap = snap
+        self._names = list(names)
+        self._built: dict[str, list[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> list[dict[str, Any]]:
+        features = self._built.get(name)
+        if features is not None:
+            return features
+        if name not in self._names:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._built:
+                with _gc_paused():
+                    self._built[name] = self._snap.features(name)
+            return self._built[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._built
+
+
+def _load(
+    path: str, layer_names: list[str], fp: tuple[Any, ...]
+) -> tuple[Mapping[str, list[dict[str, Any]]], BinarySnapshot | None]:
+    """
+    Layers from the pipeline's binary snapshot when it is current (mapped,
+    not decoded), else parsed from the JSON.
+    """
+    snap = open_binary(path, content_key(fp), layer_names)
+    if snap is not None:
+        return SnapshotLayers(snap, layer_names), snap
+    with _gc_paused():
+        return _parse(path, layer_names), None
+
+
+def _parse(path: str, layer_names: list[str]) -> dict[str, list[dict[str, Any]]]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    features = data.get("features", []) if isinstance(data, dict) else []
+    return split_layers(features, layer_names)
+
+
+class DatasetRegistry:
+    """
+    Process-wide cache of parsed datasets keyed by file path.
+
+    A file is parsed once and re-parsed only when its fingerprint changes. The
+    fingerprint itself is checked at most every ``check_interval`` seconds, so
+    steady-state requests do not touch the disk at all.
+    """
+
+    def __init__(self) -> None:
+        self._datasets: dict[str, Dataset] = {}
+        self._checked: dict[str, float] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, path: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(path, threading.Lock())
+
+    def get(self, path: str, layer_names: list[str], check_interval: float = 0.0) -> Dataset:
+        now = time.monotonic()
+        ds = self._datasets.get(path)
+        if ds is not None and now - self._checked.get(path, 0.0) < check_interval:
+            return ds
+
+        with self._lock_for(path):
+            ds = self._datasets.get(path)
+            fp = fingerprint(path)
+            if ds is None or ds.fingerprint != fp:
+                layers, snap = _load(path, layer_names, fp)
+                ds = Dataset(
+                    path=path,
+                    fingerprint=fp,
+                    version=dataset_version(fp),
+                    layers=layers,
+                    loaded_at=time.time(),
+                    binary=snap,
+                )
+                self._datasets[path] = ds
+            self._checked[path] = time.monotonic()
+            return ds
+
+    def clear(self) -> None:
+        with self._guard:
+            self._datasets.clear()
+            self._checked.clear()
+
+
+registry = DatasetRegistry()
+
+
+def get_dataset(layer: str) -> Dataset:
+    """Return the current parsed dataset that holds ``layer``."""
+    cfg = current_app.config
+    key = LAYERS[layer][0]
+    path = cfg[key]
+    siblings = [n for n, spec in LAYERS.items() if spec[0] == key]
+    return registry.get(path, siblings, cfg.get("DATASET_CHECK_INTERVAL", 0.0))
+
+
+def get_layer(layer: str) -> list[dict[str, Any]]:
+    """Return the base features of ``layer`` (ids assigned, no status overlay)."""
+    return get_dataset(layer).layers[layer]
@@ -0,0 +1,529 @@
+"""
+Routable road graph with shortest routes and isochrones to health facilities.
+
+The road LineStrings become a directed graph in CSR form: node ``i``'s
+outgoing edges are ``indptr[i]:indptr[i + 1]`` of the edge arrays, weighted
+by travel time from the road class. Checkpoints are snapped onto the nearest
+edge (splitting it when they fall mid-segment), so closing one blocks
+exactly that point of the network.
+
+Queries run A* towards the nearest facility. The heuristic is the travel
+time to the nearest facility on the graph with nothing closed, computed once
+per dataset by a reverse multi-source Dijkstra. Closures only ever add
+cost, so it stays an exact-or-under estimate for any set of closed
+checkpoints and facility filters, and most queries settle little more than
+the nodes on the route itself.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .facets import STATUS_FIELD
+from .kdtree import KDTree
+from .layers import LayerView, feature_ids, id_index, on_view_change, point_coords, status_index
+from .nearest import chord_to_metres, unit_vectors
+from .spatial import GridIndex
+
+SPEEDS_KMH = {"motorway": 90.0, "trunk": 70.0, "primary": 50.0, "secondary": 40.0}
+DEFAULT_SPEED_KMH = 30.0
+ACCESS_SPEED_KMH = 10.0  # between a point and the nearest road node
+SNAP_RADIUS_M = 50.0  # checkpoints farther than this from any road stay off the network
+NODE_TOLERANCE_M = 1.0  # snap to an existing node instead of splitting the edge
+CLOSED_STATUSES = ("closed",)
+
+
+def graph_path(geojson_path: str | Path) -> Path:
+    p = Path(geojson_path)
+    return p.with_suffix(p.suffix + ".graph.npz")
+
+
+def _direction(ft: dict[str, Any]) -> int:
+    """1 forward only, -1 backward only, 0 both ways."""
+    oneway = str((ft.get("properties") or {}).get("oneway") or "").lower()
+    return {"yes": 1, "true": 1, "1": 1, "-1": -1, "reverse": -1}.get(oneway, 0)
+
+
+def _speed(ft: dict[str, Any]) -> float:
+    highway = str((ft.get("properties") or {}).get("highway") or "")
+    return SPEEDS_KMH.get(highway.removesuffix("_link"), DEFAULT_SPEED_KMH)
+
+
+def _haversine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    chord = unit_vectors(a[:, 0], a[:, 1]) - unit_vectors(b[:, 0], b[:, 1])
+    return chord_to_metres(np.linalg.norm(chord, axis=1))
+
+
+@dataclass
+class RoadGraph:
+    lonlat: np.ndarray  # (n, 2) node coordinates
+    indptr: np.ndarray  # (n + 1,) CSR offsets of each node's outgoing edges
+    head: np.ndarray  # (m,) target node of each edge
+    seconds: np.ndarray  # (m,) travel time
+    metres: np.ndarray  # (m,) length
+    road: np.ndarray  # (m,) position of the road the edge belongs to
+    checkpoint_node: np.ndarray  # (c,) node of each checkpoint, -1 when off the network
+
+    ARRAYS = ("lonlat", "indptr", "head", "seconds", "metres", "road", "checkpoint_node")
+
+    @property
+    def size(self) -> int:
+        return len(self.lonlat)
+
+    @cached_property
+    def adjacency(self) -> tuple[list[int], list[int], list[float]]:
+        """CSR arrays as Python lists; the search loops index them per edge."""
+        return self.indptr.tolist(), self.head.tolist(), self.seconds.tolist()
+
+    @cached_property
+    def tail(self) -> np.ndarray:
+        """(m,) source node of each edge."""
+        return np.repeat(np.arange(self.size), np.diff(self.indptr))
+
+    @cached_property
+    def reverse(self) -> tuple[list[int], list[int], list[float]]:
+        """CSR of the reversed graph (incoming edges per node)."""
+        order = np.argsort(self.head, kind="stable")
+        indptr = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.head, minlength=self.size), out=indptr[1:])
+        return indptr.tolist(), self.tail[order].tolist(), self.seconds[order].tolist()
+
+    @cached_property
+    def tree(self) -> KDTree:
+        return KDTree(unit_vectors(self.lonlat[:, 0], self.lonlat[:, 1]))
+
+    def snap(self, lon: float, lat: float) -> tuple[int, float]:
+        """Nearest node to a point and the distance to it in metres."""
+        chord, idx = self.tree.nearest(unit_vectors(np.array([lon]), np.array([lat]))[0], 1)
+        return int(idx[0]), float(chord_to_metres(chord)[0])
+
+    def blocked(self, closed: np.ndarray) -> frozenset[int]:
+        """Nodes of the checkpoints flagged in ``closed`` (bool per checkpoint)."""
+        nodes = self.checkpoint_node[closed]
+        return frozenset(nodes[nodes >= 0].tolist())
+
+
+def _snap_checkpoints(
+    lonlat: np.ndarray, u: np.ndarray, v: np.ndarray, checkpoints: list[dict[str, Any]]
+) -> tuple[np.ndarray, dict[int, list[tuple[float, int]]], np.ndarray]:
+    """
+    Snap each checkpoint to its nearest segment within ``SNAP_RADIUS_M``.
+    Returns the node coordinates (with any new mid-segment nodes appended),
+    the splits per segment as (t, node), and the node of every checkpoint.
+    """
+    cp_node = np.full(len(checkpoints), -1, dtype=np.int64)
+    if not len(u):
+        return lonlat, {}, cp_node
+    a, b = lonlat[u], lonlat[v]
+    grid = GridIndex(np.column_stack([np.minimum(a, b), np.maximum(a, b)]))
+    extra: list[list[float]] = []
+    splits: dict[int, list[tuple[float, int]]] = {}
+    for c, ft in enumerate(checkpoints):
+        coords = (ft.get("geometry") or {}).get("coordinates")
+        if not coords:
+            continue
+        x, y = float(coords[0]), float(coords[1])
+        # local metres per degree around the checkpoint
+        scale = np.array([111_320.0 * math.cos(math.radians(y)), 110_574.0])
+        pad = SNAP_RADIUS_M / scale
+        cand = grid.query((x - pad[0], y - pad[1], x + pad[0], y + pad[1]))
+        if not len(cand):
+            continue
+        pa = (a[cand] - (x, y)) * scale
+        ab = (b[cand] - a[cand]) * scale
+        denom = (ab * ab).sum(axis=1)
+        t = np.clip(-(pa * ab).sum(axis=1) / np.where(denom == 0, 1.0, denom), 0.0, 1.0)
+        dist = np.hypot(*(pa + t[:, None] * ab).T)
+        j = int(dist.argmin())
+        if dist[j] > SNAP_RADIUS_M:
+            continue
+        s, tj, length = int(cand[j]), float(t[j]), float(np.sqrt(denom[j]))
+        if tj * length <= NODE_TOLERANCE_M:
+            cp_node[c] = u[s]
+        elif (1 - tj) * length <= NODE_TOLERANCE_M:
+            cp_node[c] = v[s]
+        else:
+            node = len(lonlat) + len(extra)
+            extra.append((a[s] + tj * (b[s] - a[s])).tolist())
+            splits.setdefault(s, []).append((tj, node))
+            cp_node[c] = node
+    if extra:
+        lonlat = np.vstack([lonlat, np.array(extra)])
+    return lonlat, splits, cp_node
+
+
+def build_graph(roads: list[dict[str, Any]], checkpoints: list[dict[str, Any]]) -> RoadGraph:
+    lines = [ft["geometry"]["coordinates"] for ft in roads]
+    lengths = np.fromiter((len(c) for c in lines), dtype=np.int64, count=len(lines))
+    coords = np.array([p[:2] for c in lines for p in c], dtype=float).reshape(-1, 2)
+    # vertices shared between roads become one node
+    lonlat, inverse = np.unique(np.round(coords, 7), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    line_of = np.repeat(np.arange(len(lines)), lengths)
+    same = line_of[:-1] == line_of[1:]
+    u, v, road = inverse[:-1][same], inverse[1:][same], line_of[:-1][same]
+    keep = u != v
+    u, v, road = u[keep], v[keep], road[keep]
+
+    lonlat, splits, cp_node = _snap_checkpoints(lonlat, u, v, checkpoints)
+    if splits:
+        us, vs, rs = [u], [v], [road]
+        whole = np.ones(len(u), dtype=bool)
+        for s, points in splits.items():
+            whole[s] = False
+            chain = [int(u[s])] + [node for _, node in sorted(points)] + [int(v[s])]
+            us.append(np.array(chain[:-1]))
+            vs.append(np.array(chain[1:]))
+            rs.append(np.full(len(chain) - 1, road[s]))
+        us[0], vs[0], rs[0] = u[whole], v[whole], road[whole]
+        u, v, road = np.concatenate(us), np.concatenate(vs), np.concatenate(rs)
+
+    metres = _haversine(lonlat[u], lonlat[v])
+    speed = np.array([_speed(ft) for ft in roads] or [DEFAULT_SPEED_KMH])[road]
+    seconds = metres / (speed / 3.6)
+    direction = np.array([_direction(ft) for ft in roads] or [0], dtype=np.int64)[road]
+    fwd, bwd = direction >= 0, direction <= 0
+    tail = np.concatenate([u[fwd], v[bwd]])
+    head = np.concatenate([v[fwd], u[bwd]])
+    order = np.argsort(tail, kind="stable")
+    n = len(lonlat)
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(tail, minlength=n), out=indptr[1:])
+    return RoadGraph(
+        lonlat=lonlat,
+        indptr=indptr,
+        head=head[order].astype(np.int64),
+        seconds=np.concatenate([seconds[fwd], seconds[bwd]])[order],
+        metres=np.concatenate([metres[fwd], metres[bwd]])[order],
+        road=np.concatenate([road[fwd], road[bwd]])[order].astype(np.int64),
+        checkpoint_node=cp_node,
+    )
+
+
+def _id_array(ids: Iterable[Any]) -> np.ndarray:
+    return np.array([str(fid) for fid in ids], dtype=str)
+
+
+def _feature_ids(features: list[dict[str, Any]]) -> np.ndarray:
+    return _id_array(ft["properties"]["id"] for ft in features)
+
+
+def write_graph(
+    geojson_path: str | Path,
+    roads: list[dict[str, Any]],
+    checkpoints: list[dict[str, Any]],
+    content_key: str,
+) -> RoadGraph:
+    graph = build_graph(roads, checkpoints)
+    target = graph_path(geojson_path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(target.parent)) as tmp:
+        np.savez_compressed(
+            tmp,
+            content_key=np.array(content_key),
+            road_ids=_feature_ids(roads),
+            checkpoint_ids=_feature_ids(checkpoints),
+            **{name: getattr(graph, name) for name in RoadGraph.ARRAYS},
+        )
+    Path(tmp.name).replace(target)
+    return graph
+
+
+def read_graph(
+    geojson_path: str | Path,
+    road_ids: Iterable[Any],
+    checkpoint_ids: Iterable[Any],
+    content_key: str,
+) -> RoadGraph | None:
+    """The pipeline's graph if it was built from exactly these ids and content key."""
+    try:
+        with np.load(graph_path(geojson_path), allow_pickle=False) as stored:
+            if (
+                str(stored["content_key"]) == content_key
+                and np.array_equal(stored["road_ids"], _id_array(road_ids))
+                and np.array_equal(stored["checkpoint_ids"], _id_array(checkpoint_ids))
+            ):
+                return RoadGraph(**{name: stored[name] for name in RoadGraph.ARRAYS})
+    except (OSError, ValueError, KeyError):
+        pass
+    return None
+
+
+def load_graph(
+    geojson_path: str | Path,
+    roads: list[dict[str, Any]],
+    checkpoints: list[dict[str, Any]],
+    content_key: str,
+) -> RoadGraph:
+    """The pipeline's graph if it matches this dataset, else a freshly built one."""
+    stored = read_graph(geojson_path, _feature_ids(roads), _feature_ids(checkpoints), content_key)
+    return stored if stored is not None else build_graph(roads, checkpoints)
+
+
+@dataclass
+class Targets:
+    """Health facilities attached to the graph."""
+
+    node: np.ndarray  # (f,) access node per facility
+    access_s: np.ndarray  # (f,) travel time between the facility and its node
+    lower_bound: list[float]  # per node: time to the nearest facility with nothing closed
+
+    @classmethod
+    def attach(cls, graph: RoadGraph, facilities: list[dict[str, Any]]) -> Targets:
+        coords = np.full((len(facilities), 2), np.nan)
+        for i, ft in enumerate(facilities):
+            point = (ft.get("geometry") or {}).get("coordinates")
+            if point:
+                coords[i] = point[:2]
+        return cls.from_coords(graph, coords)
+
+    @classmethod
+    def from_coords(cls, graph: RoadGraph, coords: np.ndarray) -> Targets:
+        """Facilities at (f, 2) lon/lat rows, NaN where one has no point."""
+        node = np.full(len(coords), -1, dtype=np.int64)
+        access = np.full(len(coords), np.inf)
+        located = np.flatnonzero(~np.isnan(coords).any(axis=1)).tolist() if graph.size else []
+        for i in located:
+            node[i], metres = graph.snap(float(coords[i, 0]), float(coords[i, 1]))
+            access[i] = metres / (ACCESS_SPEED_KMH / 3.6)
+        sources: dict[int, float] = {}
+        for n, s in zip(node.tolist(), access.tolist(), strict=True):
+            if n >= 0 and s < sources.get(n, math.inf):
+                sources[n] = s
+        dist = _dijkstra(graph.reverse, graph.size, sources)
+        return cls(node, access, dist)
+
+
+def _dijkstra(
+    adjacency: tuple[list[int], list[int], list[float]],
+    size: int,
+    sources: dict[int, float],
+    blocked: frozenset[int] = frozenset(),
+    cutoff: float = math.inf,
+    pred: dict[int, int] | None = None,
+) -> list[float]:
+    """Multi-source shortest times (inf where unreachable within ``cutoff``)."""
+    indptr, head, weight = adjacency
+    dist = [math.inf] * size
+    queue = []
+    for node, d in sources.items():
+        dist[node] = d
+        queue.append((d, node))
+    heapq.heapify(queue)
+    while queue:
+        d, node = heapq.heappop(queue)
+        if d > dist[node]:
+            continue
+        for e in range(indptr[node], indptr[node + 1]):
+            nxt = head[e]
+            nd = d + weight[e]
+            if nd < dist[nxt] and nd <= cutoff and nxt not in blocked:
+                dist[nxt] = nd
+                if pred is not None:
+                    pred[nxt] = e
+                heapq.heappush(queue, (nd, nxt))
+    return dist
+
+
+def _astar(
+    graph: RoadGraph,
+    origin: int,
+    origin_s: float,
+    goals: dict[int, tuple[float, int]],
+    lower_bound: list[float],
+    blocked: frozenset[int],
+) -> tuple[float, int, int, dict[int, int]] | None:
+    """
+    Fastest way from ``origin`` to any of ``goals`` (node -> (access time,
+    facility)). Returns (total seconds, goal node, facility, predecessor edges).
+    """
+    indptr, head, weight = graph.adjacency
+    g = {origin: origin_s}
+    pred: dict[int, int] = {}
+    queue = [(origin_s + lower_bound[origin], origin_s, origin)]
+    best: tuple[float, int, int] | None = None
+    while queue:
+        f, d, node = heapq.heappop(queue)
+        if best is not None and f >= best[0]:
+            break
+        if d > g.get(node, math.inf):
+            continue
+        goal = goals.get(node)
+        if goal is not None and (best is None or d + goal[0] < best[0]):
+            best = (d + goal[0], node, goal[1])
+        for e in range(indptr[node], indptr[node + 1]):
+            nxt = head[e]
+            nd = d + weight[e]
+            if nd < g.get(nxt, math.inf) and nxt not in blocked and lower_bound[nxt] < math.inf:
+                g[nxt] = nd
+                pred[nxt] = e
+                heapq.heappush(queue, (nd + lower_bound[nxt], nd, nxt))
+    if best is None:
+        return None
+    return best[0], best[1], best[2], pred
+
+
+def _path_edges(graph: RoadGraph, pred: dict[int, int], origin: int, goal: int) -> list[int]:
+    tail = graph.tail
+    edges = []
+    node = goal
+    while node != origin:
+        e = pred[node]
+        edges.append(e)
+        node = int(tail[e])
+    return edges[::-1]
+
+
+def route(
+    graph: RoadGraph,
+    targets: Targets,
+    origin: int,
+    allowed: np.ndarray | None,
+    blocked: frozenset[int],
+) -> dict[str, Any] | None:
+    """
+    Fastest route from node ``origin`` to the nearest allowed facility, as
+    times and geometry relative to that node (the caller adds the leg from
+    the requested point).
+    """
+    goals: dict[int, tuple[float, int]] = {}
+    for i, (n, s) in enumerate(zip(targets.node.tolist(), targets.access_s.tolist(), strict=True)):
+        if n >= 0 and (allowed is None or allowed[i]) and s < goals.get(n, (math.inf, -1))[0]:
+            goals[n] = (s, i)
+    found = _astar(graph, origin, 0.0, goals, targets.lower_bound, blocked - {origin})
+    if found is None:
+        return None
+    seconds, goal, facility, pred = found
+    edges = _path_edges(graph, pred, origin, goal)
+    nodes = [origin] + graph.head[edges].tolist()
+    return {
+        "facility": facility,
+        "seconds": seconds,
+        "metres": float(graph.metres[edges].sum()),
+        "coordinates": graph.lonlat[nodes].tolist(),
+        "roads": list(dict.fromkeys(graph.road[edges].tolist())),
+    }
+
+
+def reachable(
+    graph: RoadGraph, origin: int, origin_s: float, cutoff: float, blocked: frozenset[int]
+) -> np.ndarray:
+    """Travel time from ``origin`` to every node (inf beyond ``cutoff``)."""
+    dist = _dijkstra(graph.adjacency, graph.size, {origin: origin_s}, blocked - {origin}, cutoff)
+    return np.array(dist)
+
+
+def convex_hull(points: Iterable[tuple[float, float]]) -> list[list[float]]:
+    """Closed convex hull ring (monotone chain); fewer than 4 entries when degenerate."""
+    pts = sorted(set(points))
+    if len(pts) < 3:
+        return [list(p) for p in pts]
+
+    def half(seq: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        out: list[tuple[float, float]] = []
+        for p in seq:
+            while (
+                len(out) >= 2
+                and (
+                    (out[-1][0] - out[-2][0]) * (p[1] - out[-2][1])
+                    - (out[-1][1] - out[-2][1]) * (p[0] - out[-2][0])
+                )
+                <= 0
+            ):
+                out.pop()
+            out.append(p)
+        return out
+
+    ring = half(pts)[:-1] + half(pts[::-1])[:-1]
+    return [list(p) for p in ring + ring[:1]]
+
+
+class RouteCache:
+    """Thread-safe LRU of routing results."""
+
+    def __init__(self, maxsize: int = 2048) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                return self._items[key]
+            return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+route_cache = RouteCache()
+
+
+def road_graph(view: LayerView) -> RoadGraph:
+    """Graph of the roads/checkpoints dataset behind ``view``, loaded once per dataset load."""
+    ds = view.dataset
+    road_ids, checkpoint_ids = feature_ids(ds, "roads"), feature_ids(ds, "checkpoints")
+
+    def load() -> RoadGraph:
+        # the roads are only decoded when the pipeline's graph is missing or stale
+        stored = read_graph(ds.path, road_ids, checkpoint_ids, ds.content_key)
+        if stored is not None:
+            return stored
+        return build_graph(ds.layers["roads"], ds.layers["checkpoints"])
+
+    return ds.derive("graph", load)
+
+
+def facility_targets(network: LayerView, health: LayerView) -> Targets:
+    """Facilities attached to the graph, once per pair of dataset loads."""
+    key = ("targets", network.dataset.path, network.dataset.version)
+    graph, coords = road_graph(network), point_coords(health.dataset, health.name)
+    return health.dataset.derive(key, lambda: Targets.from_coords(graph, coords))
+
+
+def closed_nodes(checkpoints: LayerView, statuses: Iterable[str]) -> frozenset[int]:
+    """Graph nodes of the checkpoints whose overlay status is one of ``statuses``."""
+    statuses = tuple(sorted(statuses))
+
+    def build() -> frozenset[int]:
+        closed = status_index(checkpoints).mask(STATUS_FIELD, statuses)
+        return road_graph(checkpoints).blocked(closed)
+
+    return checkpoints.derive(("closed_nodes", statuses), build)
+
+
+@on_view_change
+def _invalidate_routes(view: LayerView, changed: set[str] | None) -> None:
+    # cache keys carry the closed set and the facility view version, so this
+    # only frees entries that can no longer be hit
+    if view.name == "checkpoints" and changed is not None:
+        graph = view.dataset.peek("graph")
+        ids = id_index(view)
+        positions = [ids[f] for f in changed if f in ids]
+        if graph is None or not (graph.checkpoint_node[positions] >= 0).any():
+            return
+    elif view.name != "health":
+        return
+    route_cache.clear()
@@ -0,0 +1,243 @@
+"""
+Bilingual name search.
+
+Every feature's names (``NAME``, ``name`` and the OSM ``tags.name*`` keys) are
+normalized and split into tokens. Prefix lookup is a bisect over the sorted
+vocabulary; tokens with no prefix match fall back to trigram similarity, and
+terms of four or more letters one edit away from the token match too, so
+small typos still hit (short words lose too many trigrams to one edit to
+clear the similarity threshold alone). Arabic is normalized by dropping diacritics and
+tatweel and unifying the alef, yaa, hamza and taa marbuta forms.
+"""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from typing import Any
+
+import numpy as np
+
+from .feature_store import FeatureStore
+from .layers import LayerView, base_store, get_view, iter_features
+
+NAME_FIELDS = ("NAME", "name")
+TAG_NAME = re.compile(r"^(name|official_name|alt_name|old_name|short_name)(:[a-z]{2,3})?$")
+
+ARABIC_FOLD = str.maketrans(
+    {
+        "أ": "ا",
+        "إ": "ا",
+        "آ": "ا",
+        "ٱ": "ا",
+        "ى": "ي",
+        "ئ": "ي",
+        "ؤ": "و",
+        "ة": "ه",
+        "ـ": None,  # tatweel
+    }
+)
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]")
+_SEPARATORS = re.compile(r"[\W_]+")
+
+PREFIX_WEIGHT = 0.6  # a bare prefix; grows towards 1.0 as it covers more of the token
+FUZZY_WEIGHT = 0.5
+MIN_SIMILARITY = 0.4
+MIN_EDIT_LENGTH = 4  # shorter tokens need MIN_SIMILARITY; one edit changes most of them
+MAX_FUZZY_TERMS = 8
+LEAD_BONUS = 0.5  # the query starts one of the names
+
+
+def normalize(text: str) -> str:
+    """Casefolded text with Latin accents and Arabic diacritics removed."""
+    text = _DIACRITICS.sub("", text.translate(ARABIC_FOLD))
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _SEPARATORS.split(normalize(text)) if t]
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Whether ``a`` and ``b`` differ by at most one insertion, deletion,
+    substitution or swap of adjacent letters."""
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    if a[i + 1 :] == b[i + 1 :]:
+        return True
+    swapped = i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i]
+    return swapped and a[i + 2 :] == b[i + 2 :]
+
+
+def _names(fields: Iterable[Any], tags: Any) -> list[str]:
+    names = [str(v) for v in fields if v]
+    if isinstance(tags, dict):
+        names += [str(v) for k, v in tags.items() if v and TAG_NAME.match(k)]
+    return list(dict.fromkeys(names))
+
+
+def feature_names(ft: dict[str, Any]) -> list[str]:
+    """Every name of a feature, display name first."""
+    props = ft.get("properties") or {}
+    return _names((props.get(k) for k in NAME_FIELDS), props.get("tags"))
+
+
+class SearchIndex:
+    def __init__(self, features: Sequence[dict[str, Any]]) -> None:
+        self._build([feature_names(ft) for ft in features])
+
+    @classmethod
+    def from_store(cls, store: FeatureStore) -> SearchIndex:
+        """Index over the name columns of ``store``, without building its features."""
+        fields = zip(*(store.column_values(k) for k in NAME_FIELDS), strict=True)
+        index = cls.__new__(cls)
+        index._build(
+            [
+                _names(values, tags)
+                for values, tags in zip(fields, store.column_values("tags"), strict=True)
+            ]
+        )
+        return index
+
+    def _build(self, names_per_feature: list[list[str]]) -> None:
+        self.labels: list[str | None] = []
+        postings: dict[str, set[int]] = {}
+        leading: dict[str, set[int]] = {}  # tokens that start one of the names
+        for i, names in enumerate(names_per_feature):
+            self.labels.append(names[0] if names else None)
+            for name in names:
+                tokens = tokenize(name)
+                if tokens:
+                    leading.setdefault(tokens[0], set()).add(i)
+                for token in tokens:
+                    postings.setdefault(token, set()).add(i)
+        self.size = len(self.labels)
+        self.label_len = np.array([len(label or "") for label in self.labels], dtype=np.int64)
+        self.vocab = sorted(postings)
+        self.postings = [np.fromiter(sorted(postings[t]), dtype=np.int64) for t in self.vocab]
+        self.leading = {t: np.fromiter(sorted(d), dtype=np.int64) for t, d in leading.items()}
+        self.grams: dict[str, list[int]] = {}
+        for v, token in enumerate(self.vocab):
+            for g in _trigrams(token):
+                self.grams.setdefault(g, []).append(v)
+
+    def _terms(self, token: str) -> list[tuple[int, float]]:
+        """(vocabulary index, weight) of the terms ``token`` matches."""
+        out = []
+        v = bisect_left(self.vocab, token)
+        while v < len(self.vocab) and self.vocab[v].startswith(token):
+            term = self.vocab[v]
+            out.append(
+                (
+                    v,
+                    (
+                        1.0
+                        if term == token
+                        else PREFIX_WEIGHT + (1 - PREFIX_WEIGHT) * len(token) / len(term)
+                    ),
+                )
+            )
+            v += 1
+        if out or len(token) < 3:
+            return out
+
+        grams = _trigrams(token)
+        shared = Counter(v for g in grams for v in self.grams.get(g, ()))
+        similar = []
+        for v, n in shared.items():
+            term = self.vocab[v]
+            sim = n / (len(grams) + len(_trigrams(term)) - n)
+            if sim >= MIN_SIMILARITY or (
+                len(token) >= MIN_EDIT_LENGTH and within_one_edit(token, term)
+            ):
+                similar.append((sim, v))
+        return [
+            (v, FUZZY_WEIGHT * sim) for sim, v in sorted(similar, reverse=True)[:MAX_FUZZY_TERMS]
+        ]
+
+    def search(self, query: str, limit: int) -> list[tuple[float, int]]:
+        """(score, position) of the best matches; every query token must match."""
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self.size:
+            return []
+        total = np.zeros(self.size)
+        alive = np.ones(self.size, dtype=bool)
+        for n, token in enumerate(tokens):
+            best = np.zeros(self.size)
+            lead = np.zeros(self.size)
+            for v, weight in self._terms(token):
+                post = self.postings[v]
+                best[post] = np.maximum(best[post], weight)
+                if n == 0 and self.vocab[v] in self.leading:
+                    first = self.leading[self.vocab[v]]
+                    lead[first] = np.maximum(lead[first], weight)
+            alive &= best > 0
+            total += best + LEAD_BONUS * lead
+        docs = np.flatnonzero(alive)
+        if len(docs) > limit:
+            # everything tied with the limit-th score survives for the tie-breaks below
+            cut = np.partition(-total[docs], limit - 1)[limit - 1]
+            docs = docs[-total[docs] <= cut]
+        order = np.lexsort((docs, self.label_len[docs], -total[docs]))[:limit]
+        return [(float(total[d]), int(d)) for d in docs[order]]
+
+
+def search_index(view: LayerView) -> SearchIndex:
+    """Name index of a layer, built once per dataset load."""
+    ds, name = view.dataset, view.name
+    if ds.binary is not None:
+        store = base_store(ds, name)
+        return ds.derive(("search", name), lambda: SearchIndex.from_store(store))
+    return ds.derive(("search", name), lambda: SearchIndex(ds.layers[name]))
+
+
+def search(query: str, layers: Sequence[str], limit: int) -> list[dict[str, Any]]:
+    """Best ``limit`` matches across ``layers`` as GeoJSON features."""
+    hits = []
+    views = {name: get_view(name) for name in layers}
+    for name, view in views.items():
+        hits += [(score, name, i) for score, i in search_index(view).search(query, limit)]
+    hits.sort(key=lambda h: -h[0])
+    hits = hits[:limit]
+    # build only the hits, each layer in one pass
+    found: dict[tuple[str, int], dict[str, Any]] = {}
+    for name, view in views.items():
+        positions = [i for _, layer, i in hits if layer == name]
+        found.update(
+            zip(((name, i) for i in positions), iter_features(view, positions), strict=True)
+        )
+    out = []
+    for score, name, i in hits:
+        view = views[name]
+        ft = found[(name, i)]
+        props = ft.get("properties") or {}
+        out.append(
+            {
+                "type": "Feature",
+                "geometry": ft.get("geometry"),
+                "properties": {
+                    "id": props.get("id"),
+                    "layer": name,
+                    "name": search_index(view).labels[i],
+                    "status": props.get("status"),
+                    "score": round(score, 3),
+                },
+            }
+        )
+    return out
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def _segment_distances(pts: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distance of each row of ``pts`` to the segment a-b."""
+    ab = b - a
+    denom = float(ab @ ab)
+    if denom == 0.0:
+        proj = a
+    else:
+        t = np.clip(((pts - a) @ ab) / denom, 0.0, 1.0)
+        proj = a + t[:, None] * ab
+    dist: np.ndarray = np.hypot(*(pts - proj).T)
+    return dist
+
+
+def douglas_peucker_mask(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    """
+    Boolean mask of the vertices Douglas-Peucker keeps for ``coords`` (n, 2).
+    Endpoints are always kept; distances per split are computed with NumPy.
+    """
+    n = len(coords)
+    keep = np.zeros(n, dtype=bool)
+    if n == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    if n < 3 or tolerance <= 0:
+        keep[:] = True
+        return keep
+    stack = [(0, n - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        d = _segment_distances(coords[lo + 1 : hi], coords[lo], coords[hi])
+        k = int(d.argmax())
+        if d[k] > tolerance:
+            mid = lo + 1 + k
+            keep[mid] = True
+            stack.append((lo, mid))
+            stack.append((mid, hi))
+    return keep
+
+
+def douglas_peucker(coords: np.ndarray, tolerance: float) -> np.ndarray:
+    kept: np.ndarray = coords[douglas_peucker_mask(coords, tolerance)]
+    return kept
+
+
+def _split_points(
+    coords: np.ndarray, lo: np.ndarray, hi: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    For every interval (lo[i], hi[i]) with interior points, the index and
+    distance of the interior point farthest from the chord lo-hi.
+    """
+    counts = hi - lo - 1
+    first = np.cumsum(counts) - counts
+    owner = np.repeat(np.arange(len(lo)), counts)
+    pidx = lo[owner] + 1 + (np.arange(int(counts.sum())) - first[owner])
+
+    a, b, p = coords[lo[owner]], coords[hi[owner]], coords[pidx]
+    ab = b - a
+    denom = (ab * ab).sum(axis=1)
+    t = np.clip(((p - a) * ab).sum(axis=1) / np.where(denom == 0, 1.0, denom), 0.0, 1.0)
+    d = np.hypot(*(p - a - t[:, None] * ab).T)
+
+    dmax = np.maximum.reduceat(d, first)
+    at_max = np.flatnonzero(d == dmax[owner])
+    grp = owner[at_max]
+    return pidx[at_max[np.r_[True, grp[1:] != grp[:-1]]]], dmax
+
+
+def simplify_many(
+    coords: np.ndarray, offsets: np.ndarray, tolerance: float, anchors: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    Douglas-Peucker over many polylines at once. ``coords`` (n, 2) holds every
+    line back to back, line i spanning ``offsets[i]:offsets[i + 1]``. Each round
+    splits all pending intervals of all lines in one vectorized pass.
+
+    Vertices flagged in ``anchors`` (e.g. junctions shared with other roads)
+    are always kept, so simplified lines still meet where the originals did.
+    Returns the boolean keep mask.
+    """
+    n = len(coords)
+    keep = np.zeros(n, dtype=bool) if anchors is None else anchors.copy()
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    nonempty = ends >= starts
+    keep[starts[nonempty]] = True
+    keep[ends[nonempty]] = True
+
+    fixed = np.flatnonzero(keep)
+    line_of = np.repeat(np.arange(len(starts)), offsets[1:] - offsets[:-1])
+    same_line = line_of[fixed[:-1]] == line_of[fixed[1:]]
+    lo, hi = fixed[:-1][same_line], fixed[1:][same_line]
+    while len(lo):
+        pending = hi - lo > 1
+        lo, hi = lo[pending], hi[pending]
+        if not len(lo):
+            break
+        mid, dmax = _split_points(coords, lo, hi)
+        split = dmax > tolerance
+        mid = mid[split]
+        keep[mid] = True
+        lo, hi = np.concatenate([lo[split], mid]), np.concatenate([mid, hi[split]])
+    return keep
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Any
+
+import numpy as np
+
+BBox = tuple[float, float, float, float]  # (min_lon, min_lat, max_lon, max_lat)
+
+
+def envelope(geom: dict[str, Any] | None) -> BBox | None:
+    """Bounding box of a Point/LineString/Polygon geometry, or None if empty."""
+    if not geom:
+        return None
+    coords = geom.get("coordinates") or []
+    t = geom.get("type")
+    if t == "Point":
+        if not coords or len(coords) < 2:
+            return None
+        return (coords[0], coords[1], coords[0], coords[1])
+    if t in ("MultiPoint", "LineString"):
+        pts = coords
+    elif t in ("Polygon", "MultiLineString"):
+        pts = [p for ring in coords for p in ring]
+    elif t == "MultiPolygon":
+        pts = [p for poly in coords for ring in poly for p in ring]
+    else:
+        return None
+    if not pts:
+        return None
+    xs = [p[0] for p in pts]
+    ys = [p[1] for p in pts]
+    return (min(xs), min(ys), max(xs), max(ys))
+
+
+def parse_bbox(raw: str) -> BBox:
+    """Parse ``minLon,minLat,maxLon,maxLat``; raises ValueError on bad input."""
+    try:
+        parts = [float(p) for p in raw.split(",")]
+    except ValueError:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat") from None
+    if len(parts) != 4:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox min values must not exceed max values")
+    return (min_lon, min_lat, max_lon, max_lat)
+
+
+class GridIndex:
+    """
+    Uniform-grid spatial index over feature envelopes.
+
+    Cell membership is stored CSR-style (``cell_start`` offsets into ``items``)
+    sorted by row-major cell id, so the cells of one grid row inside a query
+    box form a single contiguous slice. Features whose envelope spans several
+    cells are listed in each of them and de-duplicated at query time.
+    """
+
+    def __init__(self, envelopes: np.ndarray, target_per_cell: int = 8) -> None:
+        # envelopes: float64 (n, 4) of minx, miny, maxx, maxy; NaN rows never match
+        self.envelopes = envelopes
+        n = len(envelopes)
+        valid = ~np.isnan(envelopes).any(axis=1)
+        if valid.any():
+            self.origin = (envelopes[valid, 0].min(), envelopes[valid, 1].min())
+            extent_x = max(envelopes[valid, 2].max() - self.origin[0], 1e-9)
+            extent_y = max(envelopes[valid, 3].max() - self.origin[1], 1e-9)
+        else:
+            self.origin, extent_x, extent_y = (0.0, 0.0), 1.0, 1.0
+        cells = max(1, int(valid.sum()) // target_per_cell)
+        aspect = extent_x / extent_y
+        self.nx = max(1, min(1024, int(round((cells * aspect) ** 0.5))))
+        self.ny = max(1, min(1024, int(round(cells / self.nx))))
+        self.cell_w = extent_x / self.nx
+        self.cell_h = extent_y / self.ny
+
+        idx = np.nonzero(valid)[0]
+        ix0, iy0 = self._cell(envelopes[idx, 0], envelopes[idx, 1])
+        ix1, iy1 = self._cell(envelopes[idx, 2], envelopes[idx, 3])
+        # expand every envelope into the cells it covers, without a Python loop
+        wx = ix1 - ix0 + 1
+        counts = wx * (iy1 - iy0 + 1)
+        owner = np.repeat(np.arange(len(idx)), counts)
+        local = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_id = (iy0[owner] + local // wx[owner]) * self.nx + ix0[owner] + local % wx[owner]
+        member = idx[owner]
+
+        order = np.argsort(cell_id, kind="stable")
+        self.items = member[order].astype(np.int64)
+        self.cell_start = np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cell_id, minlength=self.nx * self.ny), out=self.cell_start[1:])
+        self.size = n
+
+    @classmethod
+    def from_features(cls, features: Sequence[dict[str, Any]]) -> GridIndex:
+        env = np.full((len(features), 4), np.nan)
+        for i, ft in enumerate(features):
+            box = envelope(ft.get("geometry"))
+            if box is not None:
+                env[i] = box
+        return cls(env)
+
+    def _cell(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        ix = np.clip(((x - self.origin[0]) / self.cell_w).astype(np.int64), 0, self.nx - 1)
+        iy = np.clip(((y - self.origin[1]) / self.cell_h).astype(np.int64), 0, self.ny - 1)
+        return ix, iy
+
+    def query(self, bbox: BBox) -> np.ndarray:
+        """Indices (ascending) of features whose envelope intersects ``bbox``."""
+        min_x, min_y, max_x, max_y = bbox
+        (ix0, ix1), (iy0, iy1) = self._cell(np.array([min_x, max_x]), np.array([min_y, max_y]))
+        chunks = []
+        for row in range(int(iy0), int(iy1) + 1):
+            a = self.cell_start[row * self.nx + int(ix0)]
+            b = self.cell_start[row * self.nx + int(ix1) + 1]
+            if b > a:
+                chunks.append(self.items[a:b])
+        if not chunks:
+            return np.empty(0, dtype=np.int64)
+        cand = np.unique(np.concatenate(chunks))
+        env = self.envelopes[cand]
+        hit = (
+            (env[:, 0] <= max_x)
+            & (env[:, 2] >= min_x)
+            & (env[:, 1] <= max_y)
+            & (env[:, 3] >= min_y)
+        )
+        return cand[hit]
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from pathlib import Path
+
+from flask import current_app
+
+from . import mvt
+from .encoded import EncodedBody
+from .layers import LayerView, id_index, iter_features, on_view_change, spatial_index
+
+MVT_MIMETYPE = "application/vnd.mapbox-vector-tile"
+EMPTY = EncodedBody(b"", MVT_MIMETYPE)
+
+
+# (path, layer, base version, z, x, y)
+TileKey = tuple[str, str, str, int, int, int]
+
+
+class TileCache:
+    """Thread-safe LRU of encoded tiles keyed by (path, layer, version, z, x, y)."""
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self.maxsize = maxsize
+        self._tiles: OrderedDict[TileKey, EncodedBody] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: TileKey) -> EncodedBody | None:
+        with self._lock:
+            body = self._tiles.get(key)
+            if body is not None:
+                self._tiles.move_to_end(key)
+            return body
+
+    def put(self, key: TileKey, body: EncodedBody) -> None:
+        with self._lock:
+            self._tiles[key] = body
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.maxsize:
+                self._tiles.popitem(last=False)
+
+    def keys(self) -> list[TileKey]:
+        with self._lock:
+            return list(self._tiles)
+
+    def discard(self, keys: Iterable[TileKey]) -> int:
+        with self._lock:
+            return sum(self._tiles.pop(k, None) is not None for k in keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tiles.clear()
+
+
+tile_cache = TileCache()
+
+# overlay version that each (path, layer, base version)'s tiles were last
+# invalidated for; a render from an older view must not put back what it dropped
+_invalidated: dict[tuple[str, str, str], str] = {}
+_invalidate_lock = threading.Lock()
+
+
+def disk_tile_path(root: str | Path, layer: str, key: str, z: int, x: int, y: int) -> Path:
+    return Path(root) / layer / key / str(z) / str(x) / f"{y}.mvt"
+
+
+def write_tile(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", delete=False, dir=str(path.parent)) as tmp:
+        tmp.write(data)
+    Path(tmp.name).replace(path)
+
+
+def render(view: LayerView, z: int, x: int, y: int) -> bytes:
+    """Clip, simplify and encode the features of ``view`` that touch tile z/x/y."""
+    hits = spatial_index(view).query(mvt.buffered_bounds(z, x, y))
+    return mvt.encode_layer(view.name, iter_features(view, hits.tolist()), z, x, y)
+
+
+def get_tile(view: LayerView, z: int, x: int, y: int) -> EncodedBody:
+    """
+    Encoded tile for ``view``. Served from the LRU, else from the on-disk cache
+    (which holds base tiles only, so tiles touching an overlaid feature skip
+    it), else rendered.
+    """
+    key = (view.dataset.path, view.name, view.base_version, z, x, y)
+    body = tile_cache.get(key)
+    if body is not None:
+        return body
+
+    disk_root = current_app.config.get("TILE_CACHE_DIR")
+    disk_path = None
+    if disk_root:
+        ids = id_index(view)
+        touched = {ids[fid] for fid in view.updates if fid in ids}
+        overlaid = touched and any(
+            i in touched for i in spatial_index(view).query(mvt.buffered_bounds(z, x, y)).tolist()
+        )
+        if not overlaid:
+            disk_path = disk_tile_path(disk_root, view.name, view.dataset.content_key, z, x, y)
+
+    data = None
+    if disk_path is not None and disk_path.exists():
+        data = disk_path.read_bytes()
+    if data is None:
+        data = render(view, z, x, y)
+        if disk_path is not None:
+            write_tile(disk_path, data)
+
+    body = EncodedBody(data, MVT_MIMETYPE) if data else EMPTY
+    with _invalidate_lock:
+        if _invalidated.get(key[:3], view.overlay_version) == view.overlay_version:
+            tile_cache.put(key, body)
+    return body
+
+
+@on_view_change
+def _invalidate(view: LayerView, changed: set[str] | None) -> None:
+    """Drop only the cached tiles that touch features whose status changed."""
+    if changed is None:
+        # base reload: old keys carry the old version and age out of the LRU
+        return
+    prefix = (view.dataset.path, view.name, view.base_version)
+    with _invalidate_lock:
+        _invalidated[prefix] = view.overlay_version
+        keys = tile_cache.keys()
+        cached = [k for k in keys if k[:3] == prefix]
+        if not cached:
+            return
+        # from the index rather than view.features: no dicts over a snapshot
+        ids, boxes = id_index(view), spatial_index(view).envelopes
+        rows = [boxes[ids[fid]].tolist() for fid in changed if fid in ids]
+        envelopes = [e for e in rows if e[0] == e[0]]  # NaN rows: empty geometry
+        stale = []
+        for key in cached:
+            z, x, y = key[3:]
+            tb = mvt.buffered_bounds(z, x, y)
+            if any(
+                e[0] <= tb[2] and e[2] >= tb[0] and e[1] <= tb[3] and e[3] >= tb[1]
+                for e in envelopes
+            ):
+                stale.append(key)
+        tile_cache.discard(stale)
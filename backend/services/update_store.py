@@ -0,0 +1,284 @@
+"""
+Filtered, paginated listing of the latest status update per id.
+
+The JSONL logs stay the record the map overlays follow; when
+UPDATES_BACKEND is "sqlite" every accepted update is also written to a
+WAL-mode SQLite database that keeps the full history (indexed on
+(category, id, ts)) and a ``latest`` table upserted on insert, so the admin
+listing is an index range scan instead of a pass over the log.
+
+Listings are newest first, ties broken by id descending, and page with a
+keyset cursor on (ts, id): an id re-reported while a client pages moves to
+the front and is not repeated.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from .pagination import decode_cursor, encode_cursor, parse_limit
+from .updates import _parse_dt, iter_history
+
+CURSOR_VERSION = "updates"
+IMPORT_BATCH = 10_000
+
+
+@dataclass
+class ListFilter:
+    statuses: frozenset[str] = frozenset()
+    since: float | None = None
+    reporter: str | None = None
+    tags: frozenset[str] = frozenset()
+    limit: int | None = None
+    after: tuple[float, str] | None = None
+
+    def matches(self, ts: float, row: Mapping[str, Any]) -> bool:
+        if self.statuses and row.get("status") not in self.statuses:
+            return False
+        if self.since is not None and ts < self.since:
+            return False
+        if self.reporter is not None and row.get("reporter") != self.reporter:
+            return False
+        return not self.tags or bool(self.tags.intersection(row.get("tags") or ()))
+
+
+def _split(raw: str | None) -> frozenset[str]:
+    return frozenset(v.strip() for v in (raw or "").split(",") if v.strip())
+
+
+def parse_list_args(args: Mapping[str, str], max_limit: int) -> ListFilter:
+    """
+    ``status=``, ``since=``, ``reporter=``, ``tags=``, ``limit=``, ``cursor=``;
+    raises ValueError.
+    """
+    since = None
+    if args.get("since"):
+        try:
+            since = _parse_dt(args["since"]).timestamp()
+        except ValueError:
+            raise ValueError("since must be ISO-8601, e.g. 2025-08-19T13:45:00Z") from None
+    after = None
+    if args.get("cursor"):
+        try:
+            ts, fid = json.loads(decode_cursor(args["cursor"], CURSOR_VERSION))
+            after = (float(ts), str(fid))
+        except (TypeError, ValueError):
+            raise ValueError("invalid cursor") from None
+    return ListFilter(
+        statuses=_split(args.get("status")),
+        since=since,
+        reporter=args.get("reporter") or None,
+        tags=_split(args.get("tags")),
+        limit=parse_limit(args.get("limit"), max_limit),
+        after=after,
+    )
+
+
+def next_cursor(last: tuple[float, str] | None) -> str | None:
+    return encode_cursor(CURSOR_VERSION, json.dumps(list(last))) if last else None
+
+
+def filter_entries(
+    entries: Iterable[tuple[float, str, dict[str, Any]]], flt: ListFilter
+) -> tuple[list[dict[str, Any]], tuple[float, str] | None]:
+    """
+    Apply ``flt`` to newest-first (ts, id, row) entries (StatusLog.entries).
+    Returns the page and the (ts, id) to resume after, None on the last page.
+    """
+    rows: list[dict[str, Any]] = []
+    last = None
+    for ts, fid, row in entries:
+        if flt.after is not None and (ts, fid) >= flt.after:
+            continue
+        if not flt.matches(ts, row):
+            continue
+        if flt.limit is not None and len(rows) == flt.limit:
+            return rows, last
+        rows.append(row)
+        last = (ts, fid)
+    return rows, None
+
+
+class SqliteStore:
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS updates (
+        seq INTEGER PRIMARY KEY,
+        category TEXT NOT NULL,
+        id TEXT NOT NULL,
+        ts REAL NOT NULL,
+        body TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS updates_category_id_ts ON updates (category, id, ts);
+    CREATE TABLE IF NOT EXISTS latest (
+        category TEXT NOT NULL,
+        id TEXT NOT NULL,
+        ts REAL NOT NULL,
+        status TEXT,
+        reporter TEXT,
+        tags TEXT,
+        body TEXT NOT NULL,
+        PRIMARY KEY (category, id)
+    );
+    CREATE INDEX IF NOT EXISTS latest_category_ts ON latest (category, ts, id);
+    CREATE INDEX IF NOT EXISTS latest_category_status_ts ON latest (category, status, ts, id);
+    """
+
+    # later writes win ties, as in StatusLog
+    UPSERT = """
+    INSERT INTO latest (category, id, ts, status, reporter, tags, body)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (category, id) DO UPDATE SET
+        ts = excluded.ts, status = excluded.status, reporter = excluded.reporter,
+        tags = excluded.tags, body = excluded.body
+    WHERE excluded.ts >= latest.ts
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # one-shot rebuild of ``latest`` from the history, newest (then last written) per id
+    REBUILD = """
+    INSERT INTO latest (category, id, ts, status, reporter, tags, body)
+    SELECT category, id, ts, json_extract(body, '$.status'), json_extract(body, '$.reporter'),
+           CASE WHEN json_array_length(body, '$.tags') > 0 THEN json_extract(body, '$.tags') END,
+           body
+    FROM (
+        SELECT *, ROW_NUMBER() OVER (PARTITION BY id ORDER BY ts DESC, seq DESC) AS rn
+        FROM updates WHERE category = ?
+    ) WHERE rn = 1
+    """ + UPSERT[UPSERT.index("ON CONFLICT") :]
+
+    def append(
+        self, category: str, rows: Iterable[dict[str, Any]], history_only: bool = False
+    ) -> int:
+        """
+        Insert ``rows`` in one transaction; rows without id or a valid
+        verified_at are skipped. ``history_only`` leaves ``latest`` alone.
+        """
+        history, latest = [], []
+        for row in rows:
+            fid = row.get("id")
+            try:
+                ts = _parse_dt(row.get("verified_at") or "").timestamp()
+            except (TypeError, ValueError):
+                continue
+            if not fid:
+                continue
+            body = json.dumps(row, ensure_ascii=False)
+            history.append((category, str(fid), ts, body))
+            if not history_only:
+                tags = row.get("tags")
+                latest.append(
+                    (
+                        category,
+                        str(fid),
+                        ts,
+                        row.get("status"),
+                        row.get("reporter"),
+                        json.dumps(tags) if tags else None,
+                        body,
+                    )
+                )
+        if history:
+            with self._conn() as conn:
+                conn.executemany(
+                    "INSERT INTO updates (category, id, ts, body) VALUES (?, ?, ?, ?)", history
+                )
+                if not history_only:
+                    conn.executemany(self.UPSERT, latest)
+        return len(history)
+
+    def list_latest(
+        self, category: str, flt: ListFilter
+    ) -> tuple[list[dict[str, Any]], tuple[float, str] | None]:
+        """Same contract as filter_entries, answered from the ``latest`` table."""
+        sql = ["SELECT ts, id, body FROM latest WHERE category = ?"]
+        params: list[Any] = [category]
+        if flt.statuses:
+            sql.append(f"AND status IN ({','.join('?' * len(flt.statuses))})")
+            params += sorted(flt.statuses)
+        if flt.since is not None:
+            sql.append("AND ts >= ?")
+            params.append(flt.since)
+        if flt.reporter is not None:
+            sql.append("AND reporter = ?")
+            params.append(flt.reporter)
+        if flt.tags:
+            sql.append(
+                "AND EXISTS (SELECT 1 FROM json_each(latest.tags) "
+                f"WHERE value IN ({','.join('?' * len(flt.tags))}))"
+            )
+            params += sorted(flt.tags)
+        if flt.after is not None:
+            sql.append("AND (ts < ? OR (ts = ? AND id < ?))")
+            params += [flt.after[0], flt.after[0], flt.after[1]]
+        sql.append("ORDER BY ts DESC, id DESC")
+        if flt.limit is not None:
+            sql.append("LIMIT ?")
+            params.append(flt.limit + 1)
+        found = self._conn().execute(" ".join(sql), params).fetchall()
+        more = flt.limit is not None and len(found) > flt.limit
+        found = found[: flt.limit] if more else found
+        last = (found[-1][0], found[-1][1]) if more else None
+        return [json.loads(body) for _, _, body in found], last
+
+    def import_jsonl(self, path: str | Path, category: str | None = None) -> int:
+        """Load the full history of one updates log (segments and tail); returns rows stored."""
+        path = Path(path)
+        category = category or path.stem
+        existing = self._conn().execute(
+            "SELECT 1 FROM updates WHERE category = ? LIMIT 1", (category,)
+        )
+        if existing.fetchone():
+            raise ValueError(f"{category} updates are already in {self.path}")
+        batch: list[dict[str, Any]] = []
+        stored = 0
+        for row in iter_history(path):
+            batch.append(row)
+            if len(batch) == IMPORT_BATCH:
+                stored += self.append(category, batch, history_only=True)
+                batch = []
+        stored += self.append(category, batch, history_only=True)
+        with self._conn() as conn:
+            conn.execute(self.REBUILD, (category,))
+        return stored
+
+
+_stores: dict[str, SqliteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def sqlite_store(path: str | Path) -> SqliteStore:
+    """The process-wide store for the database at ``path``."""
+    key = str(path)
+    store = _stores.get(key)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(key) or _stores.setdefault(key, SqliteStore(path))
+    return store
+
+
+def import_updates(updates_dir: str | Path, db_path: str | Path) -> dict[str, int]:
+    """One-shot import of every ``<category>.jsonl`` history in ``updates_dir``."""
+    updates_dir = Path(updates_dir)
+    store = sqlite_store(db_path)
+    stems = sorted({p.name.split(".", 1)[0] for p in updates_dir.glob("*.jsonl*")})
+    return {stem: store.import_jsonl(updates_dir / f"{stem}.jsonl", stem) for stem in stems}
@@ -1,48 +1,481 @@
 from __future__ import annotations
-import json, os
+
+import gzip
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from datetime import UTC, datetime
 from pathlib import Path
-from typing import Dict, Any, Iterable
-from datetime import datetime
+from typing import Any
+
+from flask import current_app
+
+from .files import atomic_write_json
+from .log_writer import locked_log
+
+try:  # POSIX only; without it concurrent compactions are not excluded
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore[assignment]
+
+# categories the admin API accepts updates for; the first four overlay layers
+CATEGORIES = ("health", "checkpoints", "roads", "borders", "food", "water", "shelters")
+
+def updates_path(category: str) -> Path:
+    """Location of the append-only status log for ``category``."""
+    return Path(current_app.config["UPDATES_DIR"]) / f"{category}.jsonl"
 
 def _parse_dt(s: str) -> datetime:
     return datetime.fromisoformat(s.replace("Z","+00:00"))
 
-def load_updates(path: str | Path) -> Dict[str, Dict[str, Any]]:
+# Compaction layout next to <category>.jsonl (the live tail):
+#   <category>.snapshot.json     latest row per id up to and including segment N
+#   <category>.<N>.jsonl.gz      rotated history, one file per compaction
+#   <category>.<N>.jsonl         a rotated segment not yet folded in (crash or
+#                                compaction in progress); readers replay it
+_SEGMENT = re.compile(r"^(?P<stem>.+)\.(?P<n>\d{6})\.jsonl(?P<gz>\.gz)?$")
+
+def snapshot_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.stem}.snapshot.json")
+
+def segment_path(path: str | Path, n: int, compressed: bool=True) -> Path:
+    path = Path(path)
+    return path.with_name(f"{path.stem}.{n:06d}.jsonl" + (".gz" if compressed else ""))
+
+def segments(path: str | Path) -> list[tuple[int, Path, bool]]:
+    """(number, file, compressed) of every rotated segment of ``path``, oldest first."""
+    path = Path(path)
+    if not path.parent.is_dir():
+        return []
+    found = []
+    for p in path.parent.iterdir():
+        m = _SEGMENT.match(p.name)
+        if m and m["stem"] == path.stem:
+            found.append((int(m["n"]), p, bool(m["gz"])))
+    return sorted(found, key=lambda s: (s[0], s[2]))
+
+def read_snapshot(path: str | Path) -> tuple[int, dict[str, dict[str, Any]]]:
+    """(last segment folded in, latest row per id); (0, {}) without a snapshot."""
+    try:
+        with snapshot_path(path).open("r", encoding="utf-8") as f:
+            snap = json.load(f)
+    except FileNotFoundError:
+        return 0, {}
+    return int(snap.get("segment", 0)), snap.get("latest") or {}
+
+def _iter_lines(data: bytes) -> Iterator[dict[str, Any]]:
+    for raw in data.splitlines():
+        line = raw.strip()
+        if not line: continue
+        try:
+            upd = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(upd, dict):
+            yield upd
+
+def load_updates(path: str | Path) -> dict[str, dict[str, Any]]:
     """
-    Read JSONL and keep the newest update per facility id.
+    Newest update per facility id: the compaction snapshot plus whatever was
+    appended after it.
     Returns {id: update_dict}
     """
+    log = StatusLog(path)
+    log.refresh()
+    return log.latest
+
+def _overlay(ft: dict[str, Any], u: dict[str, Any]) -> dict[str, Any]:
+    props = {**ft.get("properties", {}),
+             "status": u.get("status","unknown"),
+             "status_verified_at": u.get("verified_at"),
+             "status_source": u.get("source"),
+             "status_confidence": u.get("confidence")}
+    return {**ft, "properties": props}
+
+class StatusLog:
+    """
+    Latest update per id of one append-only ``<category>.jsonl``, kept in
+    memory. ``refresh`` reads only the complete lines appended since the last
+    call (the byte offset is remembered). When the log has been rotated by
+    ``compact`` (or truncated) the index is rebuilt from the compaction
+    snapshot plus the new tail, never from the full history. ``version``
+    changes whenever ``latest`` does.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.latest: dict[str, dict[str, Any]] = {}
+        self._ts: dict[str, datetime] = {}
+        self.offset = 0
+        self._ino: int | None = None
+        self._base_sig: tuple[int, int] | None = None
+        self._loaded = False
+        self.generation = 0
+        # (generation, ids changed by it)
+        self._journal: list[tuple[int, set[str]]] = []
+        self._checked = float("-inf")
+        self._lock = threading.Lock()
+
+    JOURNAL_SIZE = 1024
+
+    @property
+    def version(self) -> str:
+        return str(self.generation)
+
+    def _reset(self) -> None:
+        self.latest, self._ts, self.offset = {}, {}, 0
+
+    def _bump(self, changed: set[str]) -> None:
+        self.generation += 1
+        self._journal.append((self.generation, changed))
+        del self._journal[:-self.JOURNAL_SIZE]
+
+    def _record(self, upd: dict[str, Any], changed: set[str]) -> None:
+        fid = upd.get("id")
+        if not fid:
+            return
+        try:
+            ts = _parse_dt(upd.get("verified_at","1970-01-01"))
+        except (TypeError, ValueError):
+            return
+        prev = self._ts.get(fid)
+        if prev is None or ts >= prev:
+            self.latest[fid] = upd
+            self._ts[fid] = ts
+            changed.add(fid)
+
+    def entries(self) -> list[tuple[float, str, dict[str, Any]]]:
+        """(epoch seconds, id, row) of ``latest``, newest first, ties by id descending."""
+        with self._lock:
+            out = [(ts.timestamp(), fid, self.latest[fid]) for fid, ts in self._ts.items()]
+        out.sort(key=lambda e: (e[0], e[1]), reverse=True)
+        return out
+
+    def poll(self, interval: float) -> None:
+        """
+        ``refresh`` at most every ``interval`` seconds. Writes made through this
+        process refresh immediately; the poll only picks up other writers.
+        """
+        if time.monotonic() - self._checked >= interval:
+            self.refresh()
+
+    def _snapshot_sig(self) -> tuple[int, int] | None:
+        try:
+            st = os.stat(snapshot_path(self.path))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load_base(self) -> None:
+        """Snapshot, then any rotated segments it does not cover yet."""
+        upto, latest = read_snapshot(self.path)
+        scratch: set[str] = set()
+        for upd in latest.values():
+            self._record(upd, scratch)
+        for n, seg, compressed in segments(self.path):
+            if n > upto and not compressed:
+                try:
+                    data = seg.read_bytes()
+                except FileNotFoundError:  # folded in and removed meanwhile
+                    continue
+                for upd in _iter_lines(data):
+                    self._record(upd, scratch)
+
+    def _read_tail(self, size: int, changed: set[str]) -> None:
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+        # a writer may be mid-line; leave the partial tail for next time
+        end = chunk.rfind(b"\n") + 1
+        for upd in _iter_lines(chunk[:end]):
+            self._record(upd, changed)
+        self.offset += end
+
+    def refresh(self) -> set[str]:
+        """Ids whose latest update changed since the previous refresh."""
+        with self._lock:
+            self._checked = time.monotonic()
+            try:
+                st = os.stat(self.path)
+                ino, size = st.st_ino, st.st_size
+            except FileNotFoundError:
+                ino, size = None, 0
+            sig = self._snapshot_sig()
+            changed: set[str] = set()
+            if ino != self._ino or size < self.offset or sig != self._base_sig or not self._loaded:
+                # rotated, truncated or re-compacted: rebuild from the snapshot
+                # (O(ids), not O(history)) and diff against what we had
+                old = self.latest
+                self._reset()
+                self._ino, self._base_sig, self._loaded = ino, sig, True
+                self._load_base()
+                if size:
+                    self._read_tail(size, set())
+                changed = {fid for fid in old.keys() | self.latest.keys()
+                           if old.get(fid) != self.latest.get(fid)}
+            elif size > self.offset:
+                self._read_tail(size, changed)
+            if changed:
+                self._bump(set(changed))
+            return changed
+
+    def snapshot(
+        self, since: int | None = None
+    ) -> tuple[str, dict[str, dict[str, Any]], set[str] | None]:
+        """
+        (version, copy of ``latest``, ids changed after generation ``since``).
+        The change set is None when it cannot be told from the journal.
+        """
+        with self._lock:
+            changed: set[str] | None = None
+            if since is not None and since <= self.generation:
+                entries = [ids for gen, ids in self._journal if gen > since]
+                complete = since == self.generation or (
+                    bool(self._journal) and self._journal[0][0] <= since + 1
+                )
+                if complete:
+                    changed = set().union(*entries)
+            return self.version, dict(self.latest), changed
+
+_logs: dict[str, StatusLog] = {}
+_logs_lock = threading.Lock()
+
+def status_log(path: str | Path) -> StatusLog:
+    """The process-wide incremental index of the log at ``path``."""
+    key = str(path)
+    log = _logs.get(key)
+    if log is None:
+        with _logs_lock:
+            log = _logs.setdefault(key, StatusLog(path))
+    return log
+
+class _compaction_lock:
+    """Exclusive lock on ``<category>.compact.lock`` across processes."""
+
+    def __init__(self, path: Path) -> None:
+        self.lock_path = path.with_name(f"{path.stem}.compact.lock")
+
+    def __enter__(self) -> None:
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = self.lock_path.open("a")
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._f, fcntl.LOCK_UN)
+        self._f.close()
+
+def _write_snapshot(path: Path, n: int, log: StatusLog) -> None:
+    atomic_write_json(snapshot_path(path), {
+        "category": path.stem,
+        "segment": n,
+        "compacted_at": datetime.now(UTC).isoformat().replace("+00:00","Z"),
+        "records": len(log.latest),
+        "latest": log.latest,
+    })
+
+def compact(path: str | Path, min_bytes: int=0) -> dict[str, Any]:
+    """
+    Rotate the live log at ``path`` into the next numbered segment, fold it
+    into the snapshot and gzip it. Segments left uncompressed by an
+    interrupted run are finished first. The tail is only rotated once it
+    holds at least ``min_bytes``.
+
+    The rotation holds the writers' log lock (see log_writer); appends from
+    anything bypassing it are still caught by re-reading the segment until
+    its size is stable before the snapshot is finalised.
+    """
     path = Path(path)
-    latest: Dict[str, Dict[str, Any]] = {}
-    if not path.exists(): return latest
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line=line.strip()
-            if not line: continue
-            upd = json.loads(line)
-            fid = upd.get("id")
-            if not fid: continue
-            prev = latest.get(fid)
-            if (not prev) or (_parse_dt(upd.get("verified_at","1970-01-01")) > _parse_dt(prev.get("verified_at","1970-01-01"))):
-                latest[fid] = upd
-    return latest
+    with _compaction_lock(path):
+        upto, _ = read_snapshot(path)
+        pending = [(n, seg) for n, seg, gz in segments(path) if not gz]
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        if size and size >= min_bytes:
+            n = max([upto] + [n for n, _, _ in segments(path)]) + 1
+            rotated = segment_path(path, n, compressed=False)
+            with locked_log(path):  # no append is half-written when the tail moves
+                os.replace(path, rotated)
+            pending.append((n, rotated))
+        if not pending:
+            return {"path": str(path), "segment": upto, "rotated": []}
+
+        log = StatusLog(path)
+        log._load_base()  # snapshot + the pending segments, replayed below anyway
+        rotated_names = []
+        for n, seg in pending:
+            if n > upto:
+                consumed = 0
+                while True:
+                    data = seg.read_bytes()
+                    for upd in _iter_lines(data[consumed:]):
+                        log._record(upd, set())
+                    consumed = len(data)
+                    _write_snapshot(path, n, log)
+                    if seg.stat().st_size == consumed:
+                        break
+                upto = n
+            gz = segment_path(path, n)
+            tmp = gz.with_name(gz.name + ".tmp")
+            with seg.open("rb") as src, gzip.open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, gz)
+            seg.unlink()
+            rotated_names.append(gz.name)
+        return {"path": str(path), "segment": upto, "records": len(log.latest),
+                "rotated": rotated_names}
 
-def apply_updates(features: Iterable[dict], updates_by_id: Dict[str, Dict[str, Any]], id_field: str="id") -> list[dict]:
+def compact_all(updates_dir: str | Path, min_bytes: int=0) -> list[dict[str, Any]]:
+    """``compact`` every category log in ``updates_dir``."""
+    updates_dir = Path(updates_dir)
+    if not updates_dir.is_dir():
+        return []
+    stems = {p.name.split(".", 1)[0] for p in updates_dir.glob("*.jsonl*")}
+    return [compact(updates_dir / f"{stem}.jsonl", min_bytes) for stem in sorted(stems)]
+
+def iter_history(path: str | Path) -> Iterator[dict[str, Any]]:
+    """Every update ever written to ``path``, oldest segment first, then the live tail."""
+    path = Path(path)
+    seen: set[int] = set()
+    for n, seg, compressed in segments(path):
+        if n in seen:  # plain and gzipped copies coexist mid-compaction
+            continue
+        seen.add(n)
+        opener = gzip.open if compressed else open
+        try:
+            with opener(seg, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            continue
+        yield from _iter_lines(data)
+    if path.exists():
+        yield from _iter_lines(path.read_bytes())
+
+def tail_segment(path: str | Path) -> int:
+    """The segment number the live tail will get when it is rotated."""
+    return max((n for n, _, _ in segments(path)), default=0) + 1
+
+def read_segment(path: str | Path, n: int) -> bytes | None:
+    """Bytes of segment ``n``, plain or gzipped; None if it is gone."""
+    try:
+        return segment_path(path, n, compressed=False).read_bytes()
+    except FileNotFoundError:
+        pass
+    try:
+        with gzip.open(segment_path(path, n), "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+# A position in a log's full history is (segment, byte offset): the live tail
+# is segment tail_segment(path), and rotation renames it without rewriting,
+# so positions only grow and stay valid across compactions.
+
+def log_position(path: str | Path) -> tuple[int, int]:
+    """(segment, offset) just past the last complete line of ``path``."""
+    path = Path(path)
+    while True:
+        tail = tail_segment(path)
+        try:
+            with path.open("rb") as f:
+                size = f.seek(0, 2)
+                f.seek(max(0, size - (1 << 16)))
+                chunk = f.read()
+            end = size - len(chunk) + chunk.rfind(b"\n") + 1
+        except FileNotFoundError:
+            end = 0
+        if tail_segment(path) == tail:
+            return tail, end
+
+def _entries(data: bytes, segment: int, base: int) -> Iterator[tuple[int, int, dict[str, Any]]]:
+    pos = base
+    for line in data.splitlines(keepends=True):
+        pos += len(line)
+        upd = next(_iter_lines(line), None)
+        if upd is not None:
+            yield segment, pos, upd
+
+def read_since(path: str | Path, segment: int, offset: int
+               ) -> tuple[list[tuple[int, int, dict[str, Any]]], int, int] | None:
+    """
+    Updates written to ``path`` after position (segment, offset), each as
+    (segment, offset after it, update), plus the position reached. None when
+    the position cannot be followed (log truncated, segment pruned).
+    """
+    path = Path(path)
+    for _ in range(3):  # retried if a compaction rotates the tail mid-read
+        tail = tail_segment(path)
+        if segment > tail:
+            return None
+        out: list[tuple[int, int, dict[str, Any]]] = []
+        n, pos = segment, offset
+        while n < tail:
+            data = read_segment(path, n)
+            if data is None or len(data) < pos:
+                return None
+            out.extend(_entries(data[pos:], n, pos))
+            n, pos = n + 1, 0
+        try:
+            with path.open("rb") as f:
+                size = f.seek(0, 2)
+                if size < pos:
+                    return None
+                f.seek(pos)
+                chunk = f.read(size - pos)
+        except FileNotFoundError:
+            if pos:
+                return None
+            chunk = b""
+        end = chunk.rfind(b"\n") + 1  # a writer may be mid-line
+        out.extend(_entries(chunk[:end], tail, pos))
+        if tail_segment(path) == tail:
+            return out, tail, pos + end
+    return None
+
+def patch_updates(
+    base: list[dict[str, Any]],
+    merged: list[dict[str, Any]],
+    positions: Iterable[int],
+    updates_by_id: dict[str, dict[str, Any]],
+    id_field: str = "id",
+) -> list[dict[str, Any]]:
+    """
+    ``merged`` (an earlier apply_updates result over ``base``) with only the
+    features at ``positions`` re-overlaid; costs O(len(positions)) beyond the
+    list copy.
+    """
+    out = list(merged)
+    for i in positions:
+        ft = base[i]
+        u = updates_by_id.get(ft.get("properties", {}).get(id_field))
+        out[i] = _overlay(ft, u) if u is not None else ft
+    return out
+
+def apply_updates(
+    features: Iterable[dict[str, Any]],
+    updates_by_id: dict[str, dict[str, Any]],
+    id_field: str = "id",
+) -> list[dict[str, Any]]:
     """
     For each baseline feature, overlay latest status if an update exists.
     Assumes each feature has properties[id_field] (add it if missing).
     """
-    out=[]
+    return list(iter_updates(features, updates_by_id, id_field))
+
+def iter_updates(
+    features: Iterable[dict[str, Any]],
+    updates_by_id: dict[str, dict[str, Any]],
+    id_field: str = "id",
+) -> Iterator[dict[str, Any]]:
+    """Lazy form of apply_updates for streaming responses."""
     for ft in features:
-        props = ft.get("properties", {})
-        fid = props.get(id_field)
-        if fid and fid in updates_by_id:
-            u = updates_by_id[fid]
-            props = {**props,
-                     "status": u.get("status","unknown"),
-                     "status_verified_at": u.get("verified_at"),
-                     "status_source": u.get("source"),
-                     "status_confidence": u.get("confidence")}
-            ft = {**ft, "properties": props}
-        out.append(ft)
-    return out
\ No newline at end of file
+        fid = ft.get("properties", {}).get(id_field)
+        yield _overlay(ft, updates_by_id[fid]) if fid and fid in updates_by_id else ft
\ No newline at end of file
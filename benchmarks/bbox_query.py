@@ -0,0 +1,51 @@
+"""
+Bounding-box query latency on a synthetic layer at 10x today's feature count.
+
+    python -m benchmarks.bbox_query
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from backend.services.spatial import GridIndex
+
+FEATURES = 286_710  # 10x gaza_roads_checkpoints.geojson
+GAZA_CITY = (34.42, 31.48, 34.50, 31.54)
+
+
+def synthetic_envelopes(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    lo = rng.uniform([34.2, 31.2], [35.6, 32.6], size=(n, 2))
+    # ~70% short road segments, the rest points
+    size = rng.exponential(0.004, size=(n, 2)) * (rng.random((n, 1)) < 0.7)
+    return np.hstack([lo, lo + size])
+
+
+def main() -> None:
+    env = synthetic_envelopes(FEATURES)
+    t0 = time.perf_counter()
+    index = GridIndex(env)
+    build = time.perf_counter() - t0
+
+    runs = 200
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        hits = index.query(GAZA_CITY)
+    indexed = (time.perf_counter() - t0) / runs
+
+    t0 = time.perf_counter()
+    for _ in range(20):
+        (
+            (env[:, 0] <= GAZA_CITY[2]) & (env[:, 2] >= GAZA_CITY[0])
+            & (env[:, 1] <= GAZA_CITY[3]) & (env[:, 3] >= GAZA_CITY[1])
+        ).nonzero()
+    scan = (time.perf_counter() - t0) / 20
+
+    print(f"features={FEATURES} grid={index.nx}x{index.ny} build={build * 1000:.0f} ms")
+    print(f"city viewport hits={len(hits)} grid={indexed * 1000:.3f} ms numpy-scan={scan * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Cold load of the combined roads/checkpoints dataset (~22 MB of GeoJSON):
+json.load + split vs mapping the pipeline's binary snapshot; then a fresh
+worker's first requests (full layer, bbox, filter, profile) with and without
+the snapshot, timed and with the process's peak RSS.
+
+    python -m benchmarks.binary_snapshot
+"""
+from __future__ import annotations
+
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+from backend import create_app
+from backend.config import Config
+from backend.pipelines.snapshots import write_dataset_binary
+from backend.services.binary import BinarySnapshot, encode
+from backend.services.files import write_meta_sidecar
+from backend.services.registry import _gc_paused, split_layers
+
+ROADS = 28_000
+CHECKPOINTS = 2_000
+LAYERS = ["checkpoints", "roads"]
+
+
+def synthetic_features(seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    feats = []
+    for i in range(ROADS):
+        n = int(rng.integers(2, 40))
+        start = rng.uniform([34.2, 31.2], [34.6, 31.6])
+        coords = np.round(start + np.cumsum(rng.normal(0, 1e-4, (n, 2)), axis=0), 7).tolist()
+        feats.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": coords},
+            "properties": {"kind": "road", "id": 10_000 + i, "osm_type": "way",
+                           "tags": {"highway": ["primary", "residential", "track"][i % 3], "name": f"road {i % 500}"},
+                           "highway": ["primary", "residential", "track"][i % 3], "user": f"u{i % 50}",
+                           "version": int(rng.integers(1, 9))},
+        })
+    for i in range(CHECKPOINTS):
+        feats.append({
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": rng.uniform([34.2, 31.2], [34.6, 31.6]).tolist()},
+            "properties": {"kind": "checkpoint", "id": i, "osm_type": "node", "tags": {"barrier": "checkpoint"}},
+        })
+    return feats
+
+
+def _best(fn, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        src, snap = Path(tmp, "combined.geojson"), Path(tmp, "combined.geojson.bin")
+        src.write_text(json.dumps({"type": "FeatureCollection", "features": synthetic_features()}), encoding="utf-8")
+
+        def parse() -> dict:
+            with src.open(encoding="utf-8") as f:
+                return split_layers(json.load(f)["features"], LAYERS)
+
+        layers = parse()
+        snap.write_bytes(encode(layers, "bench"))
+
+        def materialize() -> dict:
+            s = BinarySnapshot(snap)
+            return {n: s.features(n) for n in LAYERS}
+
+        def paused(fn):
+            def run():
+                with _gc_paused():
+                    return fn()
+            return run
+
+        assert materialize() == layers
+        print(f"geojson={src.stat().st_size / 1e6:.1f} MB snapshot={snap.stat().st_size / 1e6:.1f} MB")
+        print(f"json.load+split      {_best(parse) * 1000:7.0f} ms")
+        print(f"  gc paused          {_best(paused(parse)) * 1000:7.0f} ms")
+        print(f"snapshot -> dicts    {_best(materialize) * 1000:7.0f} ms")
+        print(f"  gc paused          {_best(paused(materialize)) * 1000:7.0f} ms")
+        print(f"mmap + coords array  {_best(lambda: BinarySnapshot(snap).layer_array('roads', 'coords')) * 1000:7.2f} ms")
+
+        # a fresh worker per mode, so peak RSS is that of the mode alone
+        write_meta_sidecar(src, {"source": "bench"})
+        for mode in ("json", "snapshot"):
+            if mode == "snapshot":
+                write_dataset_binary(src, tuple(LAYERS))
+            out = subprocess.run(
+                [sys.executable, "-m", "benchmarks.binary_snapshot", "--serve", tmp],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            print(f"worker, {mode:<9} {out.strip()}")
+
+
+SERVED = [
+    "/api/v1/roads",
+    "/api/v1/roads?bbox=34.40,31.40,34.45,31.45",
+    "/api/v1/roads?profile=map",
+    "/api/v1/checkpoints?limit=100",
+]
+
+
+def serve(tmp: str) -> None:
+    """First requests of a fresh worker over the dataset in ``tmp``."""
+    base = _rss_mb()
+    empty = Path(tmp, "empty.geojson")
+    empty.write_text('{"type":"FeatureCollection","features":[]}', encoding="utf-8")
+    Path(tmp, "updates").mkdir(exist_ok=True)
+
+    class BenchConfig(Config):
+        COMBINED_CHECKPOINTS_PATH = str(Path(tmp, "combined.geojson"))
+        HEALTH_FACILITIES_PATH = BORDER_CROSSINGS_PATH = str(empty)
+        UPDATES_DIR = str(Path(tmp, "updates"))
+
+    client = create_app(BenchConfig).test_client()
+    times = []
+    for url in SERVED:
+        t0 = time.perf_counter()
+        assert client.get(url, headers={"Accept-Encoding": "identity"}).status_code == 200
+        times.append(f"{(time.perf_counter() - t0) * 1000:5.0f}")
+    print(f"ms per request {' '.join(times)}; RSS +{_rss_mb() - base:4.0f} MB")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--serve"]:
+        serve(sys.argv[2])
+    else:
+        main()
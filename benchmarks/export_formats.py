@@ -0,0 +1,85 @@
+"""
+Payload size and client decode time of the layer formats on the synthetic
+~30k-feature roads/checkpoints dataset: GeoJSON vs qbin (and FlatGeobuf /
+GeoParquet when geopandas, pyogrio and pyarrow are installed).
+
+    python -m benchmarks.export_formats
+"""
+from __future__ import annotations
+
+import gzip
+import io
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from backend.services.exports import FormatUnavailable, decode_qbin, encode
+from backend.services.feature_store import FeatureStore
+
+from .binary_snapshot import synthetic_features
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+
+def _best(fn, runs: int = 3) -> float:
+    best = float("inf")
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _read_fgb(data: bytes):
+    import geopandas as gpd
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "layer.fgb")
+        path.write_bytes(data)
+        return gpd.read_file(path)
+
+
+def _read_parquet(data: bytes):
+    import geopandas as gpd
+
+    return gpd.read_parquet(io.BytesIO(data))
+
+
+def main() -> None:
+    features = synthetic_features()
+    store = FeatureStore.from_features(features)
+    payloads = {
+        "geojson": json.dumps({"type": "FeatureCollection", "features": features},
+                              ensure_ascii=False, separators=(",", ":")).encode("utf-8"),
+    }
+    decoders = {
+        "geojson": ("json.loads", lambda b: json.loads(b)),
+        "qbin": ("decode_qbin -> arrays", decode_qbin),
+        "fgb": ("geopandas.read_file", _read_fgb),
+        "parquet": ("geopandas.read_parquet", _read_parquet),
+    }
+    for fmt in ("qbin", "fgb", "parquet"):
+        try:
+            payloads[fmt] = encode(fmt, store, "roads")
+        except FormatUnavailable as e:
+            print(f"{fmt}: skipped ({e})")
+
+    print(f"features={len(features)}")
+    print(f"{'format':8} {'raw':>9} {'gzip':>9} {'br':>9}   decode")
+    for fmt, data in payloads.items():
+        gz = len(gzip.compress(data, 6))
+        br = len(brotli.compress(data, quality=9)) if brotli is not None else float("nan")
+        label, decode = decoders[fmt]
+        t = _best(lambda: decode(data))
+        print(f"{fmt:8} {len(data) / 1e6:8.2f}M {gz / 1e6:8.2f}M {br / 1e6:8.2f}M   {t * 1000:7.0f} ms  {label}")
+    if "qbin" in payloads:
+        t = _best(lambda: decode_qbin(payloads["qbin"]).features())
+        print(f"{'qbin':8} {'':>29}   {t * 1000:7.0f} ms  decode_qbin -> GeoJSON dicts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Memory per feature and filter throughput: nested dicts vs FeatureStore,
+on the synthetic ~30k-feature roads/checkpoints dataset.
+
+    python -m benchmarks.feature_store
+"""
+from __future__ import annotations
+
+import gc
+import json
+import time
+import tracemalloc
+
+from backend.services.feature_store import FeatureStore
+from backend.services.projection import PROFILES
+from backend.services.spatial import envelope
+
+from .binary_snapshot import synthetic_features
+
+VIEWPORT = (34.30, 31.30, 34.40, 31.40)
+HIGHWAYS = {"primary", "track"}
+
+
+def _traced(build):
+    gc.collect()
+    tracemalloc.start()
+    out = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return out, size
+
+
+def _per_run(fn, runs: int = 20) -> float:
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - t0) / runs
+
+
+def main() -> None:
+    text = json.dumps(synthetic_features())
+    features, dict_bytes = _traced(lambda: json.loads(text))
+    n = len(features)
+
+    def columnar() -> FeatureStore:
+        # only the store (and the distinct values it keeps) survives
+        return FeatureStore.from_features(json.loads(text))
+
+    store, store_bytes = _traced(columnar)
+    env = store.envelopes
+    print(f"features={n}")
+    print(f"memory: dicts {dict_bytes / n:7.0f} B/feature  store {store_bytes / n:7.0f} B/feature")
+
+    envs = [envelope(ft["geometry"]) for ft in features]
+
+    def dict_filter() -> list[int]:
+        b = VIEWPORT
+        return [
+            i for i, (ft, e) in enumerate(zip(features, envs, strict=True))
+            if ft["properties"].get("highway") in HIGHWAYS
+            and e is not None and e[0] <= b[2] and e[2] >= b[0] and e[1] <= b[3] and e[3] >= b[1]
+        ]
+
+    def store_filter():
+        return (store.isin("highway", HIGHWAYS) & store.bbox(VIEWPORT, env)).nonzero()[0]
+
+    assert dict_filter() == store_filter().tolist()
+    print(f"filter (highway + bbox): dicts {_per_run(dict_filter) * 1000:7.2f} ms  "
+          f"store {_per_run(store_filter) * 1000:7.2f} ms  hits={len(store_filter())}")
+
+    projection = PROFILES["map"]["roads"]
+    hits = store_filter()
+    projected = store.project(projection)
+
+    def dict_serialize() -> list[dict]:
+        return [projection.apply(features[i]) for i in hits]
+
+    def store_serialize() -> list[dict]:
+        return projected.features(hits)
+
+    assert dict_serialize() == store_serialize()
+    print(f"project+materialize hits: dicts {_per_run(dict_serialize) * 1000:7.2f} ms  "
+          f"store {_per_run(store_serialize) * 1000:7.2f} ms "
+          f"(store.project once: {_per_run(lambda: store.project(projection), 5) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Durable status updates per second at 1, 4 and 16 gunicorn-style workers
+(processes, each serving THREADS concurrent requests), appending to one
+log: open/append/fsync per request against the group-commit writer.
+
+    python -m benchmarks.log_writer
+"""
+from __future__ import annotations
+
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from backend.services.log_writer import GroupWriter
+
+WORKERS = (1, 4, 16)
+THREADS = 8
+SECONDS = 2.0
+LINE = json.dumps({"id": "health:1", "status": "open", "verified_at": "2025-08-19T13:45:00Z"}) + "\n"
+
+
+def naive_append(path: Path) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.write(LINE)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def worker(path: str, mode: str, start: float, out: mp.Queue) -> None:
+    path = Path(path)
+    deadline = start + SECONDS
+    writer = GroupWriter(path)
+    append = writer.append if mode == "group" else lambda line: naive_append(path)
+    counts = [0] * THREADS
+
+    def serve(i: int) -> None:
+        while time.time() < deadline:
+            append(LINE)
+            counts[i] += 1
+
+    threads = [threading.Thread(target=serve, args=(i,)) for i in range(THREADS)]
+    time.sleep(max(0.0, start - time.time()))  # all processes start together
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    out.put((sum(counts), writer.commits))
+
+
+def run(workers: int, mode: str) -> tuple[float, float]:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "health.jsonl"
+        out: mp.Queue = mp.Queue()
+        start = time.time() + 1.0
+        procs = [mp.Process(target=worker, args=(str(path), mode, start, out)) for _ in range(workers)]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+        appended = sum(n for n, _ in results)
+        commits = sum(c for _, c in results)
+        assert len(path.read_text().splitlines()) == appended  # nothing lost or torn
+        return appended / SECONDS, appended / commits if commits else 1.0
+
+
+def main() -> None:
+    print(f"{'workers':>7} {'naive upd/s':>12} {'group upd/s':>12} {'rows/fsync':>11}")
+    for w in WORKERS:
+        naive, _ = run(w, "naive")
+        group, per_commit = run(w, "group")
+        print(f"{w:7d} {naive:12.0f} {group:12.0f} {per_commit:11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+k-nearest latency at 10x and 100x today's 505 health facilities: the
+unit-vector KD-tree and the batched path against brute-force NumPy
+haversine. Batches switch from the matrix to tree walks above
+MATRIX_MAX_POINTS eligible points.
+
+    python -m benchmarks.nearest
+"""
+from __future__ import annotations
+
+import time
+
+import numpy as np
+
+from backend.services.nearest import NearestIndex
+
+FACILITIES = 505
+K = 5
+ORIGINS = 1_000
+
+
+def haversine_knn(pts: np.ndarray, lon: float, lat: float, k: int) -> np.ndarray:
+    lon1, lat1 = np.radians(lon), np.radians(lat)
+    lon2, lat2 = np.radians(pts[:, 0]), np.radians(pts[:, 1])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    d = 2 * 6_371_008.8 * np.arcsin(np.sqrt(a))
+    top = np.argpartition(d, k)[:k]
+    return top[np.argsort(d[top])]
+
+
+def timed(fn, runs: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - t0) / runs
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    origins = rng.uniform([34.2, 31.2], [35.6, 32.6], size=(ORIGINS, 2))
+    for scale in (10, 100):
+        n = FACILITIES * scale
+        pts = rng.uniform([34.2, 31.2], [35.6, 32.6], size=(n, 2))
+        feats = [{"geometry": {"type": "Point", "coordinates": p}} for p in pts.tolist()]
+        t0 = time.perf_counter()
+        index = NearestIndex(feats)
+        build = time.perf_counter() - t0
+
+        lon, lat = origins[0]
+        tree = timed(lambda: index.query(lon, lat, K), 200)
+        brute = timed(lambda: haversine_knn(pts, lon, lat, K), 200)
+        batch = timed(lambda: index.query_many(origins, K), 3)
+        loop = timed(lambda: [haversine_knn(pts, o[0], o[1], K) for o in origins], 1)
+        print(
+            f"{n:>7} points  build {build * 1e3:7.1f} ms  "
+            f"single: tree {tree * 1e3:.3f} ms / brute {brute * 1e3:.3f} ms  "
+            f"{ORIGINS} origins: batched {batch * 1e3:.1f} ms / brute loop {loop * 1e3:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Payload size and serialization time of the roads layer per level of detail.
+
+    python -m benchmarks.roads_lod [path/to/gaza_roads_checkpoints.geojson]
+
+Without a path a synthetic network of the same size as today's Overpass
+extract is used (28k ways, ~25 vertices each).
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import sys
+import time
+
+import numpy as np
+
+from backend.services.encoded import dumps
+from backend.services.lod import LOD_ZOOMS, build_pyramid
+
+
+def synthetic_roads(n: int = 28_000, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    feats = []
+    for i in range(n):
+        steps = rng.normal(0, 0.0004, size=(int(rng.integers(5, 45)), 2)).cumsum(axis=0)
+        start = rng.uniform([34.2, 31.2], [35.6, 32.6])
+        coords = (start + steps).round(7).tolist()
+        feats.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": coords},
+            "properties": {"id": str(i), "kind": "road", "highway": "primary"},
+        })
+    return feats
+
+
+def load_roads(path: str) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        feats = json.load(f)["features"]
+    return [ft for ft in feats if ft["geometry"]["type"] == "LineString"]
+
+
+def main() -> None:
+    roads = load_roads(sys.argv[1]) if len(sys.argv) > 1 else synthetic_roads()
+    t0 = time.perf_counter()
+    pyramid = build_pyramid(roads)
+    print(f"roads={len(roads)} pyramid build={time.perf_counter() - t0:.2f} s")
+    print(f"{'level':>6} {'vertices':>10} {'json MB':>8} {'gzip MB':>8} {'dumps ms':>9}")
+
+    levels = [(str(z), [{**ft, "geometry": {"type": "LineString", "coordinates": c}}
+                        for ft, c in zip(roads, pyramid[z], strict=True)]) for z in LOD_ZOOMS]
+    levels.append(("full", roads))
+    for name, feats in levels:
+        t0 = time.perf_counter()
+        raw = dumps({"type": "FeatureCollection", "features": feats})
+        ms = (time.perf_counter() - t0) * 1000
+        verts = sum(len(ft["geometry"]["coordinates"]) for ft in feats)
+        print(f"{name:>6} {verts:>10} {len(raw) / 1e6:>8.2f} {len(gzip.compress(raw, 6)) / 1e6:>8.2f} {ms:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Admin listing over one million status updates (20k ids): the JSONL log
+through StatusLog against the SQLite store, for a first page, a filtered
+page and the full list.
+
+    python -m benchmarks.update_store
+"""
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from backend.services.update_store import SqliteStore, filter_entries, parse_list_args
+from backend.services.updates import StatusLog
+
+UPDATES = 1_000_000
+IDS = 20_000
+STATUSES = ("open", "partial", "closed", "unknown")
+REPORTERS = ("ocha", "who", "mof", "field")
+
+
+def write_log(path: Path) -> None:
+    rng = np.random.default_rng(0)
+    start = datetime(2025, 1, 1, tzinfo=UTC)
+    ids = rng.integers(0, IDS, UPDATES)
+    secs = np.sort(rng.integers(0, 200 * 86400, UPDATES))
+    status = rng.integers(0, len(STATUSES), UPDATES)
+    reporter = rng.integers(0, len(REPORTERS), UPDATES)
+    with path.open("w", encoding="utf-8") as f:
+        for i, s, st, rp in zip(ids.tolist(), secs.tolist(), status.tolist(), reporter.tolist(), strict=True):
+            ts = (start + timedelta(seconds=s)).isoformat().replace("+00:00", "Z")
+            f.write(json.dumps({"id": f"health:{i}", "status": STATUSES[st], "verified_at": ts,
+                                "reporter": REPORTERS[rp], "tags": [f"zone{i % 5}"]}) + "\n")
+
+
+def timed(fn, runs: int = 5) -> float:
+    t0 = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - t0) / runs
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "health.jsonl"
+        write_log(log_path)
+
+        t0 = time.perf_counter()
+        log = StatusLog(log_path)
+        log.refresh()
+        print(f"StatusLog cold load        {time.perf_counter() - t0:8.2f} s")
+
+        store = SqliteStore(Path(tmp) / "updates.sqlite3")
+        t0 = time.perf_counter()
+        store.import_jsonl(log_path)
+        print(f"SQLite one-shot import     {time.perf_counter() - t0:8.2f} s")
+
+        queries = {
+            "first page (limit=100)": {"limit": "100"},
+            "status=closed, limit=100": {"status": "closed", "limit": "100"},
+            "reporter+tags+since": {"reporter": "who", "tags": "zone3", "since": "2025-06-01T00:00:00Z"},
+            "full list": {},
+        }
+        print(f"{'query':28} {'jsonl ms':>10} {'sqlite ms':>10}")
+        for name, args in queries.items():
+            flt = parse_list_args(args, 5000)
+            jl = timed(lambda: filter_entries(log.entries(), flt))
+            sq = timed(lambda: store.list_latest("health", flt))
+            print(f"{name:28} {jl * 1e3:10.1f} {sq * 1e3:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
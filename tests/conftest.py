@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from backend import create_app
+from backend.config import Config
+from backend.services.registry import registry
+
+
+def _point(lon, lat, **props):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": props}
+
+
+def _line(coords, **props):
+    return {"type": "Feature", "geometry": {"type": "LineString", "coordinates": coords}, "properties": props}
+
+
+def write_json(path, payload):
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    combined = {
+        "type": "FeatureCollection",
+        "features": [
+            _point(34.45, 31.50, kind="checkpoint", id=1001, osm_type="node",
+                   tags={"barrier": "checkpoint", "name": "Netzarim"}, user="u", uid=1, version=2, changeset=9),
+            _point(34.30, 31.30, kind="checkpoint", id=1002, osm_type="node",
+                   tags={"military": "checkpoint", "name:ar": "معبر"}, user="u", uid=1, version=1, changeset=9),
+            _line([[34.40, 31.45], [34.45, 31.50], [34.50, 31.55]], kind="road", id=2001, osm_type="way",
+                  tags={"highway": "primary", "name": "Salah al-Din Road"}, highway="primary"),
+            _line([[34.25, 31.25], [34.30, 31.30]], kind="road", id=2002, osm_type="way",
+                  tags={"highway": "secondary"}, highway="secondary"),
+        ],
+    }
+    health = {
+        "type": "FeatureCollection",
+        "features": [
+            _point(34.46, 31.51, NAME="Al-Shifa Hospital | مستشفى الشفاء", TYPE="Hospital | مستشفى",
+                   SERVICES="General+Surgery | عامة+جراحة", GOVERNORATE="Gaza", REGION="Gaza Strip",
+                   SUPERVISING="Governmental", URBANIZATION="Urban | حضر", kind="health_center",
+                   __raw={"OBJECTID": 1.0}),
+            _point(34.31, 31.29, NAME="Rafah Clinic | عيادة رفح", TYPE="Clinic | عيادة",
+                   SERVICES="General | عامة", GOVERNORATE="Rafah", REGION="Gaza Strip",
+                   SUPERVISING="UNRWA", URBANIZATION="Camp | مخيم", kind="health_center",
+                   __raw={"OBJECTID": 2.0}),
+            _point(35.20, 31.90, NAME="Ramallah Clinic", TYPE="Clinic | عيادة",
+                   SERVICES="General | عامة", GOVERNORATE="Ramallah", REGION="West Bank",
+                   SUPERVISING="NGO", URBANIZATION="Urban | حضر", kind="health_center",
+                   __raw={"OBJECTID": 3.0}),
+        ],
+    }
+    borders = {
+        "type": "FeatureCollection",
+        "features": [
+            _point(34.27, 31.22, kind="border_crossing", name="Kerem Shalom", status="open"),
+            _point(34.24, 31.25, kind="border_crossing", name="Rafah", status="closed"),
+        ],
+    }
+    paths = {
+        "combined": tmp_path / "gaza_roads_checkpoints.geojson",
+        "health": tmp_path / "opt_healthfacilities.json",
+        "borders": tmp_path / "border_crossings.geojson",
+        "updates": tmp_path / "updates",
+    }
+    write_json(paths["combined"], combined)
+    write_json(paths["health"], health)
+    write_json(paths["borders"], borders)
+    paths["updates"].mkdir()
+    return paths
+
+
+@pytest.fixture
+def app(data_dir):
+    class TestConfig(Config):
+        TESTING = True
+        ADMIN_API_TOKEN = "test-token"
+        DATASET_CHECK_INTERVAL = 0.0
+        HEALTH_FACILITIES_PATH = str(data_dir["health"])
+        COMBINED_CHECKPOINTS_PATH = str(data_dir["combined"])
+        BORDER_CROSSINGS_PATH = str(data_dir["borders"])
+        UPDATES_DIR = str(data_dir["updates"])
+
+    registry.clear()
+    yield create_app(TestConfig)
+    registry.clear()
+
+
+@pytest.fixture
+def api(app):
+    return app.test_client()
@@ -0,0 +1,114 @@
+import json
+
+from backend import cache
+from backend.pipelines.snapshots import write_dataset_binary
+from backend.services.binary import BinarySnapshot, binary_path, encode
+from backend.services.files import write_meta_sidecar
+from backend.services.lod import write_pyramid
+from backend.services.registry import _parse, get_dataset, get_layer, registry
+from backend.services.routing import route_cache, write_graph
+from backend.services.tiles import tile_cache
+
+
+def test_round_trip_keeps_every_geometry_and_key_order(tmp_path):
+    feats = [
+        {"id": 7, "type": "Feature", "properties": {"b": 1, "a": {"x": [1, 2]}, "id": "f:1"},
+         "geometry": {"type": "Point", "coordinates": [34.5, 31.25]}},
+        {"type": "Feature", "geometry": {"type": "MultiPolygon", "coordinates": [
+            [[[0, 0], [1, 0], [1, 1], [0, 0]], [[0.2, 0.2], [0.3, 0.2], [0.2, 0.3], [0.2, 0.2]]],
+            [[[5, 5], [6, 5], [6, 6], [5, 5]]]]}, "properties": {"id": "f:2", "b": None}},
+        {"type": "Feature", "geometry": None, "properties": None},
+        {"type": "Feature", "geometry": {"type": "LineString", "coordinates": []}, "properties": {}},
+    ]
+    (tmp_path / "x.bin").write_bytes(encode({"layer": feats}, "k"))
+    out = BinarySnapshot(tmp_path / "x.bin").features("layer")
+    assert out == feats
+    assert [list(ft) for ft in out] == [list(ft) for ft in feats]
+    assert [list(ft["properties"] or {}) for ft in out] == [list(ft["properties"] or {}) for ft in feats]
+
+
+def test_registry_maps_current_snapshot_and_ignores_stale_one(app, data_dir, monkeypatch):
+    path = data_dir["combined"]
+    write_meta_sidecar(path, {"source": "test"})
+    assert write_dataset_binary(path, ("checkpoints", "roads")) == str(binary_path(path))
+
+    parsed = _parse(str(path), ["checkpoints", "roads"])
+    with app.app_context():
+        ds = get_dataset("roads")
+        assert ds.binary is not None
+        assert get_layer("roads") == parsed["roads"]
+        assert get_layer("checkpoints") == parsed["checkpoints"]
+        coords = ds.binary.layer_array("roads", "coords")
+        assert coords.shape == (5, 2) and not coords.flags.writeable
+
+        # a rebuilt dataset with a new sidecar no longer matches the snapshot
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["features"] = data["features"][:1]
+        path.write_text(json.dumps(data), encoding="utf-8")
+        write_meta_sidecar(path, {"source": "test"})
+        ds = get_dataset("roads")
+        assert ds.binary is None
+        assert get_layer("roads") == [] and len(get_layer("checkpoints")) == 1
+
+
+def test_layer_endpoints_serve_a_snapshot_without_building_dicts(app, api, data_dir):
+    from backend.services import layers
+
+    for name in ("health", "combined"):
+        write_meta_sidecar(data_dir[name], {"source": "test"})
+    since = json.loads(api.get("/api/v1/changes").data)["cursor"]
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:1", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    urls = [
+        "/api/v1/health_centers/", "/api/v1/health_centers/?bbox=34.2,31.2,34.6,31.6",
+        "/api/v1/health_centers/?TYPE=Clinic&status=closed", "/api/v1/health_centers/?facets=1",
+        "/api/v1/health_centers/?profile=map", "/api/v1/health_centers/?fields=NAME&limit=1",
+        "/api/v1/roads?zoom=8", "/api/v1/roads?profile=map&stream=1", "/api/v1/checkpoints?limit=1",
+        "/api/v1/nearest?layer=health&lon=34.4&lat=31.4&k=2", "/api/v1/tiles/checkpoints/14/9759/6680.mvt",
+        "/api/v1/search?q=clinic", "/api/v1/search?q=shfa", "/api/v1/search?q=netz&layers=checkpoints,roads",
+        f"/api/v1/changes?since={since}", "/api/v1/clusters/health?zoom=0",
+        "/api/v1/clusters/health?zoom=15&bbox=34.44,31.50,34.48,31.52",
+        "/api/v1/route?lat=31.45&lon=34.40&avoid=none", "/api/v1/isochrones?lat=31.45&lon=34.40&minutes=5,30",
+        "/api/v1/datasets/?include=health,roads", "/api/v1/datasets/?stream=1",
+    ]
+    parsed = [api.get(u, headers={"Accept-Encoding": "identity"}).data for u in urls]
+
+    write_dataset_binary(data_dir["health"], ("health",))
+    write_dataset_binary(data_dir["combined"], ("checkpoints", "roads"))
+    with app.app_context():
+        key = get_dataset("roads").content_key
+        write_pyramid(data_dir["combined"], get_layer("roads"), key)
+        write_graph(data_dir["combined"], get_layer("roads"), get_layer("checkpoints"), key)
+    registry.clear()
+    layers._views.clear()
+    tile_cache.clear()
+    route_cache.clear()
+    cache.clear()
+    mapped = [api.get(u, headers={"Accept-Encoding": "identity"}).data for u in urls]
+    assert mapped == parsed
+    # a status change invalidates the cached tile from the index, not the dicts
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "checkpoints", "id": "1001", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    assert api.get("/api/v1/checkpoints?limit=1").status_code == 200
+    assert tile_cache.keys() == []
+    # and moves the clusters' status counts from the changed rows only
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:0", "status": "functioning",
+                         "verified_at": "2025-08-20T11:00:00Z"}),
+    )
+    top = json.loads(api.get("/api/v1/clusters/health?zoom=0").data)["features"][0]
+    assert top["properties"]["status_counts"] == {"functioning": 1, "closed": 1, "unknown": 1}
+    with app.app_context():
+        for name in ("health", "checkpoints", "roads"):
+            ds = get_dataset(name)
+            assert ds.binary is not None and not ds.layers.is_built(name)
@@ -0,0 +1,81 @@
+import io
+import json
+
+from backend.services.bulk_import import BATCH_SIZE, import_stream, normalize_ts, open_upload
+
+HEADERS = {"X-Admin-Token": "test-token"}
+
+
+def _bulk(api, body, **kw):
+    return api.post("/api/v1/admin/bulk?category=health", headers=HEADERS, data=body, **kw)
+
+
+def test_normalize_ts_fast_path_and_offsets():
+    assert normalize_ts("2025-08-19T13:45:00Z") == "2025-08-19T13:45:00Z"
+    assert normalize_ts("2025-08-19T15:45:00+02:00") == "2025-08-19T13:45:00Z"
+    for bad in ("2025-13-19T13:45:00Z", "yesterday", None):
+        try:
+            normalize_ts(bad)
+        except ValueError:
+            continue
+        raise AssertionError(bad)
+
+
+def test_csv_upload_reports_rejected_rows(api, data_dir):
+    body = (
+        "ID,Status,Verified_At,tags\n"
+        "health:0,open,2025-08-19T13:45:00Z,a|b\n"
+        "health:999,open,2025-08-19T13:45:00Z,\n"
+        "health:1,closed,not-a-date,\n"
+        "health:2,,2025-08-19T13:45:00Z,\n"
+    )
+    res = _bulk(api, body, content_type="text/csv").get_json()
+    assert res["appended"] == 1 and res["rejected"] == 3 and not res["truncated"]
+    assert [(r["row"], r["id"]) for r in res["rejections"]] == [(2, "health:999"), (3, "health:1"), (4, "health:2")]
+    assert "unknown" in res["rejections"][0]["error"]
+    logged = [json.loads(line) for line in (data_dir["updates"] / "health.jsonl").read_text().splitlines()]
+    assert logged == [{"id": "health:0", "status": "open", "verified_at": "2025-08-19T13:45:00Z",
+                       "name": None, "notes": None, "priority": None, "source": None, "reporter": None,
+                       "tags": ["a", "b"], "category": "health"}]
+
+
+def test_json_array_and_jsonl_uploads(api):
+    rows = [{"id": "health:0", "status": "open", "verified_at": "2025-08-19T13:45:00+00:00"}, 7,
+            {"id": "health:1", "status": "closed", "verified_at": "2025-08-19T13:45:00Z"}]
+    res = _bulk(api, json.dumps(rows, indent=2), content_type="application/json").get_json()
+    assert res["appended"] == 2 and res["rejections"] == [{"row": 2, "id": None, "error": "row must be a JSON object"}]
+    res = _bulk(api, "\n".join(json.dumps(r) for r in rows) + "\n{broken", content_type="application/x-ndjson").get_json()
+    assert res["appended"] == 2 and [r["row"] for r in res["rejections"]] == [2, 4]
+    upload = {"file": (io.BytesIO(b"id,status,verified_at\nhealth:2,open,2025-08-19T13:45:00Z\n"), "dump.csv")}
+    assert _bulk(api, upload, content_type="multipart/form-data").get_json()["appended"] == 1
+    assert _bulk(api, "  \n").status_code == 400
+    assert _bulk(api, "name,status\nx,open\n").status_code == 400
+
+
+def test_import_stream_writes_in_batches():
+    n = BATCH_SIZE * 2 + 5
+    lines = "".join(json.dumps({"id": str(i), "status": "open", "verified_at": "2025-08-19T13:45:00Z"}) + "\n"
+                    for i in range(n))
+    kind, text = open_upload(io.BytesIO(lines.encode()))
+    batches = []
+    report = import_stream(kind, text, "food", None, lambda rows: batches.append(len(rows)))
+    assert kind == "jsonl" and report["appended"] == n
+    assert batches == [BATCH_SIZE, BATCH_SIZE, 5]
+
+
+def test_malformed_rows_are_rejected_alone(api):
+    body = '[{"id": "health:0", "status": "open", "verified_at": "2025-08-19T13:45:00Z"}, {bad, "x": [1, 2]},\n'
+    body += '{"id": "health:1", "status": "open", "verified_at": "2025-08-19T13:45:00Z", "tags": ["a,]"]}]'
+    res = _bulk(api, body, content_type="application/json").get_json()
+    assert res["appended"] == 2 and [r["row"] for r in res["rejections"]] == [2]
+    huge = '{"id": "health:0", "status": "open", "verified_at": "2025-08-19T13:45:00Z", "n": ' + "1" * 5000 + "}"
+    res = _bulk(api, huge + "\n", content_type="application/x-ndjson")
+    assert res.status_code == 200 and "invalid JSON" in res.get_json()["rejections"][0]["error"]
+
+
+def test_naive_timestamps_are_utc_on_both_endpoints(api, data_dir):
+    row = {"category": "health", "id": "health:0", "status": "open", "verified_at": "2025-08-19T13:45:00"}
+    assert api.post("/api/v1/admin/update", headers=HEADERS, json=row).status_code == 200
+    _bulk(api, json.dumps([row]), content_type="application/json")
+    logged = [json.loads(line) for line in (data_dir["updates"] / "health.jsonl").read_text().splitlines()]
+    assert [r["verified_at"] for r in logged] == ["2025-08-19T13:45:00Z"] * 2
@@ -0,0 +1,58 @@
+import json
+
+from backend.services.datasets import bundle_key
+
+
+def test_bundle_key_follows_dataset_and_overlay_versions(app, api):
+    with app.app_context():
+        key = bundle_key(["roads", "health"])
+        assert key == bundle_key(["health", "roads"])
+        assert key != bundle_key(["health"])
+
+    first = api.get("/api/v1/datasets/?include=health").get_json()
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:2", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    with app.app_context():
+        assert bundle_key(["roads", "health"]) != key
+        assert bundle_key(["roads"]).split("|")[1] in key  # untouched layers keep their part
+    again = api.get("/api/v1/datasets/?include=health").get_json()
+    assert again["meta"] == first["meta"]
+
+
+def test_bundle_serves_overlaid_features_per_include_set(app, api):
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:2", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    for qs in ("include=health", "include=health&stream=1"):
+        feats = api.get(f"/api/v1/datasets/?{qs}").get_json()["data"]["health"]["features"]
+        assert {f["properties"]["id"]: f["properties"].get("status") for f in feats}["health:2"] == "closed"
+
+    both = api.get("/api/v1/datasets/?include=roads,health").get_json()
+    assert set(both["data"]) == {"health", "roads"}
+    assert api.get("/api/v1/datasets/?include=health,%20roads,").get_json() == both
+    assert set(api.get("/api/v1/datasets/?include=health").get_json()["data"]) == {"health"}
+
+
+def test_superseded_bundle_is_dropped_from_the_cache(app, api):
+    from backend import cache
+
+    api.get("/api/v1/datasets/?include=health")
+    with app.app_context():
+        key = bundle_key(["health"])
+        assert cache.get(key) is not None
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:2", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    api.get("/api/v1/datasets/?include=health")
+    with app.app_context():
+        assert cache.get(key) is None and cache.get(bundle_key(["health"])) is not None
@@ -0,0 +1,111 @@
+import json
+import os
+
+from backend.services.changes import read_build, record_base_diff
+from backend.services.files import write_meta_sidecar
+from backend.services.updates import compact
+
+HEADERS = {"X-Admin-Token": "test-token"}
+
+
+def _update(api, fid, status, ts, category="health"):
+    body = {"category": category, "id": fid, "status": status, "verified_at": ts}
+    assert api.post("/api/v1/admin/update", headers=HEADERS, json=body).status_code == 200
+
+
+def _changes(api, cursor=None, layers=""):
+    q = "&".join(p for p in (f"since={cursor}" if cursor else "", f"layers={layers}" if layers else "") if p)
+    res = api.get(f"/api/v1/changes?{q}")
+    assert res.status_code == 200
+    return json.loads(res.get_data())
+
+
+def _rebuild(path, mutate):
+    """What a pipeline run does: diff against the previous build, then swap."""
+    data = json.loads(path.read_text())
+    previous = read_build(path)
+    mutate(data["features"])
+    path.write_text(json.dumps(data))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    write_meta_sidecar(path, {"records": len(data["features"])})
+    record_base_diff(path, previous, data["features"], ("health",))
+
+
+def test_overlay_changes_since_cursor(api):
+    start = _changes(api)
+    assert start["layers"] == {} and start["reset"] == []
+    _update(api, "health:1", "closed", "2025-08-20T10:00:00Z")
+    _update(api, "1001", "closed", "2025-08-20T10:00:00Z", category="checkpoints")
+    res = _changes(api, start["cursor"])
+    assert [f["properties"]["id"] for f in res["layers"]["health"]["features"]] == ["health:1"]
+    assert res["layers"]["health"]["features"][0]["properties"]["status"] == "closed"
+    assert [f["properties"]["id"] for f in res["layers"]["checkpoints"]["features"]] == ["1001"]
+    assert res["layers"]["roads"] == {"features": [], "removed": []}
+    again = _changes(api, res["cursor"])
+    assert all(not v["features"] for v in again["layers"].values())
+    assert _changes(api, start["cursor"], layers="borders")["layers"]["borders"]["features"] == []
+
+
+def test_cursor_survives_compaction(api, data_dir):
+    cursor = _changes(api, layers="health")["cursor"]
+    _update(api, "health:0", "closed", "2025-08-20T10:00:00Z")
+    compact(data_dir["updates"] / "health.jsonl")
+    _update(api, "health:2", "open", "2025-08-20T11:00:00Z")
+    res = _changes(api, cursor, layers="health")
+    assert sorted(f["properties"]["id"] for f in res["layers"]["health"]["features"]) == ["health:0", "health:2"]
+    assert res["reset"] == []
+
+
+def test_base_diffs_from_pipeline_runs(api, data_dir):
+    cursor = _changes(api, layers="health")["cursor"]
+
+    def edit(features):
+        features[0]["properties"]["NAME"] = "Al-Shifa Medical Complex"
+        del features[2]
+
+    _rebuild(data_dir["health"], edit)
+    res = _changes(api, cursor, layers="health")
+    assert [f["properties"]["id"] for f in res["layers"]["health"]["features"]] == ["health:0"]
+    assert res["layers"]["health"]["features"][0]["properties"]["NAME"] == "Al-Shifa Medical Complex"
+    assert res["layers"]["health"]["removed"] == ["health:2"]
+    assert _changes(api, res["cursor"], layers="health")["layers"]["health"]["features"] == []
+
+
+def test_dataset_swapped_without_a_record_resets(api, data_dir):
+    _rebuild(data_dir["health"], lambda features: None)
+    cursor = _changes(api, layers="health")["cursor"]
+    data = json.loads(data_dir["health"].read_text())
+    data["features"].pop()
+    data_dir["health"].write_text(json.dumps(data))
+    write_meta_sidecar(data_dir["health"], {"records": 2})
+    assert _changes(api, cursor, layers="health")["reset"] == ["health"]
+
+
+def test_dataset_swapped_before_any_record_resets(api, data_dir):
+    cursor = _changes(api, layers="health")["cursor"]
+    data = json.loads(data_dir["health"].read_text())
+    data["features"][0]["properties"]["NAME"] = "Al-Shifa Medical Complex"
+    data_dir["health"].write_text(json.dumps(data))
+    write_meta_sidecar(data_dir["health"], {"records": 3})
+    assert not (data_dir["health"].parent / "opt_healthfacilities.json.changes.jsonl").exists()
+    res = _changes(api, cursor, layers="health")
+    assert res["reset"] == ["health"] and "health" not in res["layers"]
+    # the new cursor follows the swapped-in build
+    assert _changes(api, res["cursor"], layers="health")["reset"] == []
+
+
+def test_pipeline_run_after_a_manual_swap_resets(api, data_dir):
+    cursor = _changes(api, layers="health")["cursor"]
+    data = json.loads(data_dir["health"].read_text())
+    data["features"].pop()
+    data_dir["health"].write_text(json.dumps(data))
+    write_meta_sidecar(data_dir["health"], {"records": 2})
+    # the record diffs against the swapped-in build, not the cursor's
+    _rebuild(data_dir["health"], lambda features: None)
+    assert _changes(api, cursor, layers="health")["reset"] == ["health"]
+
+
+def test_bad_requests(api):
+    assert api.get("/api/v1/changes?since=garbage").status_code == 400
+    assert api.get("/api/v1/changes?layers=food").status_code == 400
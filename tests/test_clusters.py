@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+
+from backend.services.clusters import MAX_ZOOM, ClusterIndex
+from backend.services.kdtree import KDTree
+
+
+def _pt(lon, lat, fid, status=None):
+    props = {"id": fid}
+    if status:
+        props["status"] = status
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": props}
+
+
+def test_kdtree_queries_match_brute_force():
+    rng = np.random.default_rng(1)
+    pts = rng.random((3000, 2))
+    tree = KDTree(pts, leaf_size=8)
+    c = np.array([0.4, 0.6])
+    expected = np.flatnonzero(((pts - c) ** 2).sum(axis=1) <= 0.05**2)
+    assert sorted(tree.within(c, 0.05).tolist()) == expected.tolist()
+    d, idx = tree.nearest(c, k=5)
+    brute = np.argsort(((pts - c) ** 2).sum(axis=1))[:5]
+    assert idx.tolist() == brute.tolist()
+    mask = np.zeros(len(pts), dtype=bool)
+    mask[::7] = True
+    _, idx = tree.nearest(c, k=3, mask=mask)
+    assert all(i % 7 == 0 for i in idx.tolist())
+
+
+def test_hierarchy_counts_and_incremental_status():
+    feats = [_pt(34.45 + i * 1e-4, 31.5, str(i), "open") for i in range(5)] + [_pt(35.2, 31.9, "far", "closed")]
+    index = ClusterIndex(feats)
+
+    def points(positions):
+        return [feats[i] for i in positions]
+
+    top = index.query(0, (-180, -85, 180, 85), points)
+    assert [f["properties"]["point_count"] for f in top] == [6]
+    assert top[0]["properties"]["status_counts"] == {"open": 5, "closed": 1}
+
+    index.set_status(2, "closed")
+    top = index.query(0, (-180, -85, 180, 85), points)
+    assert top[0]["properties"]["status_counts"] == {"open": 4, "closed": 2}
+    assert len(index.query(MAX_ZOOM + 1, (-180, -85, 180, 85), points)) == 6
+
+
+def test_clusters_endpoint_follows_admin_updates(api):
+    res = api.get("/api/v1/clusters/health?zoom=0").get_json()
+    assert res["features"][0]["properties"]["point_count"] == 3
+    assert res["features"][0]["properties"]["status_counts"] == {"unknown": 3}
+
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:0", "status": "functioning",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    res = api.get("/api/v1/clusters/health?zoom=0").get_json()
+    assert res["features"][0]["properties"]["status_counts"] == {"unknown": 2, "functioning": 1}
+
+    # zoomed in on Gaza City only the single facility there remains
+    near = api.get("/api/v1/clusters/health?zoom=15&bbox=34.44,31.50,34.48,31.52").get_json()
+    assert [f["properties"]["id"] for f in near["features"]] == ["health:0"]
+    assert api.get("/api/v1/clusters/roads").status_code == 400
+    assert api.get("/api/v1/clusters/health?zoom=x").status_code == 400
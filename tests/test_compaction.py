@@ -0,0 +1,82 @@
+import gzip
+import json
+
+from backend import create_app
+from backend.services.updates import (
+    StatusLog,
+    compact,
+    iter_history,
+    load_updates,
+    read_snapshot,
+    segment_path,
+    snapshot_path,
+)
+
+
+def _line(fid, status, ts):
+    return json.dumps({"id": fid, "status": status, "verified_at": ts}) + "\n"
+
+
+def test_compact_rotates_tail_into_snapshot_and_gzip(tmp_path):
+    path = tmp_path / "health.jsonl"
+    path.write_text(_line("a", "open", "2025-08-01T00:00:00Z") + _line("a", "closed", "2025-08-02T00:00:00Z")
+                    + _line("b", "open", "2025-08-01T00:00:00Z"))
+    res = compact(path)
+    assert res["segment"] == 1 and res["rotated"] == ["health.000001.jsonl.gz"]
+    assert not path.exists()
+    assert read_snapshot(path) == (1, {"a": json.loads(_line("a", "closed", "2025-08-02T00:00:00Z")),
+                                       "b": json.loads(_line("b", "open", "2025-08-01T00:00:00Z"))})
+    with gzip.open(segment_path(path, 1), "rt") as f:
+        assert len(f.readlines()) == 3  # full history is kept
+
+    path.write_text(_line("b", "closed", "2025-08-03T00:00:00Z"))
+    assert {k: v["status"] for k, v in load_updates(path).items()} == {"a": "closed", "b": "closed"}
+    assert compact(path)["segment"] == 2
+    assert compact(path)["rotated"] == []  # nothing new
+    assert len(list(iter_history(path))) == 4
+    assert read_snapshot(path)[1]["b"]["status"] == "closed"
+
+
+def test_status_log_follows_rotation_without_losing_state(tmp_path):
+    path = tmp_path / "health.jsonl"
+    path.write_text(_line("a", "open", "2025-08-01T00:00:00Z"))
+    log = StatusLog(path)
+    log.refresh()
+    v = log.generation
+    compact(path)
+    assert log.refresh() == set() and log.generation == v  # same state, no spurious change
+    with path.open("a") as f:
+        f.write(_line("a", "closed", "2025-08-02T00:00:00Z"))
+    assert log.refresh() == {"a"} and log.latest["a"]["status"] == "closed"
+    assert log.snapshot(v)[2] == {"a"}
+
+
+def test_interrupted_compaction_is_replayed_and_finished(tmp_path):
+    path = tmp_path / "health.jsonl"
+    # rotated but crashed before the snapshot was written
+    segment_path(path, 1, compressed=False).write_text(_line("a", "closed", "2025-08-02T00:00:00Z"))
+    path.write_text(_line("b", "open", "2025-08-01T00:00:00Z"))
+    assert set(load_updates(path)) == {"a", "b"}
+    res = compact(path)
+    assert res["rotated"] == ["health.000001.jsonl.gz", "health.000002.jsonl.gz"]
+    assert not segment_path(path, 1, compressed=False).exists()
+    assert set(read_snapshot(path)[1]) == {"a", "b"}
+
+
+def test_admin_list_reads_snapshot_and_tail(app, api, data_dir):
+    headers = {"X-Admin-Token": "test-token"}
+    for fid, status, ts in (("1", "open", "2025-08-01T00:00:00Z"), ("2", "open", "2025-08-02T00:00:00Z")):
+        api.post("/api/v1/admin/update", headers=headers,
+                 json={"category": "health", "id": fid, "status": status, "verified_at": ts})
+    compact(data_dir["updates"] / "health.jsonl")
+    api.post("/api/v1/admin/update", headers=headers,
+             json={"category": "health", "id": "1", "status": "closed", "verified_at": "2025-08-03T00:00:00Z"})
+    rows = api.get("/api/v1/admin/list?category=health", headers=headers).get_json()
+    assert [(r["id"], r["status"]) for r in rows] == [("1", "closed"), ("2", "open")]
+
+
+def test_startup_compacts_large_logs(app, data_dir):
+    path = data_dir["updates"] / "health.jsonl"
+    path.write_text(_line("a", "open", "2025-08-01T00:00:00Z"))
+    create_app(type("Cfg", (), {**app.config, "UPDATES_COMPACT_MIN_BYTES": 1}))
+    assert not path.exists() and snapshot_path(path).exists()
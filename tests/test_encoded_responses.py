@@ -0,0 +1,41 @@
+import gzip
+import json
+
+import brotli
+
+
+def test_layer_served_precompressed_with_etag(api):
+    plain = api.get("/api/v1/roads", headers={"Accept-Encoding": "identity"})
+    gz = api.get("/api/v1/roads", headers={"Accept-Encoding": "gzip"})
+    br = api.get("/api/v1/roads", headers={"Accept-Encoding": "gzip, br"})
+
+    assert plain.headers.get("Content-Encoding") is None
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert br.headers["Content-Encoding"] == "br"
+    assert json.loads(gzip.decompress(gz.data)) == plain.get_json()
+    assert json.loads(brotli.decompress(br.data)) == plain.get_json()
+    assert "Accept-Encoding" in br.headers["Vary"]
+    assert len({plain.headers["ETag"], gz.headers["ETag"], br.headers["ETag"]}) == 3
+
+
+def test_if_none_match_returns_304(api):
+    first = api.get("/api/v1/health_centers/", headers={"Accept-Encoding": "gzip"})
+    again = api.get(
+        "/api/v1/health_centers/",
+        headers={"Accept-Encoding": "gzip", "If-None-Match": first.headers["ETag"]},
+    )
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+
+def test_overlay_change_rebuilds_body(api, data_dir):
+    first = api.get("/api/v1/border_crossings/")
+    fid = first.get_json()["features"][0]["properties"]["id"]
+    with open(data_dir["updates"] / "borders.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": fid, "status": "closed", "verified_at": "2025-08-20T10:00:00Z"}) + "\n")
+
+    second = api.get("/api/v1/border_crossings/", headers={"If-None-Match": first.headers["ETag"]})
+    assert second.status_code == 200
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert second.get_json()["features"][0]["properties"]["status"] == "closed"
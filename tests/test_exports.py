@@ -0,0 +1,72 @@
+import importlib.util
+import json
+
+import numpy as np
+
+from backend.pipelines.exports import write_dataset_exports
+from backend.services.exports import decode_qbin, decode_varints, encode_varints, export_path
+from backend.services.files import write_meta_sidecar
+
+QBIN = "application/vnd.aid-dashboard.qbin"
+
+
+def _post(api, **update):
+    return api.post("/api/v1/admin/update", headers={"X-Admin-Token": "test-token"}, data=json.dumps(update))
+
+
+def test_varints_round_trip():
+    values = np.array([0, 1, 127, 128, 300, 2**35, 2**64 - 1], dtype=np.uint64)
+    assert len(encode_varints(values[:3])) == 3
+    assert decode_varints(encode_varints(values)).tolist() == values.tolist()
+
+
+def test_qbin_layer_decodes_to_the_json_features(api):
+    for url in ("/api/v1/health_centers/", "/api/v1/checkpoints", "/api/v1/roads", "/api/v1/border_crossings/"):
+        resp = api.get(f"{url}?format=qbin")
+        assert resp.status_code == 200 and resp.mimetype == QBIN
+        assert decode_qbin(resp.data).features() == api.get(url).get_json()["features"]
+
+    projected = decode_qbin(api.get("/api/v1/roads?format=qbin&profile=map").data).features()
+    assert projected == api.get("/api/v1/roads?profile=map").get_json()["features"]
+
+
+def test_accept_header_negotiates_and_varies(api):
+    resp = api.get("/api/v1/roads", headers={"Accept": f"{QBIN}, application/json;q=0.5"})
+    assert resp.mimetype == QBIN and "Accept" in resp.headers["Vary"]
+    browser = api.get("/api/v1/roads", headers={"Accept": "text/html,*/*;q=0.8"})
+    assert browser.mimetype == "application/json" and "Accept" in browser.headers["Vary"]
+    # Accept is only a preference: a bbox query still gets JSON
+    assert api.get("/api/v1/roads?bbox=34,31,35,32", headers={"Accept": QBIN}).mimetype == "application/json"
+
+    assert api.get("/api/v1/roads?format=qbin&bbox=34,31,35,32").status_code == 400
+    assert api.get("/api/v1/roads?format=shp").status_code == 400
+    fgb = api.get("/api/v1/roads?format=fgb")
+    if importlib.util.find_spec("geopandas") is None:
+        assert fgb.status_code == 406
+        # asked for through Accept only, a missing format falls back to GeoJSON
+        resp = api.get("/api/v1/roads", headers={"Accept": "application/flatgeobuf"})
+        assert resp.status_code == 200 and resp.mimetype == "application/json"
+    else:
+        assert fgb.status_code == 200 and fgb.data[:3] == b"fgb"
+
+
+def test_pipeline_export_is_served_until_an_update_applies(app, api, data_dir):
+    path = data_dir["combined"]
+    write_meta_sidecar(path, {"source": "test"})
+    written = write_dataset_exports(path, ("checkpoints", "roads"), formats=("qbin",))
+    with app.app_context():
+        from backend.services.registry import get_dataset
+
+        key = get_dataset("roads").content_key
+    assert written["roads"]["qbin"] == str(export_path(path, "roads", key, "qbin"))
+
+    stored = export_path(path, "roads", key, "qbin").read_bytes()
+    assert api.get("/api/v1/roads?format=qbin").data == stored
+
+    # an update for an id the layer doesn't have leaves the stored file in use
+    _post(api, category="roads", id="9999", status="closed", verified_at="2025-08-20T10:00:00Z")
+    assert api.get("/api/v1/roads?format=qbin").data == stored
+    _post(api, category="roads", id="2001", status="closed", verified_at="2025-08-20T10:00:00Z")
+    fresh = api.get("/api/v1/roads?format=qbin").data
+    assert fresh != stored
+    assert decode_qbin(fresh).features()[0]["properties"]["status"] == "closed"
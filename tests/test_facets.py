@@ -0,0 +1,50 @@
+import json
+
+from backend.services.facets import FacetIndex, _labels
+
+
+def test_services_split_and_bilingual_lookup():
+    assert _labels("SERVICES", "General+Surgery | عامة+جراحة") == ["General | عامة", "Surgery | جراحة"]
+    features = [
+        {"properties": {"TYPE": "Clinic | عيادة", "SERVICES": "General+Surgery | عامة+جراحة"}},
+        {"properties": {"TYPE": "Hospital | مستشفى", "SERVICES": "General | عامة"}},
+        {"properties": {}},
+    ]
+    index = FacetIndex(features, ("TYPE", "SERVICES"))
+    assert index.mask("TYPE", ["clinic"]).tolist() == [True, False, False]
+    assert index.mask("TYPE", ["عيادة", "Hospital | مستشفى"]).tolist() == [True, True, False]
+    assert index.mask("SERVICES", ["surgery"]).tolist() == [True, False, False]
+    assert index.mask("TYPE", ["nope"]).tolist() == [False, False, False]
+    assert index.counts("SERVICES", None) == {"General | عامة": 2, "Surgery | جراحة": 1, "unknown": 1}
+
+
+def test_filters_and_facets_on_health_endpoint(api):
+    body = api.get("/api/v1/health_centers/?TYPE=clinic&region=Gaza Strip").get_json()
+    assert [f["properties"]["NAME"] for f in body["features"]] == ["Rafah Clinic | عيادة رفح"]
+    facets = body["facets"]
+    # each field is counted with every other filter applied
+    assert facets["TYPE"] == {"Clinic | عيادة": 1, "Hospital | مستشفى": 1}
+    assert facets["REGION"] == {"Gaza Strip": 1, "West Bank": 1}
+    assert facets["GOVERNORATE"] == {"Rafah": 1}
+    assert facets["status"] == {"unknown": 1}
+
+    both = api.get("/api/v1/health_centers/?SERVICES=General,Surgery").get_json()
+    assert len(both["features"]) == 3
+
+    boxed = api.get("/api/v1/health_centers/?facets=1&bbox=34,31,35,31.6").get_json()
+    assert len(boxed["features"]) == 2 and boxed["facets"]["REGION"] == {"Gaza Strip": 2}
+
+    plain = api.get("/api/v1/health_centers/").get_json()
+    assert "facets" not in plain
+
+
+def test_status_filter_follows_overlay(api):
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:1", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    body = api.get("/api/v1/health_centers/?status=closed").get_json()
+    assert [f["properties"]["id"] for f in body["features"]] == ["health:1"]
+    assert body["facets"]["status"] == {"closed": 1, "unknown": 2}
@@ -0,0 +1,68 @@
+import json
+
+import numpy as np
+
+from backend.services.feature_store import FeatureStore
+from backend.services.layers import feature_store, get_view, spatial_index
+from backend.services.projection import PROFILES, Projection
+
+
+def _post(api, **update):
+    return api.post("/api/v1/admin/update", headers={"X-Admin-Token": "test-token"}, data=json.dumps(update))
+
+
+def test_store_materializes_the_view_with_its_overlay(app, api):
+    _post(api, category="roads", id="2001", status="closed", verified_at="2025-08-20T10:00:00Z")
+    with app.app_context():
+        for layer in ("health", "checkpoints", "roads", "borders"):
+            view = get_view(layer)
+            store = feature_store(view)
+            assert store.features() == view.features
+            assert [list(f["properties"]) for f in store.features()] == [list(f["properties"]) for f in view.features]
+            assert store.features(np.array([len(store) - 1, 0])) == [view.features[-1], view.features[0]]
+        roads = feature_store(get_view("roads"))
+        assert roads.isin("status", {"closed"}).tolist() == [True, False]
+
+
+def test_vectorized_filters_match_the_dict_path(app):
+    with app.app_context():
+        view = get_view("roads")
+        store = feature_store(view)
+        env = store.envelopes
+        assert np.array_equal(env, spatial_index(view).envelopes, equal_nan=True)
+        bbox = (34.44, 31.44, 34.6, 31.6)
+        assert store.bbox(bbox).tolist() == [True, False]
+        assert store.isin("highway", ["secondary"]).tolist() == [False, True]
+        assert store.where("tags.name", lambda v: v.startswith("Salah")).tolist() == [True, False]
+        assert not store.isin("missing", ["x"]).any()
+
+
+def test_projection_matches_projection_apply(app):
+    with app.app_context():
+        for layer in ("health", "checkpoints", "roads"):
+            view = get_view(layer)
+            store = feature_store(view)
+            for projection in (
+                PROFILES["map"][layer],
+                PROFILES["detail"][layer],
+                Projection(include=frozenset({"tags.name", "tags.nope", "kind"}), exclude=frozenset({"kind"})),
+                Projection(exclude=frozenset({"tags.highway", "id"})),
+            ):
+                # key order included: both follow the source, whatever the set order
+                assert json.dumps(store.project(projection).features()) == json.dumps(
+                    [projection.apply(f) for f in view.features]
+                )
+
+
+def test_geometries_round_trip():
+    feats = [
+        {"type": "Feature", "geometry": {"type": "MultiLineString", "coordinates": [[[0, 0], [1, 1]], [[2, 2], [3, 3]]]},
+         "properties": {"id": "a"}},
+        {"type": "Feature", "geometry": None, "properties": {"id": "b"}},
+        {"type": "Feature", "geometry": {"type": "Polygon", "coordinates": [[[0, 0], [1, 0], [0, 1], [0, 0]]]},
+         "properties": {"id": "c"}},
+    ]
+    store = FeatureStore.from_features(feats)
+    assert store.features() == feats
+    assert store.features([2]) == feats[2:]
+    assert np.isnan(store.envelopes[1]).all() and store.envelopes[2].tolist() == [0, 0, 1, 1]
@@ -0,0 +1,56 @@
+import numpy as np
+
+from backend.services.lod import build_pyramid, level_for, tolerance_for_zoom
+from backend.services.simplify import douglas_peucker, simplify_many
+
+
+def _road(coords, fid):
+    return {"type": "Feature", "geometry": {"type": "LineString", "coordinates": coords}, "properties": {"id": fid}}
+
+
+def test_douglas_peucker_drops_collinear_points():
+    line = np.array([[0, 0], [1, 0.001], [2, 0], [3, 5], [4, 0]], dtype=float)
+    assert douglas_peucker(line, 0.01).tolist() == [[0, 0], [2, 0], [3, 5], [4, 0]]
+
+
+def test_batched_simplification_matches_per_line():
+    rng = np.random.default_rng(3)
+    lines = [rng.normal(0, 1, size=(int(k), 2)).cumsum(axis=0) for k in rng.integers(1, 40, 200)]
+    offsets = np.concatenate([[0], np.cumsum([len(line) for line in lines])])
+    keep = simplify_many(np.concatenate(lines), offsets, 0.8)
+    for line, a, b in zip(lines, offsets[:-1], offsets[1:], strict=True):
+        assert (np.concatenate(lines)[a:b][keep[a:b]] == douglas_peucker(line, 0.8)).all()
+
+
+def test_anchored_vertices_survive_simplification():
+    line = np.array([[0, 0], [1, 0], [2, 0], [3, 0]], dtype=float)
+    anchors = np.array([False, True, False, False])
+    keep = simplify_many(line, np.array([0, 4]), 1.0, anchors)
+    assert line[keep].tolist() == [[0, 0], [1, 0], [3, 0]]
+
+
+def test_pyramid_keeps_junctions_shared_between_roads():
+    wiggly = [[34.0 + i * 0.001, 31.5 + (0.00001 if i % 2 else 0)] for i in range(50)]
+    crossing = [wiggly[25], [wiggly[25][0], 31.6]]
+    pyramid = build_pyramid([_road(wiggly, "a"), _road(crossing, "b")])
+    assert len(pyramid[8][0]) < len(wiggly)
+    assert wiggly[25] in pyramid[8][0]
+    assert all(len(pyramid[z][0]) <= len(pyramid[z + 2][0]) for z in (8, 10, 12))
+
+
+def test_level_selection():
+    assert level_for() is None
+    assert level_for(zoom=9) == 10
+    assert level_for(zoom=3) == 8
+    assert level_for(zoom=16) is None
+    assert level_for(tolerance=tolerance_for_zoom(12)) == 12
+
+
+def test_roads_endpoint_serves_levels(api):
+    full = api.get("/api/v1/roads").get_json()["features"]
+    coarse = api.get("/api/v1/roads?zoom=8").get_json()["features"]
+    assert [f["properties"]["id"] for f in coarse] == [f["properties"]["id"] for f in full]
+    assert len(coarse[0]["geometry"]["coordinates"]) < len(full[0]["geometry"]["coordinates"])
+    assert api.get("/api/v1/roads?zoom=abc").status_code == 400
+    # points have nothing to simplify
+    assert api.get("/api/v1/checkpoints?zoom=8").get_json() == api.get("/api/v1/checkpoints").get_json()
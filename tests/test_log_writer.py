@@ -0,0 +1,48 @@
+import json
+import threading
+
+from backend.services.log_writer import GroupWriter, locked_log
+from backend.services.updates import compact, load_updates
+
+
+def test_concurrent_appends_are_group_committed(tmp_path):
+    path = tmp_path / "health.jsonl"
+    writer = GroupWriter(path)
+    lines = [json.dumps({"id": f"health:{i}", "status": "open", "verified_at": "2025-08-19T13:45:00Z"}) + "\n"
+             for i in range(200)]
+    threads = [threading.Thread(target=writer.append, args=(line,)) for line in lines]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(path.read_text().splitlines(keepends=True)) == sorted(lines)
+    assert writer.appends == 200 and writer.commits <= 200
+
+
+def test_writer_follows_rotation(tmp_path):
+    path = tmp_path / "health.jsonl"
+    writer = GroupWriter(path)
+    writer.append(json.dumps({"id": "a", "status": "open", "verified_at": "2025-08-01T00:00:00Z"}) + "\n")
+    compact(path)
+    writer.append(json.dumps({"id": "b", "status": "open", "verified_at": "2025-08-02T00:00:00Z"}) + "\n")
+    assert set(load_updates(path)) == {"a", "b"}
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_locked_log_reopens_a_file_rotated_while_waiting(tmp_path):
+    path = tmp_path / "health.jsonl"
+    path.write_text("")
+    with locked_log(path):
+        done = threading.Event()
+
+        def write():
+            with locked_log(path) as f:
+                f.write(b"x\n")
+            done.set()
+
+        t = threading.Thread(target=write)
+        t.start()
+        assert not done.wait(0.2)  # blocked on the lock
+        path.rename(tmp_path / "rotated.jsonl")
+    t.join()
+    assert path.read_text() == "x\n" and (tmp_path / "rotated.jsonl").read_text() == ""
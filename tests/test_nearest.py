@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+
+from backend.services.nearest import NearestIndex, chord_to_metres, unit_vectors
+
+
+def _haversine(lon1, lat1, lon2, lat2):
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6_371_008.8 * np.arcsin(np.sqrt(a))
+
+
+def test_tree_and_batch_agree_with_brute_force():
+    rng = np.random.default_rng(3)
+    pts = rng.uniform([34.2, 31.2], [35.6, 32.6], size=(400, 2))
+    feats = [{"geometry": {"type": "Point", "coordinates": p.tolist()}} for p in pts]
+    index = NearestIndex(feats)
+    mask = rng.random(400) < 0.5
+    origins = rng.uniform([34.2, 31.2], [35.6, 32.6], size=(20, 2))
+    batch_d, batch_i = index.query_many(origins, 5, mask)
+    for (lon, lat), row_d, row_i in zip(origins, batch_d, batch_i, strict=True):
+        d = _haversine(lon, lat, pts[:, 0], pts[:, 1])
+        d[~mask] = np.inf
+        expected = np.argsort(d)[:5]
+        metres, positions = index.query(lon, lat, 5, mask)
+        assert positions.tolist() == expected.tolist() == row_i.tolist()
+        assert np.allclose(metres, d[expected], rtol=1e-9) and np.allclose(row_d, d[expected], rtol=1e-9)
+    a, b = unit_vectors(np.array([0.0, 0.0]), np.array([0.0, 1.0]))
+    assert np.isclose(chord_to_metres(np.linalg.norm(a - b)), _haversine(0, 0, 0, 1))
+
+
+def test_nearest_endpoints(api):
+    res = api.get("/api/v1/nearest?lat=31.30&lon=34.30&layer=health&k=2").get_json()
+    assert [f["properties"]["id"] for f in res["features"]] == ["health:1", "health:0"]
+    assert 0 < res["features"][0]["properties"]["distance_m"] < 2000
+
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "health", "id": "health:0", "status": "functioning",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    res = api.get("/api/v1/nearest?lat=31.30&lon=34.30&k=5&status=functioning").get_json()
+    assert [f["properties"]["id"] for f in res["features"]] == ["health:0"]
+
+    batch = api.post("/api/v1/nearest", json={
+        "layer": "borders", "k": 1, "origins": [[34.27, 31.22], {"lon": 34.24, "lat": 31.25}],
+    }).get_json()
+    assert [r["features"][0]["properties"]["name"] for r in batch["results"]] == ["Kerem Shalom", "Rafah"]
+
+    assert api.get("/api/v1/nearest?lat=31.3&lon=34.3&layer=roads").status_code == 400
+    assert api.get("/api/v1/nearest?lat=x&lon=34.3").status_code == 400
+    assert api.post("/api/v1/nearest", json={"origins": [[1]]}).status_code == 400
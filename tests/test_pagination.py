@@ -0,0 +1,33 @@
+import json
+
+
+def _all_pages(api, url):
+    ids, cursor = [], None
+    while True:
+        res = api.get(url + (f"&cursor={cursor}" if cursor else "")).get_json()
+        ids += [f["properties"]["id"] for f in res["features"]]
+        cursor = res["next_cursor"]
+        if not cursor:
+            return ids
+
+
+def test_pages_cover_layer_in_id_order(api):
+    assert _all_pages(api, "/api/v1/health_centers/?limit=2") == ["health:0", "health:1", "health:2"]
+    assert _all_pages(api, "/api/v1/roads?limit=1") == ["2001", "2002"]
+    # pagination composes with bbox
+    assert _all_pages(api, "/api/v1/health_centers/?limit=1&bbox=34,31,35,32") == ["health:0", "health:1"]
+
+
+def test_cursor_survives_overlay_but_not_base_reload(api, data_dir):
+    first = api.get("/api/v1/health_centers/?limit=1").get_json()
+    with open(data_dir["updates"] / "health.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "health:1", "status": "closed", "verified_at": "2025-08-20T10:00:00Z"}) + "\n")
+    second = api.get(f"/api/v1/health_centers/?limit=1&cursor={first['next_cursor']}").get_json()
+    assert second["features"][0]["properties"]["status"] == "closed"
+
+    data = json.loads(data_dir["health"].read_text(encoding="utf-8"))
+    data_dir["health"].write_text(json.dumps(data, indent=1), encoding="utf-8")
+    res = api.get(f"/api/v1/health_centers/?limit=1&cursor={second['next_cursor']}")
+    assert res.status_code == 410
+    assert api.get("/api/v1/health_centers/?cursor=garbage").status_code == 400
+    assert api.get("/api/v1/health_centers/?limit=0").status_code == 400
@@ -0,0 +1,54 @@
+import json
+
+from backend.services.projection import PROFILES, Projection
+
+
+def test_projection_dotted_paths_and_exclude():
+    ft = {"type": "Feature", "geometry": None,
+          "properties": {"id": "1", "tags": {"name": "A", "highway": "primary"}, "user": "x", "lanes": "2"}}
+    slim = Projection(include=frozenset({"tags.name", "lanes"})).apply(ft)
+    assert slim["properties"] == {"id": "1", "tags": {"name": "A"}, "lanes": "2"}
+    dropped = Projection(exclude=frozenset({"user", "tags.highway", "id"})).apply(ft)
+    assert dropped["properties"] == {"id": "1", "tags": {"name": "A"}, "lanes": "2"}
+    assert ft["properties"]["tags"] == {"name": "A", "highway": "primary"}  # base untouched
+
+
+def test_profiles_on_layer_endpoints(api):
+    full = api.get("/api/v1/health_centers/").get_json()["features"][0]["properties"]
+    slim = api.get("/api/v1/health_centers/?profile=map").get_json()["features"][0]["properties"]
+    detail = api.get("/api/v1/checkpoints?profile=detail").get_json()["features"][0]["properties"]
+    assert "__raw" in full and "__raw" not in slim
+    assert slim["NAME"] == full["NAME"] and slim["id"] == full["id"]
+    assert "user" not in detail and detail["tags"]["name"] == "Netzarim"
+
+    roads = api.get("/api/v1/roads?profile=map").get_json()["features"]
+    assert roads[0]["properties"]["tags"] == {"name": "Salah al-Din Road"}
+
+    custom = api.get("/api/v1/border_crossings/?fields=name&exclude=id").get_json()["features"]
+    assert [f["properties"] for f in custom] == [
+        {"id": f["properties"]["id"], "name": f["properties"]["name"]} for f in custom
+    ]
+    assert api.get("/api/v1/roads?profile=tiny").status_code == 400
+
+
+def test_profile_cached_per_dataset_and_overlay_reapplied(app, api, data_dir):
+    api.get("/api/v1/health_centers/?profile=map")
+    with open(data_dir["updates"] / "health.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "health:1", "status": "closed", "verified_at": "2025-08-20T10:00:00Z"}) + "\n")
+    feats = api.get("/api/v1/health_centers/?profile=map&bbox=34.2,31.2,34.4,31.4").get_json()["features"]
+    assert feats[0]["properties"]["status"] == "closed"
+    assert "__raw" not in feats[0]["properties"]
+
+    from backend.services.layers import get_view
+
+    with app.app_context():
+        view = get_view("health")
+        cached = view.dataset.peek(("profile", "health", "map"))
+    assert cached is not None and "status" not in cached[1]["properties"]
+    assert set(PROFILES) == {"map", "detail"}
+
+
+def test_borders_map_profile_keeps_org_and_last_seen():
+    props = {"id": "borders:1", "name": "Rafah", "org": "UNRWA", "last_seen_ts": 1738281600000, "notes": "x"}
+    slim = PROFILES["map"]["borders"].apply({"type": "Feature", "geometry": None, "properties": props})
+    assert slim["properties"] == {k: v for k, v in props.items() if k != "notes"}
@@ -0,0 +1,54 @@
+import json
+import os
+
+from backend.services import registry as registry_mod
+from backend.services.registry import get_dataset, get_layer
+
+
+def test_combined_file_is_split_in_one_parse(app, monkeypatch):
+    calls = []
+    real_parse = registry_mod._parse
+    monkeypatch.setattr(registry_mod, "_parse", lambda *a: calls.append(a) or real_parse(*a))
+    with app.app_context():
+        points = get_layer("checkpoints")
+        lines = get_layer("roads")
+        get_layer("checkpoints")
+    assert len(calls) == 1
+    assert {f["geometry"]["type"] for f in points} == {"Point"}
+    assert {f["geometry"]["type"] for f in lines} == {"LineString"}
+    assert all(f["properties"]["id"] for f in points + lines)
+
+
+def test_reload_on_sidecar_or_file_change(app, data_dir):
+    with app.app_context():
+        first = get_dataset("borders")
+        assert get_dataset("borders") is first
+
+        meta = str(data_dir["borders"]) + ".meta.json"
+        with open(meta, "w", encoding="utf-8") as f:
+            json.dump({"updated_at": "2025-08-20T00:00:00Z", "data_size": 1}, f)
+        second = get_dataset("borders")
+        assert second is not first and second.version != first.version
+
+        data = json.loads(data_dir["borders"].read_text(encoding="utf-8"))
+        data["features"] = data["features"][:1]
+        data_dir["borders"].write_text(json.dumps(data), encoding="utf-8")
+        st = os.stat(data_dir["borders"])
+        os.utime(data_dir["borders"], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert len(get_layer("borders")) == 1
+
+
+def test_endpoints_and_bundle_read_from_registry(api):
+    assert len(api.get("/api/v1/roads").get_json()["features"]) == 2
+    assert len(api.get("/api/v1/checkpoints").get_json()["features"]) == 2
+    bundle = api.get("/api/v1/datasets/?include=health").get_json()
+    assert bundle["meta"]["sources"]["health"]["records"] == 3
+
+
+def test_bundle_parses_each_file_once(api, monkeypatch):
+    calls = []
+    real_parse = registry_mod._parse
+    monkeypatch.setattr(registry_mod, "_parse", lambda *a: calls.append(a) or real_parse(*a))
+    bundle = api.get("/api/v1/datasets/").get_json()
+    assert set(bundle["data"]) == {"health", "checkpoints", "roads", "borders"}
+    assert len(calls) == len({a[0] for a in calls}) == 3
@@ -0,0 +1,120 @@
+import json
+import math
+
+import numpy as np
+
+from backend.services.routing import (
+    Targets,
+    _dijkstra,
+    build_graph,
+    convex_hull,
+    load_graph,
+    route,
+    route_cache,
+    write_graph,
+)
+
+
+def _road(coords, highway="primary", **props):
+    return {"type": "Feature", "geometry": {"type": "LineString", "coordinates": coords},
+            "properties": {"highway": highway, **props}}
+
+
+def _point(lon, lat, **props):
+    return {"type": "Feature", "geometry": {"type": "Point", "coordinates": [lon, lat]}, "properties": props}
+
+
+ROADS = [
+    _road([[0, 0], [0.01, 0], [0.02, 0]], id="a"),
+    _road([[0, 0], [0, 0.01], [0.02, 0.01], [0.02, 0]], highway="secondary", id="b"),
+]
+CHECKPOINTS = [_point(0.01, 0, id="on-node"), _point(0.015, 0.0001, id="mid-edge"), _point(1, 1, id="far")]
+
+
+def test_graph_snaps_checkpoints_and_detours_around_closures():
+    graph = build_graph(ROADS, CHECKPOINTS)
+    on_node, mid, far = graph.checkpoint_node.tolist()
+    assert graph.lonlat[on_node].tolist() == [0.01, 0]
+    assert mid >= 0 and np.allclose(graph.lonlat[mid], [0.015, 0])  # edge split at the projection
+    assert far == -1
+    assert graph.indptr[-1] == len(graph.head) == 2 * 6  # 6 undirected segments after the split
+
+    targets = Targets.attach(graph, [_point(0.02, 0)])
+    origin, _ = graph.snap(0, 0)
+    direct = route(graph, targets, origin, None, frozenset())
+    assert direct["roads"] == [0] and mid in [graph.snap(*c)[0] for c in direct["coordinates"]]
+    assert math.isclose(direct["seconds"], direct["metres"] / (50 / 3.6))
+
+    detour = route(graph, targets, origin, None, graph.blocked(np.array([False, True, False])))
+    assert detour["roads"] == [1] and detour["seconds"] > direct["seconds"]
+    assert route(graph, targets, origin, np.array([False]), frozenset()) is None
+
+
+def test_oneway_and_persisted_graph(tmp_path):
+    roads = [_road([[0, 0], [0.01, 0]], id="one", oneway="yes")]
+    graph = build_graph(roads, [])
+    assert graph.head.tolist() == [1] and np.diff(graph.indptr).tolist() == [1, 0]
+
+    path = tmp_path / "roads.geojson"
+    write_graph(path, ROADS, CHECKPOINTS, "key-1")
+    loaded = load_graph(path, ROADS, CHECKPOINTS, "key-1")
+    assert np.array_equal(loaded.head, build_graph(ROADS, CHECKPOINTS).head)
+    assert loaded.checkpoint_node.tolist() == build_graph(ROADS, CHECKPOINTS).checkpoint_node.tolist()
+    # a stale file is ignored
+    assert load_graph(path, ROADS[:1], [], "key-2").checkpoint_node.tolist() == []
+
+
+def test_astar_matches_dijkstra_on_random_grid():
+    rng = np.random.default_rng(7)
+    step = 0.005
+    roads = []
+    for i in range(8):
+        roads.append(_road([[j * step, i * step] for j in range(8)], highway=rng.choice(["primary", "secondary"])))
+        roads.append(_road([[i * step, j * step] for j in range(8)], highway="trunk" if i % 3 else "residential"))
+    checkpoints = [_point(*rng.uniform(0, 7 * step, 2)) for _ in range(15)]
+    facilities = [_point(*rng.uniform(0, 7 * step, 2)) for _ in range(4)]
+    graph = build_graph(roads, checkpoints)
+    targets = Targets.attach(graph, facilities)
+    blocked = graph.blocked(rng.random(15) < 0.5)
+    for origin in rng.choice(graph.size, 20).tolist():
+        dist = _dijkstra(graph.adjacency, graph.size, {origin: 0.0}, blocked - {origin})
+        best = min(dist[n] + s for n, s in zip(targets.node.tolist(), targets.access_s.tolist(), strict=True))
+        found = route(graph, targets, origin, None, blocked)
+        if math.isinf(best):
+            assert found is None
+        else:
+            assert math.isclose(found["seconds"], best)
+
+
+def test_convex_hull():
+    ring = convex_hull([(0, 0), (1, 0), (1, 1), (0, 1), (0.5, 0.5)])
+    assert ring[0] == ring[-1] and len(ring) == 5
+    assert convex_hull([(0, 0), (1, 1)]) == [[0, 0], [1, 1]]
+
+
+def test_route_and_isochrone_endpoints(api):
+    route_cache.clear()
+    res = api.get("/api/v1/route?lat=31.45&lon=34.40")
+    assert res.status_code == 200
+    leg, facility = res.get_json()["features"]
+    assert facility["properties"]["id"] == "health:0"
+    assert leg["geometry"]["coordinates"][0] == [34.40, 31.45]
+    assert leg["properties"]["road_ids"] == ["2001"]
+    assert len(route_cache) == 1
+
+    iso = api.get("/api/v1/isochrones?lat=31.45&lon=34.40&minutes=5,30").get_json()["features"]
+    assert [b["properties"]["minutes"] for b in iso] == [5, 30]
+    assert iso[0]["properties"]["facility_ids"] == [] and iso[1]["properties"]["facility_ids"] == ["health:0"]
+    assert iso[1]["geometry"]["type"] == "Polygon"
+
+    api.post(
+        "/api/v1/admin/update",
+        headers={"X-Admin-Token": "test-token"},
+        data=json.dumps({"category": "checkpoints", "id": "1001", "status": "closed",
+                         "verified_at": "2025-08-20T10:00:00Z"}),
+    )
+    # the checkpoint sits on the only road towards the facility
+    assert api.get("/api/v1/route?lat=31.45&lon=34.40").status_code == 404
+    assert api.get("/api/v1/route?lat=31.45&lon=34.40&avoid=none").status_code == 200
+    assert api.get("/api/v1/route?lat=x&lon=34.40").status_code == 400
+    assert api.get("/api/v1/isochrones?lat=31.45&lon=34.40&minutes=0").status_code == 400
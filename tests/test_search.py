@@ -0,0 +1,49 @@
+from backend.services.search import SearchIndex, normalize, tokenize
+
+
+def _named(**props):
+    return {"type": "Feature", "geometry": None, "properties": props}
+
+
+def test_arabic_normalization():
+    assert normalize("مُسْتَشْفَى") == "مستشفي"
+    assert tokenize("إسعاف | أريحا آمنة") == ["اسعاف", "اريحا", "امنه"]
+    assert tokenize("Café São-Paulo") == ["cafe", "sao", "paulo"]
+
+
+def test_prefix_fuzzy_and_ranking():
+    index = SearchIndex([
+        _named(NAME="Al-Shifa Hospital | مستشفى الشفاء"),
+        _named(NAME="Shifa Clinic"),
+        _named(tags={"name": "Salah al-Din Road", "name:ar": "شارع صلاح الدين", "highway": "primary"}),
+        _named(name="Kerem Shalom"),
+    ])
+    assert [d for _, d in index.search("shifa", 10)] == [1, 0]  # phrase at the start ranks first
+    assert [d for _, d in index.search("hosp", 10)] == [0]
+    assert [d for _, d in index.search("مستشفي", 10)] == [0]
+    assert [d for _, d in index.search("صلاح", 10)] == [2]
+    assert [d for _, d in index.search("shalon", 10)] == [3]  # typo, trigram fallback
+    assert [d for _, d in index.search("shfa", 10)] == [1, 0]  # one letter dropped
+    assert [d for _, d in index.search("shfia", 10)] == [1, 0]  # letters swapped
+    assert index.search("shf", 10) == []  # too short to fall back on one edit
+    assert index.search("shifa road", 10) == []
+    assert index.labels[2] == "Salah al-Din Road"
+
+
+def test_search_endpoint(api):
+    res = api.get("/api/v1/search?q=clinic").get_json()
+    assert [f["properties"]["name"] for f in res["features"]] == [
+        "Ramallah Clinic", "Rafah Clinic | عيادة رفح",  # equal scores: shorter name first
+    ]
+    assert res["features"][0]["properties"]["layer"] == "health"
+    assert res["features"][0]["geometry"]["type"] == "Point"
+
+    res = api.get("/api/v1/search?q=netz&layers=checkpoints,roads").get_json()
+    assert [f["properties"]["id"] for f in res["features"]] == ["1001"]
+    assert api.get("/api/v1/search?q=salah&layers=health").get_json()["features"] == []
+    for q in ("shifa", "shfa", "shifaa"):
+        res = api.get(f"/api/v1/search?q={q}&layers=health").get_json()
+        assert res["features"][0]["properties"]["name"] == "Al-Shifa Hospital | مستشفى الشفاء"
+    assert len(api.get("/api/v1/search?q=r&limit=1").get_json()["features"]) == 1
+    assert api.get("/api/v1/search?q=x&layers=nope").status_code == 400
+    assert api.get("/api/v1/search").get_json()["features"] == []
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from backend.services.spatial import GridIndex, parse_bbox
+
+
+def test_grid_matches_brute_force():
+    rng = np.random.default_rng(7)
+    lo = rng.uniform([34.2, 31.2], [35.5, 32.5], size=(2000, 2))
+    size = rng.exponential(0.01, size=(2000, 2)) * (rng.random((2000, 1)) < 0.5)
+    env = np.hstack([lo, lo + size])
+    index = GridIndex(env)
+    for bbox in [(34.4, 31.4, 34.5, 31.55), (30, 30, 40, 40), (0, 0, 1, 1), (34.8, 31.9, 34.8, 31.9)]:
+        expected = np.nonzero(
+            (env[:, 0] <= bbox[2]) & (env[:, 2] >= bbox[0]) & (env[:, 1] <= bbox[3]) & (env[:, 3] >= bbox[1])
+        )[0]
+        assert index.query(bbox).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("raw", ["1,2,3", "a,b,c,d", "2,0,1,1"])
+def test_parse_bbox_rejects_bad_input(raw):
+    with pytest.raises(ValueError):
+        parse_bbox(raw)
+
+
+def test_bbox_param_on_layer_endpoints(api):
+    # one checkpoint and the road passing through it are around Gaza City
+    gaza_city = "34.42,31.47,34.47,31.52"
+    roads = api.get(f"/api/v1/roads?bbox={gaza_city}").get_json()["features"]
+    points = api.get(f"/api/v1/checkpoints?bbox={gaza_city}").get_json()["features"]
+    health = api.get(f"/api/v1/health_centers/?bbox={gaza_city}").get_json()["features"]
+    assert [f["properties"]["id"] for f in roads] == ["2001"]
+    assert [f["properties"]["id"] for f in points] == ["1001"]
+    assert len(health) == 1
+    assert api.get("/api/v1/border_crossings/?bbox=1,2").status_code == 400
@@ -0,0 +1,59 @@
+import json
+
+from backend.services.layers import get_view
+from backend.services.updates import StatusLog
+
+
+def _line(fid, status, ts):
+    return json.dumps({"id": fid, "status": status, "verified_at": ts}) + "\n"
+
+
+def test_status_log_reads_only_appended_lines(tmp_path):
+    path = tmp_path / "health.jsonl"
+    log = StatusLog(path)
+    assert log.refresh() == set() and log.version == "0"
+
+    path.write_text(_line("a", "open", "2025-08-01T00:00:00Z") + _line("b", "open", "2025-08-01T00:00:00Z"))
+    assert log.refresh() == {"a", "b"}
+    v1 = int(log.version)
+
+    with path.open("a") as f:
+        f.write(_line("a", "closed", "2025-07-01T00:00:00Z"))  # older: ignored
+        f.write('{"id": "b", "status": "closed", "verif')  # writer mid-line
+    assert log.refresh() == set() and log.latest["b"]["status"] == "open"
+    with path.open("a") as f:
+        f.write('ied_at": "2025-08-02T00:00:00Z"}\n')
+    assert log.refresh() == {"b"} and log.latest["b"]["status"] == "closed"
+    assert log.offset == path.stat().st_size
+
+    version, latest, changed = log.snapshot(v1)
+    assert changed == {"b"} and latest["a"]["status"] == "open"
+    assert log.snapshot(int(version))[2] == set()
+
+    path.write_text(_line("c", "open", "2025-08-03T00:00:00Z"))  # truncated / replaced
+    log.refresh()
+    assert set(log.latest) == {"c"}
+    assert log.snapshot(v1)[2] == {"a", "b", "c"}  # a reload is diffed, not a blanket reset
+
+
+def test_view_reapplies_only_changed_features(app, data_dir):
+    with app.app_context():
+        before = get_view("health")
+        with (data_dir["updates"] / "health.jsonl").open("a") as f:
+            f.write(_line("health:1", "closed", "2025-08-20T10:00:00Z"))
+        after = get_view("health")
+        assert after is not before and after.overlay_version != before.overlay_version
+        assert after.features[1]["properties"]["status"] == "closed"
+        assert after.features[0] is before.features[0] and after.features[2] is before.features[2]
+        assert get_view("health") is after
+
+
+def test_poll_is_throttled_but_local_writes_are_immediate(tmp_path):
+    path = tmp_path / "roads.jsonl"
+    log = StatusLog(path)
+    log.poll(3600)
+    path.write_text(_line("r", "open", "2025-08-01T00:00:00Z"))
+    log.poll(3600)  # another process wrote; not seen until the interval passes
+    assert log.latest == {}
+    log.refresh()  # what the admin routes call after appending
+    assert set(log.latest) == {"r"}
@@ -0,0 +1,105 @@
+import json
+import time
+
+from backend.services.broadcast import broadcaster, decode_event_id
+
+HEADERS = {"X-Admin-Token": "test-token"}
+
+
+def _update(api, fid, status, category="health"):
+    body = {"category": category, "id": fid, "status": status, "verified_at": "2025-08-20T10:00:00Z"}
+    assert api.post("/api/v1/admin/update", headers=HEADERS, json=body).status_code == 200
+
+
+def _data(ev):
+    return json.loads(ev.data)
+
+
+def test_fan_out_filters_by_category_and_bbox(app, api):
+    b = broadcaster(app)
+    gaza, _ = b.subscribe(bbox=(34.2, 31.2, 34.6, 31.6))
+    roads, _ = b.subscribe(categories=frozenset({"roads"}))
+    everyone, _ = b.subscribe()
+    _update(api, "health:0", "closed")  # Gaza City
+    _update(api, "health:2", "open")  # Ramallah, outside the bbox
+    _update(api, "food-1", "open", category="food")  # no geometry
+    b.poll()  # whatever the follower thread has not delivered yet
+    assert [_data(e)["id"] for e in gaza.take()[0]] == ["health:0"]
+    assert roads.take() == ([], False)
+    events = everyone.take()[0]
+    # ordered within a category; the follower may interleave categories either way
+    assert [_data(e)["id"] for e in events if e.category == "health"] == ["health:0", "health:2"]
+    assert sorted(_data(e)["id"] for e in events) == ["food-1", "health:0", "health:2"]
+    assert decode_event_id(events[-1].id) == decode_event_id(b.event_id)
+
+
+def test_last_event_id_replays_what_was_missed(app, api):
+    b = broadcaster(app)
+    sub, _ = b.subscribe(categories=frozenset({"health"}))
+    _update(api, "health:0", "closed")
+    b.poll()
+    (first,) = sub.take()[0]
+    b.unsubscribe(sub)
+
+    _update(api, "health:1", "closed")
+    _update(api, "health:2", "open")
+    b.poll()  # delivered to nobody
+    _update(api, "health:0", "open")
+
+    sub, replay = b.subscribe(categories=frozenset({"health"}), last_event_id=first.id)
+    b.poll()  # live delivery continues after the replay without gaps or repeats
+    got = [(_data(e)["id"], _data(e)["status"]) for e in [*replay, *sub.take()[0]]]
+    assert got == [("health:1", "closed"), ("health:2", "open"), ("health:0", "open")]
+    assert b.subscribe(last_event_id="nonsense")[1] is None
+
+
+def test_stream_endpoint(app, api):
+    b = broadcaster(app)
+    sub, _ = b.subscribe()
+    _update(api, "health:1", "closed")
+    b.poll()
+    (ev,) = sub.take()[0]
+    b.unsubscribe(sub)
+    _update(api, "1001", "closed", category="checkpoints")
+
+    res = api.get("/api/v1/stream?categories=checkpoints", headers={"Last-Event-ID": ev.id}, buffered=False)
+    assert res.status_code == 200 and res.mimetype == "text/event-stream"
+    frames = iter(res.response)
+    assert next(frames).startswith(b"retry:")
+    replayed = next(frames)
+    assert b"event: update" in replayed and b'"id":"1001"' in replayed
+    res.close()
+    assert api.get("/api/v1/stream?categories=ships").status_code == 400
+    assert api.get("/api/v1/stream?bbox=1,2,3").status_code == 400
+
+
+def test_subscribing_restarts_an_exited_follower(app, api):
+    b = broadcaster(app)
+    sub, _ = b.subscribe(categories=frozenset({"health"}))
+    b.unsubscribe(sub)
+    b.wake()
+    for _ in range(100):
+        if b._thread is None:
+            break
+        time.sleep(0.01)
+    sub, _ = b.subscribe(categories=frozenset({"health"}))
+    assert b._thread is not None and b._thread.is_alive()
+    _update(api, "health:1", "closed")
+    assert [_data(e)["id"] for e in sub.take(5)[0]] == ["health:1"]
+
+
+def test_ids_issued_mid_replay_keep_later_categories_at_their_position(app, api):
+    b = broadcaster(app)
+    sub, _ = b.subscribe()
+    _update(api, "1001", "closed", category="checkpoints")
+    b.poll()
+    (first,) = sub.take()[0]
+    b.unsubscribe(sub)
+    _update(api, "1002", "closed", category="checkpoints")
+    _update(api, "health:1", "closed")
+
+    _, replay = b.subscribe(last_event_id=first.id)
+    checkpoint, health = replay
+    assert decode_event_id(checkpoint.id)["health"] == decode_event_id(first.id)["health"]
+    _, rest = b.subscribe(last_event_id=checkpoint.id)
+    assert [_data(e)["id"] for e in rest] == ["health:1"]
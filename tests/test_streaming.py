@@ -0,0 +1,35 @@
+import json
+
+from backend.services.encoded import iter_collection
+
+
+def test_iter_collection_sends_first_feature_alone_then_chunks():
+    feats = [{"type": "Feature", "geometry": None, "properties": {"id": str(i), "pad": "x" * 100}} for i in range(50)]
+    chunks = list(iter_collection(iter(feats), extra={"meta": {"n": 50}}, chunk_size=1024))
+    assert chunks[0].startswith(b'{"type":"FeatureCollection","features":[{')
+    assert json.loads(chunks[0] + b"]}")["features"] == feats[:1]
+    assert 3 < len(chunks) < 50
+    doc = json.loads(b"".join(chunks))
+    assert doc["features"] == feats and doc["meta"] == {"n": 50}
+    assert json.loads(b"".join(iter_collection([]))) == {"type": "FeatureCollection", "features": []}
+
+
+def test_stream_param_matches_buffered_layer(api, data_dir):
+    with open(data_dir["updates"] / "roads.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "2002", "status": "blocked", "verified_at": "2025-08-20T10:00:00Z"}) + "\n")
+    buffered = api.get("/api/v1/roads", headers={"Accept-Encoding": "identity"})
+    streamed = api.get("/api/v1/roads?stream=1", headers={"Accept-Encoding": "identity"})
+    assert "Content-Length" in buffered.headers and "Content-Length" not in streamed.headers
+    assert streamed.get_json() == buffered.get_json()
+    assert streamed.get_json()["features"][1]["properties"]["status"] == "blocked"
+
+    # ad-hoc projections are streamed
+    custom = api.get("/api/v1/health_centers/?fields=NAME", headers={"Accept-Encoding": "identity"})
+    assert "Content-Length" not in custom.headers and len(custom.get_json()["features"]) == 3
+
+
+def test_streamed_bundle_matches_buffered(api):
+    buffered = api.get("/api/v1/datasets/?include=roads,borders").get_json()
+    streamed = api.get("/api/v1/datasets/?include=roads,borders&stream=1", headers={"Accept-Encoding": "identity"})
+    assert "Content-Length" not in streamed.headers
+    assert streamed.get_json() == buffered
@@ -0,0 +1,140 @@
+import json
+
+from backend.pipelines.tiles import prewarm_tiles
+from backend.services import mvt
+from backend.services.layers import get_view
+from backend.services.tiles import get_tile, tile_cache
+
+# z14 tile over Gaza City, holding checkpoint 1001 and road 2001
+Z, X, Y = 14, 9759, 6680
+
+
+def _varint(buf, i):
+    shift = result = 0
+    while True:
+        b = buf[i]
+        result |= (b & 0x7F) << shift
+        i += 1
+        if not b & 0x80:
+            return result, i
+        shift += 7
+
+
+def _fields(buf):
+    i = 0
+    while i < len(buf):
+        key, i = _varint(buf, i)
+        num, wire = key >> 3, key & 7
+        if wire == 0:
+            val, i = _varint(buf, i)
+        elif wire == 1:
+            val, i = buf[i : i + 8], i + 8
+        else:
+            size, i = _varint(buf, i)
+            val, i = buf[i : i + size], i + size
+        yield num, val
+
+
+def decode(tile):
+    """{layer: [properties, ...]} for a tile (geometry ignored)."""
+    out = {}
+    for num, layer in _fields(tile):
+        assert num == 3
+        name, feats, keys, values = None, [], [], []
+        for f, v in _fields(layer):
+            if f == 1:
+                name = v.decode()
+            elif f == 2:
+                feats.append(v)
+            elif f == 3:
+                keys.append(v.decode())
+            elif f == 4:
+                (vnum, raw), = _fields(v)
+                values.append(raw.decode() if vnum == 1 else raw)
+        rows = []
+        for feat in feats:
+            tags = next(v for f, v in _fields(feat) if f == 2)
+            ints, i = [], 0
+            while i < len(tags):
+                n, i = _varint(tags, i)
+                ints.append(n)
+            rows.append({keys[k]: values[v] for k, v in zip(ints[::2], ints[1::2], strict=True)})
+        out[name] = rows
+    return out
+
+
+def test_tile_math_round_trip():
+    x0, y0, x1, y1 = mvt.tile_range((34.45, 31.50, 34.45, 31.50), Z)
+    assert (x0, y0) == (x1, y1) == (X, Y)
+    min_lon, min_lat, max_lon, max_lat = mvt.tile_bounds(Z, X, Y)
+    assert min_lon <= 34.45 <= max_lon and min_lat <= 31.50 <= max_lat
+
+
+def test_clip_line_splits_at_box_edges():
+    import numpy as np
+
+    line = np.array([[-10.0, 5], [5, 5], [20, 5], [20, 15], [5, 15], [5, 8], [5, 2]])
+    parts = mvt.clip_line(line, 0, 10)
+    assert [p.tolist() for p in parts] == [
+        [[0.0, 5.0], [5.0, 5.0], [10.0, 5.0]],
+        [[5.0, 10.0], [5.0, 8.0], [5.0, 2.0]],
+    ]
+
+
+def test_mvt_endpoint_encodes_features(api):
+    tile_cache.clear()
+    res = api.get(f"/api/v1/tiles/roads/{Z}/{X}/{Y}.mvt", headers={"Accept-Encoding": "identity"})
+    assert res.status_code == 200
+    assert res.mimetype == "application/vnd.mapbox-vector-tile"
+    roads = decode(res.data)["roads"]
+    assert [r["id"] for r in roads] == ["2001"]
+    assert roads[0]["name"] == "Salah al-Din Road"
+    assert "user" not in roads[0]
+
+    assert api.get("/api/v1/tiles/roads/3/0/0.mvt").status_code == 204
+    assert api.get("/api/v1/tiles/nope/1/0/0.mvt").status_code == 404
+    assert api.get("/api/v1/tiles/roads/1/5/0.mvt").status_code == 404
+
+
+def test_status_update_invalidates_only_affected_tiles(api, data_dir):
+    tile_cache.clear()
+    other = mvt.tile_range((34.30, 31.30, 34.30, 31.30), Z)[:2]
+    api.get(f"/api/v1/tiles/checkpoints/{Z}/{X}/{Y}.mvt")
+    api.get(f"/api/v1/tiles/checkpoints/{Z}/{other[0]}/{other[1]}.mvt")
+    assert len(tile_cache.keys()) == 2
+
+    with open(data_dir["updates"] / "checkpoints.jsonl", "a", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "1001", "status": "closed", "verified_at": "2025-08-20T10:00:00Z"}) + "\n")
+    api.get("/api/v1/checkpoints")  # the layer notices the new overlay
+
+    assert [k[3:] for k in tile_cache.keys()] == [(Z, other[0], other[1])]
+    res = api.get(f"/api/v1/tiles/checkpoints/{Z}/{X}/{Y}.mvt", headers={"Accept-Encoding": "identity"})
+    assert decode(res.data)["checkpoints"][0]["status"] == "closed"
+
+
+def test_render_from_a_superseded_view_is_not_cached(app, data_dir):
+    tile_cache.clear()
+    with app.app_context():
+        old = get_view("checkpoints")
+        with open(data_dir["updates"] / "checkpoints.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "1001", "status": "closed", "verified_at": "2025-08-20T10:00:00Z"}) + "\n")
+        new = get_view("checkpoints")  # invalidates while the old render is in flight
+        assert new is not old
+        get_tile(old, Z, X, Y)
+        assert tile_cache.keys() == []
+        assert decode(get_tile(new, Z, X, Y).raw)["checkpoints"][0]["status"] == "closed"
+
+
+def test_prewarmed_disk_cache_is_served(app, api, data_dir, tmp_path):
+    meta = {"updated_at": "2025-08-19T19:32:31Z", "data_size": data_dir["combined"].stat().st_size}
+    (tmp_path / (data_dir["combined"].name + ".meta.json")).write_text(json.dumps(meta))
+    res = prewarm_tiles(data_dir["combined"], tmp_path / "tiles", zooms=range(14, 15))
+    assert res["tiles"]["roads"] >= 1
+
+    app.config["TILE_CACHE_DIR"] = str(tmp_path / "tiles")
+    tile_cache.clear()
+    disk = tmp_path / "tiles" / "roads" / res["content_key"] / str(Z) / str(X) / f"{Y}.mvt"
+    assert decode(disk.read_bytes())["roads"][0]["id"] == "2001"
+    disk.write_bytes(b"prewarmed")  # marker proves the response came from disk
+    served = api.get(f"/api/v1/tiles/roads/{Z}/{X}/{Y}.mvt", headers={"Accept-Encoding": "identity"})
+    assert served.data == b"prewarmed"